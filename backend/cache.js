@@ -1,21 +1,104 @@
+const { buildColumnIndexes } = require('./columnIndexes');
+
 class DatabaseCache {
   constructor() {
     this.cache = new Map();
+    this.stats = new Map();
+  }
+
+  // Count a lookup as hit or miss for a database
+  record(databaseName, hit) {
+    let stats = this.stats.get(databaseName);
+    if (!stats) {
+      stats = { hits: 0, misses: 0 };
+      this.stats.set(databaseName, stats);
+    }
+    stats[hit ? 'hits' : 'misses'] += 1;
   }
 
   // Set tables for a database
-  setTables(databaseName, tables) {
+  setTables(databaseName, tables, timestamp = Date.now()) {
+    const lookup = this.buildLookup(tables);
     this.cache.set(databaseName, {
       tables,
-      timestamp: Date.now()
+      lookup,
+      columnIndexes: this.buildColumnIndexLookup(lookup),
+      timestamp
     });
   }
 
+  // Mark the cached tables of a database as up to date
+  touch(databaseName) {
+    const entry = this.cache.get(databaseName);
+    if (entry) {
+      entry.timestamp = Date.now();
+    }
+  }
+
+  // Get when the tables of a database were cached or last confirmed unchanged
+  getTimestamp(databaseName) {
+    return this.cache.get(databaseName)?.timestamp;
+  }
+
+  // Index tables by lowercased name (tableName for metadata, name for schemas)
+  buildLookup(tables) {
+    const lookup = new Map();
+    if (!Array.isArray(tables)) {
+      return lookup;
+    }
+    for (const table of tables) {
+      const name = table?.tableName ?? table?.name;
+      const key = typeof name === 'string' ? name.toLowerCase() : null;
+      // Keep the first table of a name, like Array.find
+      if (key !== null && !lookup.has(key)) {
+        lookup.set(key, table);
+      }
+    }
+    return lookup;
+  }
+
+  // Precompute column -> indexes maps for tables carrying index metadata
+  buildColumnIndexLookup(lookup) {
+    const columnIndexes = new Map();
+    for (const [key, table] of lookup) {
+      if (Array.isArray(table.indexes)) {
+        columnIndexes.set(key, buildColumnIndexes(table.indexes));
+      }
+    }
+    return columnIndexes;
+  }
+
   // Get tables for a database
   getTables(databaseName) {
+    const tables = this.peekTables(databaseName);
+    this.record(databaseName, tables !== undefined);
+    return tables;
+  }
+
+  // Get tables for a database without counting it as a lookup
+  peekTables(databaseName) {
     return this.cache.get(databaseName)?.tables;
   }
 
+  // Find a single table by name (case-insensitive) in constant time
+  findTable(databaseName, tableName) {
+    const table = this.cache.get(databaseName)?.lookup.get(tableName.toLowerCase());
+    this.record(databaseName, table !== undefined);
+    return table;
+  }
+
+  // Get the column -> indexes map of a table
+  getColumnIndexes(databaseName, tableName) {
+    const columnIndexes = this.cache.get(databaseName)?.columnIndexes.get(tableName.toLowerCase());
+    this.record(databaseName, columnIndexes !== undefined);
+    return columnIndexes;
+  }
+
+  // Lookup hits and misses per database
+  getStats() {
+    return Object.fromEntries(this.stats);
+  }
+
   // Check if database tables are cached
   hasTables(databaseName) {
     return this.cache.has(databaseName);
@@ -0,0 +1,17 @@
+// Map each lowercased column name to the indexes containing it, in index order.
+// Built once per table so schema responses need a single lookup per column.
+const buildColumnIndexes = (indexes) => {
+  const columnIndexes = new Map();
+  for (const index of indexes || []) {
+    const columns = new Set((index.columns || []).map(column => column.toLowerCase()));
+    for (const column of columns) {
+      if (!columnIndexes.has(column)) {
+        columnIndexes.set(column, []);
+      }
+      columnIndexes.get(column).push(index);
+    }
+  }
+  return columnIndexes;
+};
+
+module.exports = { buildColumnIndexes };
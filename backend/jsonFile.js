@@ -0,0 +1,11 @@
+const fs = require('fs');
+
+// Reading the metadata files is asynchronous, but JSON.parse still runs on the
+// event loop and blocks it for as long as parsing takes (a few hundred ms for the
+// largest files). Parsing in a worker does not help: passing the parsed object
+// back rebuilds it on the main thread, which measured slower than parsing there.
+
+// Read and parse a JSON file; a missing file rejects with code ENOENT
+const readJsonFile = async (filePath) => JSON.parse(await fs.promises.readFile(filePath, 'utf8'));
+
+module.exports = { readJsonFile };
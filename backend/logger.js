@@ -0,0 +1,43 @@
+// Leveled console logging. Per-request details are logged at debug level, so
+// they cost nothing unless LOG_LEVEL=debug is set.
+const LEVELS = { error: 0, warn: 1, info: 2, debug: 3 };
+const LOG_LEVEL = LEVELS[String(process.env.LOG_LEVEL || 'info').toLowerCase()] ?? LEVELS.info;
+
+class Logger {
+  constructor(level) {
+    this.level = level;
+  }
+
+  // Check if messages of a level are written
+  isEnabled(level) {
+    return LEVELS[level] <= this.level;
+  }
+
+  error(...args) {
+    if (this.isEnabled('error')) {
+      console.error(...args);
+    }
+  }
+
+  warn(...args) {
+    if (this.isEnabled('warn')) {
+      console.warn(...args);
+    }
+  }
+
+  info(...args) {
+    if (this.isEnabled('info')) {
+      console.log(...args);
+    }
+  }
+
+  // Arguments may be a single function building them, so expensive messages are
+  // only formatted when debug logging is on
+  debug(...args) {
+    if (this.isEnabled('debug')) {
+      console.log(...(args.length === 1 && typeof args[0] === 'function' ? [].concat(args[0]()) : args));
+    }
+  }
+}
+
+module.exports = new Logger(LOG_LEVEL);
@@ -0,0 +1,155 @@
+const fs = require('fs');
+const { promisify } = require('util');
+const { buildColumnIndexes } = require('./columnIndexes');
+
+// Reader for tableMetadata.bin, written by scripts/metadata_store.py.
+// Only the header and the name index are read at startup; table records are
+// read from disk by offset when they are requested, so startup time and memory
+// do not grow with the size of the ERP metadata.
+const MAGIC = 'SQXM';
+const FORMAT_VERSION = 1;
+const HEADER_SIZE = 24;
+const RECORD_CACHE_SIZE = 500;
+
+const openFile = promisify(fs.open);
+const readAt = promisify(fs.read);
+const statFile = promisify(fs.fstat);
+const closeFile = promisify(fs.close);
+
+class MetadataStore {
+  constructor() {
+    this.fd = null;
+    this.entries = new Map();
+    this.sections = [];
+    this.records = new Map();
+    this.hits = 0;
+    this.misses = 0;
+  }
+
+  // Read the header and name index of a binary metadata file without blocking the
+  // event loop; the result replaces the open file once passed to use()
+  async read(filePath) {
+    const fd = await openFile(filePath, 'r');
+    try {
+      const header = Buffer.alloc(HEADER_SIZE);
+      await readAt(fd, header, 0, HEADER_SIZE, 0);
+      if (header.toString('latin1', 0, 4) !== MAGIC || header.readUInt16LE(4) !== FORMAT_VERSION) {
+        throw new Error(`${filePath} is not a version ${FORMAT_VERSION} table metadata file`);
+      }
+      const count = header.readUInt32LE(8);
+      const infoLength = header.readUInt32LE(12);
+      const indexOffset = Number(header.readBigUInt64LE(16));
+
+      const info = Buffer.alloc(infoLength);
+      await readAt(fd, info, 0, infoLength, HEADER_SIZE);
+      const { sections = [] } = JSON.parse(info.toString('utf8'));
+
+      const indexLength = (await statFile(fd)).size - indexOffset;
+      const index = Buffer.alloc(indexLength);
+      await readAt(fd, index, 0, indexLength, indexOffset);
+
+      const entries = new Map();
+      let position = 0;
+      for (let i = 0; i < count; i++) {
+        const nameLength = index.readUInt16LE(position);
+        position += 2;
+        const name = index.toString('utf8', position, position + nameLength);
+        position += nameLength;
+        const offset = Number(index.readBigUInt64LE(position));
+        const length = index.readUInt32LE(position + 8);
+        position += 12;
+        entries.set(name, { offset, length });
+      }
+      return { fd, entries, sections };
+    } catch (err) {
+      await closeFile(fd);
+      throw err;
+    }
+  }
+
+  // Replace any file opened before by one returned from read()
+  use({ fd, entries, sections }) {
+    this.close();
+    this.fd = fd;
+    this.entries = entries;
+    this.sections = sections;
+  }
+
+  // Check if a metadata file is open
+  isOpen() {
+    return this.fd !== null;
+  }
+
+  // Check if the records of the open file carry a section, e.g. 'indexes'
+  hasSection(section) {
+    return this.isOpen() && this.sections.includes(section);
+  }
+
+  // Get the record of a table (case-insensitive), or undefined if it is unknown
+  getTable(tableName) {
+    return this.getEntry(tableName)?.record;
+  }
+
+  // Get the column -> indexes map of a table
+  getColumnIndexes(tableName) {
+    const entry = this.getEntry(tableName);
+    if (entry && !entry.columnIndexes) {
+      entry.columnIndexes = buildColumnIndexes(entry.record.indexes);
+    }
+    return entry?.columnIndexes;
+  }
+
+  // Read a table record, keeping recently used records and derived data in memory
+  getEntry(tableName) {
+    if (!this.isOpen()) {
+      return undefined;
+    }
+    const key = tableName.toLowerCase();
+    if (this.records.has(key)) {
+      // Re-insert to keep the most recently used records at the end
+      const cached = this.records.get(key);
+      this.records.delete(key);
+      this.records.set(key, cached);
+      this.hits += 1;
+      return cached;
+    }
+    this.misses += 1;
+
+    const entry = this.entries.get(key);
+    if (!entry) {
+      return undefined;
+    }
+    const buffer = Buffer.alloc(entry.length);
+    fs.readSync(this.fd, buffer, 0, entry.length, entry.offset);
+    const cached = { record: JSON.parse(buffer.toString('utf8')), columnIndexes: null };
+
+    this.records.set(key, cached);
+    if (this.records.size > RECORD_CACHE_SIZE) {
+      this.records.delete(this.records.keys().next().value);
+    }
+    return cached;
+  }
+
+  // Record cache hits and misses
+  getStats() {
+    return { tables: this.size, cachedRecords: this.records.size, hits: this.hits, misses: this.misses };
+  }
+
+  // Number of tables in the open file
+  get size() {
+    return this.entries.size;
+  }
+
+  // Close the open file
+  close() {
+    if (this.fd !== null) {
+      fs.closeSync(this.fd);
+    }
+    this.fd = null;
+    this.entries = new Map();
+    this.sections = [];
+    this.records.clear();
+  }
+}
+
+module.exports = new MetadataStore();
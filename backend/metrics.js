@@ -0,0 +1,177 @@
+// In-process request metrics: latency histograms, counters and gauges read from
+// the caches and pools when /metrics is scraped. Rendered as Prometheus text or JSON.
+const DEFAULT_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000];
+
+const METRIC_HELP = {
+  http_request_duration_ms: 'HTTP request latency by route',
+  sql_duration_ms: 'Time spent executing SQL and reading its results',
+  serialize_duration_ms: 'Time spent serializing and sending results',
+  rows_returned_total: 'Rows returned to clients',
+  queries_cancelled_total: 'Queries cancelled on request, by timeout or by client disconnect',
+  query_guard_warnings_total: 'Likely table scans and non-sargable filters reported by the query guard',
+  metadata_reloads_total: 'Reloads of the extracted metadata files, through the API or the file watcher'
+};
+
+class Histogram {
+  constructor(buckets) {
+    this.buckets = buckets;
+    this.counts = new Array(buckets.length).fill(0);
+    this.sum = 0;
+    this.count = 0;
+  }
+
+  // Record a value
+  observe(value) {
+    this.sum += value;
+    this.count += 1;
+    const bucket = this.buckets.findIndex(bound => value <= bound);
+    if (bucket !== -1) {
+      this.counts[bucket] += 1;
+    }
+  }
+
+  // Cumulative counts per upper bound, as Prometheus expects them
+  cumulative() {
+    let total = 0;
+    return this.counts.map(count => (total += count));
+  }
+
+  // Estimate a quantile as the upper bound of the bucket it falls into
+  quantile(q) {
+    if (this.count === 0) {
+      return null;
+    }
+    const rank = q * this.count;
+    const cumulative = this.cumulative();
+    const bucket = cumulative.findIndex(count => count >= rank);
+    return bucket === -1 ? Infinity : this.buckets[bucket];
+  }
+}
+
+const escapeLabel = (value) => String(value).replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+
+const formatLabels = (labels, extra = {}) => {
+  const entries = Object.entries({ ...labels, ...extra });
+  return entries.length > 0 ? `{${entries.map(([key, value]) => `${key}="${escapeLabel(value)}"`).join(',')}}` : '';
+};
+
+const seriesKey = (name, labels) => `${name}${formatLabels(Object.fromEntries(Object.entries(labels).sort()))}`;
+
+class Metrics {
+  constructor() {
+    this.startedAt = Date.now();
+    this.histograms = new Map();
+    this.counters = new Map();
+    this.collectors = [];
+  }
+
+  // Record a value in a histogram series
+  observe(name, labels, value) {
+    const key = seriesKey(name, labels);
+    let series = this.histograms.get(key);
+    if (!series) {
+      series = { name, labels, histogram: new Histogram(DEFAULT_BUCKETS_MS) };
+      this.histograms.set(key, series);
+    }
+    series.histogram.observe(value);
+  }
+
+  // Add to a counter series
+  increment(name, labels, by = 1) {
+    const key = seriesKey(name, labels);
+    const series = this.counters.get(key);
+    if (series) {
+      series.value += by;
+    } else {
+      this.counters.set(key, { name, labels, value: by });
+    }
+  }
+
+  // Start a timer; the returned function gives the elapsed milliseconds
+  startTimer() {
+    const start = process.hrtime.bigint();
+    return () => Number(process.hrtime.bigint() - start) / 1e6;
+  }
+
+  // Register a function returning gauges { name, help, type, labels, value } read at scrape time
+  addCollector(collector) {
+    this.collectors.push(collector);
+  }
+
+  // Express middleware recording the latency of every request by matched route
+  middleware() {
+    return (req, res, next) => {
+      const elapsed = this.startTimer();
+      res.on('finish', () => {
+        const route = req.route ? `${req.baseUrl}${req.route.path}` : 'unmatched';
+        this.observe('http_request_duration_ms', { method: req.method, route, status: res.statusCode }, elapsed());
+      });
+      next();
+    };
+  }
+
+  // Values of all registered collectors
+  collect() {
+    return this.collectors.flatMap(collector => collector());
+  }
+
+  // Render every metric in the Prometheus text exposition format. Samples are
+  // grouped by metric name, as each family has to be one contiguous block after
+  // its HELP and TYPE lines
+  toPrometheus() {
+    const families = new Map();
+    const family = (name, type, help) => {
+      if (!families.has(name)) {
+        families.set(name, { type, help: help || METRIC_HELP[name] || name, samples: [] });
+      }
+      return families.get(name).samples;
+    };
+
+    for (const { name, labels, histogram } of this.histograms.values()) {
+      const samples = family(name, 'histogram');
+      const cumulative = histogram.cumulative();
+      histogram.buckets.forEach((bound, i) => {
+        samples.push(`${name}_bucket${formatLabels(labels, { le: bound })} ${cumulative[i]}`);
+      });
+      samples.push(`${name}_bucket${formatLabels(labels, { le: '+Inf' })} ${histogram.count}`);
+      samples.push(`${name}_sum${formatLabels(labels)} ${histogram.sum}`);
+      samples.push(`${name}_count${formatLabels(labels)} ${histogram.count}`);
+    }
+    for (const { name, labels, value } of this.counters.values()) {
+      family(name, 'counter').push(`${name}${formatLabels(labels)} ${value}`);
+    }
+    for (const { name, help, type = 'gauge', labels = {}, value } of this.collect()) {
+      family(name, type, help).push(`${name}${formatLabels(labels)} ${value}`);
+    }
+    family('process_uptime_seconds', 'gauge', 'Time since the server started')
+      .push(`process_uptime_seconds ${(Date.now() - this.startedAt) / 1000}`);
+
+    const lines = [];
+    for (const [name, { type, help, samples }] of families) {
+      lines.push(`# HELP ${name} ${help}`, `# TYPE ${name} ${type}`, ...samples);
+    }
+    return `${lines.join('\n')}\n`;
+  }
+
+  // Summarize every metric as JSON, with estimated latency percentiles
+  toJSON() {
+    const round = (value) => (value === null || !Number.isFinite(value) ? value : Math.round(value * 100) / 100);
+    return {
+      uptimeSeconds: (Date.now() - this.startedAt) / 1000,
+      histograms: [...this.histograms.values()].map(({ name, labels, histogram }) => ({
+        name,
+        labels,
+        count: histogram.count,
+        sum: round(histogram.sum),
+        avg: histogram.count > 0 ? round(histogram.sum / histogram.count) : null,
+        p50: histogram.quantile(0.5),
+        p90: histogram.quantile(0.9),
+        p99: histogram.quantile(0.99)
+      })),
+      counters: [...this.counters.values()].map(({ name, labels, value }) => ({ name, labels, value })),
+      gauges: this.collect().map(({ name, labels = {}, value }) => ({ name, labels, value }))
+    };
+  }
+}
+
+module.exports = new Metrics();
@@ -0,0 +1,146 @@
+const sql = require('mssql/msnodesqlv8');
+const logger = require('./logger');
+
+// One connection pool per database, shared by all requests. The global pool of
+// sql.connect() is torn down whenever a request targets another database, so
+// concurrent users of different databases kept reconnecting to SQL Server.
+const POOL_MAX = parseInt(process.env.DB_POOL_MAX, 10) || 10;
+const POOL_IDLE_TIMEOUT_MS = parseInt(process.env.DB_POOL_IDLE_TIMEOUT_MS, 10) || 30000;
+const POOL_EVICT_AFTER_MS = parseInt(process.env.DB_POOL_EVICT_AFTER_MS, 10) || 10 * 60 * 1000;
+const HEALTH_CHECK_INTERVAL_MS = parseInt(process.env.DB_POOL_HEALTH_CHECK_MS, 10) || 60000;
+// A single failed check may just be a timeout on a saturated pool
+const HEALTH_CHECK_MAX_FAILURES = parseInt(process.env.DB_POOL_HEALTH_CHECK_FAILURES, 10) || 3;
+
+class PoolManager {
+  constructor() {
+    this.baseConfig = null;
+    this.pools = new Map();
+    this.maintenanceTimer = null;
+  }
+
+  // Set the connection settings shared by every pool and start maintenance
+  configure(baseConfig) {
+    this.baseConfig = baseConfig;
+    if (!this.maintenanceTimer) {
+      this.maintenanceTimer = setInterval(() => this.maintain(), HEALTH_CHECK_INTERVAL_MS);
+      this.maintenanceTimer.unref();
+    }
+  }
+
+  // Get the connected pool of a database, creating it on first use
+  async getPool(database) {
+    const databaseName = database || this.baseConfig.database;
+    const key = (databaseName || '').toLowerCase();
+    let entry = this.pools.get(key);
+
+    if (!entry) {
+      const pool = new sql.ConnectionPool({
+        ...this.baseConfig,
+        database: databaseName,
+        pool: {
+          max: POOL_MAX,
+          min: 0,
+          idleTimeoutMillis: POOL_IDLE_TIMEOUT_MS
+        }
+      });
+      entry = { pool, connecting: pool.connect(), lastUsed: Date.now(), failures: 0 };
+      this.pools.set(key, entry);
+
+      pool.on('error', (err) => {
+        logger.error(`Connection pool error for database ${databaseName}:`, err);
+        this.evict(key, entry, true);
+      });
+      entry.connecting.catch(() => this.evict(key, entry, true));
+    }
+
+    entry.lastUsed = Date.now();
+    await entry.connecting;
+    return entry.pool;
+  }
+
+  // Mark the pool of a database as used, e.g. when a query on it has finished
+  touch(database) {
+    const entry = this.pools.get((database || this.baseConfig.database || '').toLowerCase());
+    if (entry) {
+      entry.lastUsed = Date.now();
+    }
+  }
+
+  // Check if a pool has connections in use or requests waiting for one
+  isBusy(entry) {
+    return entry.pool.borrowed + entry.pool.pending > 0;
+  }
+
+  // Close and forget a pool, unless it was already replaced. Pools with running
+  // queries are kept unless force is set (the pool itself reported an error);
+  // returns whether the pool was closed
+  evict(key, entry, force = false) {
+    if (!force && this.isBusy(entry)) {
+      return false;
+    }
+    if (this.pools.get(key) === entry) {
+      this.pools.delete(key);
+    }
+    entry.pool.close().catch(() => {});
+    return true;
+  }
+
+  // Evict pools that were idle for too long or failed several health checks in a
+  // row. A pool running queries counts as used, so the idle time of a long query
+  // only starts once it has finished, and it is neither checked nor closed.
+  async maintain() {
+    const now = Date.now();
+    for (const [key, entry] of this.pools) {
+      if (this.isBusy(entry)) {
+        entry.lastUsed = now;
+        continue;
+      }
+      if (now - entry.lastUsed > POOL_EVICT_AFTER_MS) {
+        logger.info(`Closing idle connection pool for database: ${key}`);
+        this.evict(key, entry);
+        continue;
+      }
+      try {
+        await entry.connecting;
+        await entry.pool.request().query('SELECT 1');
+        entry.failures = 0;
+      } catch (err) {
+        entry.failures += 1;
+        if (entry.failures < HEALTH_CHECK_MAX_FAILURES) {
+          logger.warn(`Health check ${entry.failures} of ${HEALTH_CHECK_MAX_FAILURES} failed for database ${key}:`, err.message);
+        } else if (this.evict(key, entry)) {
+          logger.warn(`Health check failed ${entry.failures} times for database ${key}, closing its pool:`, err.message);
+        }
+      }
+    }
+  }
+
+  // Connection counts per database
+  getStats() {
+    const stats = {};
+    for (const [key, entry] of this.pools) {
+      const { pool } = entry;
+      stats[key] = {
+        connected: pool.connected,
+        size: pool.size,
+        available: pool.available,
+        borrowed: pool.borrowed,
+        pending: pool.pending,
+        max: POOL_MAX,
+        lastUsed: entry.lastUsed
+      };
+    }
+    return stats;
+  }
+
+  // Close every pool
+  async closeAll() {
+    clearInterval(this.maintenanceTimer);
+    this.maintenanceTimer = null;
+    const entries = [...this.pools];
+    this.pools.clear();
+    await Promise.all(entries.map(([, entry]) => entry.pool.close().catch(() => {})));
+  }
+}
+
+module.exports = new PoolManager();
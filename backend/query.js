@@ -0,0 +1,157 @@
+// Helpers for /api/query: building paged table queries and reading results
+// through the driver's row events instead of buffering whole recordsets.
+const QUERY_MAX_ROWS = parseInt(process.env.QUERY_MAX_ROWS, 10) || 100000;
+
+const quoteIdentifier = (name) => `[${String(name).replace(/]/g, ']]')}]`;
+
+const normalizeDirection = (direction) => (String(direction || 'ASC').toUpperCase() === 'DESC' ? 'DESC' : 'ASC');
+
+// Unique column of every AX table, used to order rows with equal orderByColumn values
+const TIEBREAKER_COLUMN = 'RECID';
+
+// Build a SELECT for table/filter parameters. With pageSize the query is paged,
+// by keyset (afterKey on orderByColumn, plus afterRecId on RECID for rows with
+// the same key) or by OFFSET/FETCH (page, zero-based).
+// One extra row is requested so the caller can tell whether more pages exist.
+const buildTableQuery = (request, params) => {
+  const { tableName, whereColumn, whereValue, orderByColumn, orderDirection, afterKey, afterRecId } = params;
+  const pageSize = parseInt(params.pageSize, 10) || 0;
+  const page = Math.max(parseInt(params.page, 10) || 0, 0);
+  const direction = normalizeDirection(orderDirection);
+  const conditions = [];
+
+  if (whereColumn && whereValue) {
+    conditions.push(`${quoteIdentifier(whereColumn)} = @whereValue`);
+    request.input('whereValue', whereValue);
+  }
+
+  // Paged rows with equal keys need a unique second sort column, or pages skip
+  // and repeat them
+  const tiebreaker = pageSize > 0 && orderByColumn && orderByColumn.toUpperCase() !== TIEBREAKER_COLUMN;
+  const keyset = pageSize > 0 && orderByColumn && afterKey !== undefined && afterKey !== null;
+  if (keyset) {
+    const operator = direction === 'DESC' ? '<' : '>';
+    const column = quoteIdentifier(orderByColumn);
+    if (tiebreaker && afterRecId !== undefined && afterRecId !== null) {
+      const recId = quoteIdentifier(TIEBREAKER_COLUMN);
+      conditions.push(`(${column} ${operator} @afterKey OR (${column} = @afterKey AND ${recId} ${operator} @afterRecId))`);
+      request.input('afterRecId', afterRecId);
+    } else {
+      conditions.push(`${column} ${operator} @afterKey`);
+    }
+    request.input('afterKey', afterKey);
+  }
+
+  const top = keyset ? `TOP (${pageSize + 1}) ` : '';
+  let query = `SELECT ${top}* FROM ${quoteIdentifier(tableName)}`;
+  if (conditions.length > 0) {
+    query += ` WHERE ${conditions.join(' AND ')}`;
+  }
+
+  if (orderByColumn) {
+    query += ` ORDER BY ${quoteIdentifier(orderByColumn)} ${direction}`;
+    if (tiebreaker) {
+      query += `, ${quoteIdentifier(TIEBREAKER_COLUMN)} ${direction}`;
+    }
+  } else if (pageSize > 0) {
+    query += ' ORDER BY (SELECT NULL)';
+  }
+
+  if (pageSize > 0 && !keyset) {
+    query += ` OFFSET ${page * pageSize} ROWS FETCH NEXT ${pageSize + 1} ROWS ONLY`;
+  }
+
+  return { query, pageSize };
+};
+
+// Column names of a recordset in result order, from the driver's column metadata
+const columnNames = (columns) => Object.values(columns || {})
+  .sort((a, b) => a.index - b.index)
+  .map((column) => column.name);
+
+// Run a query in streaming mode and hand each row of the first recordset to onRow.
+// onColumns, if given, first receives the column names of that recordset in order.
+// Stops and cancels the request once maxRows rows were delivered. Resolves with
+// the number of rows delivered and whether the result was cut off.
+const streamQuery = (request, query, { maxRows = QUERY_MAX_ROWS, onColumns, onRow }) => {
+  return new Promise((resolve, reject) => {
+    let rowCount = 0;
+    let recordsets = 0;
+    let truncated = false;
+    let settled = false;
+
+    const finish = (err) => {
+      if (settled) {
+        return;
+      }
+      settled = true;
+      if (err && !(truncated && err.code === 'ECANCEL')) {
+        reject(err);
+      } else {
+        resolve({ rowCount, truncated });
+      }
+    };
+
+    request.stream = true;
+    request.on('recordset', (columns) => {
+      recordsets += 1;
+      if (recordsets === 1 && onColumns) {
+        onColumns(columnNames(columns));
+      }
+    });
+    request.on('row', (row) => {
+      if (recordsets > 1 || truncated) {
+        return;
+      }
+      if (rowCount >= maxRows) {
+        truncated = true;
+        request.cancel();
+        return;
+      }
+      onRow(row, rowCount);
+      rowCount += 1;
+    });
+    request.on('error', finish);
+    request.on('done', () => finish());
+    request.query(query);
+  });
+};
+
+// Give every row an id for the grid, keeping a real id column if the table has one
+const withRowId = (row, index) => {
+  if (!Object.prototype.hasOwnProperty.call(row, 'id')) {
+    row.id = index;
+  }
+  return row;
+};
+
+// Collect rows in the columnar format: the column names once, then one array of
+// values per row in the same order, without a synthetic id
+const createColumnarResult = () => {
+  const result = { columns: [], rows: [] };
+  return {
+    result,
+    onColumns: (columns) => {
+      result.columns = columns;
+    },
+    // Returns the values of the row as they were stored
+    onRow: (row) => {
+      if (result.columns.length === 0) {
+        result.columns = Object.keys(row);
+      }
+      const values = result.columns.map((column) => row[column]);
+      result.rows.push(values);
+      return values;
+    }
+  };
+};
+
+module.exports = {
+  QUERY_MAX_ROWS,
+  TIEBREAKER_COLUMN,
+  quoteIdentifier,
+  buildTableQuery,
+  streamQuery,
+  withRowId,
+  createColumnarResult
+};
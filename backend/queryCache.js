@@ -0,0 +1,128 @@
+// Optional cache of serialized /api/query results. Entries are keyed on
+// database + normalized SQL + parameters, expire after a TTL, and the least
+// recently used entries are evicted once the cache exceeds its byte budget.
+const QUERY_CACHE_ENABLED = process.env.QUERY_CACHE_ENABLED === 'true';
+const QUERY_CACHE_MAX_BYTES = parseInt(process.env.QUERY_CACHE_MAX_BYTES, 10) || 64 * 1024 * 1024;
+const QUERY_CACHE_TTL_MS = parseInt(process.env.QUERY_CACHE_TTL_MS, 10) || 60000;
+
+// Split SQL into code and string literal parts; literals are kept verbatim
+const splitLiterals = (sql) => sql.split(/('(?:[^']|'')*')/);
+
+// Collapse whitespace outside string literals and drop a trailing semicolon
+const normalizeSql = (sql) => {
+  return splitLiterals(sql.trim())
+    .map((part, i) => (i % 2 === 1 ? part : part.replace(/\s+/g, ' ')))
+    .join('')
+    .replace(/\s*;\s*$/, '');
+};
+
+// Only plain reads are cached; anything that may change data is not
+const isCacheableSql = (sql) => {
+  const code = splitLiterals(sql).filter((_, i) => i % 2 === 0).join(' ');
+  return /^\s*(select|with)\b/i.test(code) &&
+    !/\b(into|insert|update|delete|merge|exec|execute|drop|alter|create|truncate)\b/i.test(code);
+};
+
+class QueryResultCache {
+  constructor({ enabled, maxBytes, ttlMs }) {
+    this.enabled = enabled;
+    this.maxBytes = maxBytes;
+    this.ttlMs = ttlMs;
+    this.entries = new Map();
+    this.bytes = 0;
+    this.hits = 0;
+    this.misses = 0;
+    this.evictions = 0;
+  }
+
+  // Build the cache key of a query
+  key(database, sql, params = {}) {
+    return `${String(database || '').toLowerCase()}\u0000${normalizeSql(sql)}\u0000${JSON.stringify(params)}`;
+  }
+
+  // Get a cached entry, or undefined on a miss or when it expired
+  get(key) {
+    const entry = this.entries.get(key);
+    if (!entry || entry.expires <= Date.now()) {
+      if (entry) {
+        this.remove(key);
+      }
+      this.misses += 1;
+      return undefined;
+    }
+    // Re-insert to keep the most recently used entries at the end
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    this.hits += 1;
+    return entry;
+  }
+
+  // Store a serialized body with the headers it was sent with
+  set(key, body, headers = {}) {
+    const size = Buffer.byteLength(body);
+    if (size > this.maxBytes) {
+      return;
+    }
+    this.remove(key);
+    this.entries.set(key, { body, headers, size, expires: Date.now() + this.ttlMs });
+    this.bytes += size;
+
+    for (const oldestKey of this.entries.keys()) {
+      if (this.bytes <= this.maxBytes) {
+        break;
+      }
+      this.remove(oldestKey);
+      this.evictions += 1;
+    }
+  }
+
+  // Remove a single entry
+  remove(key) {
+    const entry = this.entries.get(key);
+    if (entry) {
+      this.bytes -= entry.size;
+      this.entries.delete(key);
+    }
+  }
+
+  // Remove every entry, or only those of one database
+  clear(database) {
+    if (!database) {
+      this.entries.clear();
+      this.bytes = 0;
+      return;
+    }
+    const prefix = `${database.toLowerCase()}\u0000`;
+    for (const key of [...this.entries.keys()]) {
+      if (key.startsWith(prefix)) {
+        this.remove(key);
+      }
+    }
+  }
+
+  // Hit/miss counters and current usage
+  getStats() {
+    const lookups = this.hits + this.misses;
+    return {
+      enabled: this.enabled,
+      entries: this.entries.size,
+      bytes: this.bytes,
+      maxBytes: this.maxBytes,
+      ttlMs: this.ttlMs,
+      hits: this.hits,
+      misses: this.misses,
+      evictions: this.evictions,
+      hitRatio: lookups > 0 ? this.hits / lookups : 0
+    };
+  }
+}
+
+const queryCache = new QueryResultCache({
+  enabled: QUERY_CACHE_ENABLED,
+  maxBytes: QUERY_CACHE_MAX_BYTES,
+  ttlMs: QUERY_CACHE_TTL_MS
+});
+
+module.exports = queryCache;
+module.exports.isCacheableSql = isCacheableSql;
+module.exports.normalizeSql = normalizeSql;
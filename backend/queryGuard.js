@@ -0,0 +1,247 @@
+const Metrics = require('./metrics');
+const logger = require('./logger');
+
+// Pre-execution check of /api/query SQL against the extracted index metadata and
+// live row counts. Single-table SELECTs whose filter cannot seek an index, or that
+// wrap filtered columns in functions, are reported as warnings; in enforce mode
+// such queries also get a TOP limit so they stop early instead of scanning on.
+// Modes from loosest to strictest
+const MODES = ['off', 'warn', 'enforce'];
+const QUERY_GUARD_MODE = MODES.includes(process.env.QUERY_GUARD_MODE)
+  ? process.env.QUERY_GUARD_MODE
+  : 'warn';
+const QUERY_GUARD_MIN_ROWS = parseInt(process.env.QUERY_GUARD_MIN_ROWS, 10) || 100000;
+const QUERY_GUARD_TOP = parseInt(process.env.QUERY_GUARD_TOP, 10) || 1000;
+const ROW_COUNT_TTL_MS = parseInt(process.env.QUERY_GUARD_ROW_COUNT_TTL_MS, 10) || 10 * 60 * 1000;
+// Every AxDB table has a unique index on RECID; PARTITION and DATAAREAID are added
+// in front of the indexes in the database, so they never decide whether one is used
+const ALWAYS_INDEXED = new Set(['recid']);
+const IMPLICIT_KEY_COLUMNS = new Set(['partition', 'dataareaid']);
+const SQL_KEYWORDS = new Set(['and', 'or', 'not', 'in', 'is', 'null', 'like', 'between', 'exists', 'select']);
+
+// Blank out string literals so their content is not mistaken for SQL
+const stripLiterals = (sql) => sql.replace(/N?'(?:[^']|'')*'/g, "''");
+
+const unquote = (name) => name.replace(/^\[|\]$/g, '');
+
+// Split a single-table SELECT into the parts the guard looks at, or null for
+// anything else (joins, subqueries, unions, CTEs, writes)
+const parseSelect = (sql) => {
+  const code = stripLiterals(sql).trim().replace(/;\s*$/, '');
+  if (!/^select\b/i.test(code) || /\b(join|union|intersect|except|into)\b|\(\s*select\b/i.test(code)) {
+    return null;
+  }
+  const from = code.match(/\bfrom\s+((?:\[?\w+\]?\.)*)(\[[^\]]+\]|\w+)/i);
+  if (!from) {
+    return null;
+  }
+  const clause = (name, next) => {
+    const match = code.match(new RegExp(`\\b${name}\\b([\\s\\S]*?)(?:\\b(?:${next})\\b|$)`, 'i'));
+    return match ? match[1] : '';
+  };
+  return {
+    tableName: from[2].replace(/^\[|\]$/g, ''),
+    hasTop: /^select\s+(?:distinct\s+)?top\b/i.test(code),
+    hasOffset: /\boffset\s+\S+\s+rows?\b/i.test(code),
+    where: clause('where', 'group\\s+by|having|order\\s+by|option'),
+    orderBy: clause('order\\s+by', 'offset|option'),
+    leadingWildcard: /\blike\s+N?'%/i.test(sql)
+  };
+};
+
+const COMPARISON = String.raw`\s*(?:=|<>|!=|<=|>=|<|>|\bnot\s+like\b|\blike\b|\bnot\s+in\b|\bin\b|\bbetween\b|\bis\b)`;
+const COLUMN = String.raw`(\[[^\]]+\]|[a-z_]\w*)`;
+// A column compared as it is, e.g. [ItemId] = @v, (ItemId = @v) or t.ItemId IN (...)
+const PLAIN_PREDICATE = new RegExp(String.raw`(?<![\w@\]])` + COLUMN + COMPARISON, 'gi');
+// A column wrapped in a function before the comparison, e.g. UPPER(ItemId) = ... or CAST(Qty AS int) > ...
+const WRAPPED_PREDICATE = new RegExp(String.raw`\b\w+\s*\(\s*(?:\w+\.)?` + COLUMN +
+  String.raw`\s*(?:,[^()]*|\s+as\s+\w+(?:\([^()]*\))?)?\)` + COMPARISON, 'gi');
+
+// Columns compared directly in a WHERE clause, and the ones wrapped in functions;
+// names keep their case and are deduplicated case-insensitively
+const analyzeWhere = (where) => {
+  const names = (pattern) => {
+    const found = new Map();
+    for (const [, column] of where.matchAll(pattern)) {
+      const name = unquote(column);
+      if (!SQL_KEYWORDS.has(name.toLowerCase()) && !found.has(name.toLowerCase())) {
+        found.set(name.toLowerCase(), name);
+      }
+    }
+    return [...found.values()];
+  };
+  return {
+    columns: names(PLAIN_PREDICATE),
+    wrapped: names(WRAPPED_PREDICATE),
+    hasOr: /\bor\b/i.test(where)
+  };
+};
+
+class QueryGuard {
+  constructor() {
+    this.mode = QUERY_GUARD_MODE;
+    this.rowCounts = new Map();
+    this.getIndexes = () => undefined;
+    this.getStoredRowCount = () => undefined;
+  }
+
+  // Set how the indexes of a table are looked up: name -> [{ indexName, columns }],
+  // and where collected row counts come from: (database, name) -> rows
+  configure({ getIndexes, getStoredRowCount }) {
+    this.getIndexes = getIndexes || this.getIndexes;
+    this.getStoredRowCount = getStoredRowCount || this.getStoredRowCount;
+  }
+
+  // Resolve the mode of one request; clients may ask for a stricter check than
+  // QUERY_GUARD_MODE, never for a looser one
+  resolveMode(requested) {
+    return MODES[Math.max(MODES.indexOf(this.mode), MODES.indexOf(requested))];
+  }
+
+  // Estimated rows of a table from sys.partitions, cached for ROW_COUNT_TTL_MS;
+  // null if it cannot be read
+  async getRowCount(pool, databaseName, tableName) {
+    const key = `${databaseName}\u0000${tableName.toLowerCase()}`;
+    const cached = this.rowCounts.get(key);
+    if (cached && Date.now() - cached.timestamp <= ROW_COUNT_TTL_MS) {
+      return cached.rows;
+    }
+    let rows = null;
+    try {
+      const elapsed = Metrics.startTimer();
+      const result = await pool.request()
+        .input('table', tableName)
+        .query(`
+          SELECT SUM(p.rows) AS row_count
+          FROM sys.partitions p
+          JOIN sys.tables t ON t.object_id = p.object_id
+          WHERE t.name = @table AND p.index_id IN (0, 1)
+        `);
+      Metrics.observe('sql_duration_ms', { operation: 'row_count' }, elapsed());
+      const value = result.recordset[0] && result.recordset[0].row_count;
+      rows = value === null || value === undefined ? null : Number(value);
+    } catch (err) {
+      logger.warn(`Could not read the row count of ${tableName}:`, err.message);
+    }
+    this.rowCounts.set(key, { rows, timestamp: Date.now() });
+    return rows;
+  }
+
+  // Find the likely table scans of a query. Returns { tableName, rowCount, warnings }
+  // where each warning is { code, message, suggestion? }
+  analyze(sql, rowCount = null) {
+    const parsed = parseSelect(sql);
+    if (!parsed) {
+      return { tableName: null, rowCount: null, warnings: [] };
+    }
+    const { tableName } = parsed;
+    const warnings = [];
+    const where = analyzeWhere(parsed.where);
+
+    for (const column of where.wrapped) {
+      warnings.push({
+        code: 'non-sargable',
+        message: `A function is applied to ${column} in the WHERE clause, so no index on it can be used`,
+        suggestion: `Compare ${column} to a value directly`
+      });
+    }
+    if (parsed.leadingWildcard) {
+      warnings.push({
+        code: 'leading-wildcard',
+        message: 'LIKE with a leading % cannot seek an index',
+        suggestion: 'Match on a prefix instead'
+      });
+    }
+
+    const large = rowCount === null || rowCount >= QUERY_GUARD_MIN_ROWS;
+    const indexes = this.getIndexes(tableName);
+    if (!large || !Array.isArray(indexes)) {
+      return { tableName, rowCount, warnings };
+    }
+
+    const rows = rowCount === null ? '' : ` (~${rowCount.toLocaleString('en-US')} rows)`;
+    const leadingColumns = indexes
+      .map((index) => ({ index, column: (index.columns || []).find((c) => !IMPLICIT_KEY_COLUMNS.has(c.toLowerCase())) }))
+      .filter(({ column }) => column);
+    const isLeading = (column) => ALWAYS_INDEXED.has(column.toLowerCase()) ||
+      leadingColumns.some((lead) => lead.column.toLowerCase() === column.toLowerCase());
+    const filtered = where.columns.filter((column) => !IMPLICIT_KEY_COLUMNS.has(column.toLowerCase()));
+    const filteredKeys = filtered.map((column) => column.toLowerCase());
+    // One indexed column is enough to seek with AND; with OR every branch has to seek
+    const unseekable = filtered.filter((column) => !isLeading(column));
+    const seekable = where.hasOr ? unseekable.length === 0 : unseekable.length < filtered.length;
+
+    if (filtered.length === 0 && where.wrapped.length === 0 && !parsed.hasTop && !parsed.hasOffset) {
+      warnings.push({
+        code: 'full-scan',
+        message: `No filter on ${tableName}${rows}: every row is read`,
+        suggestion: leadingColumns.length > 0
+          ? `Filter on ${leadingColumns[0].column} (leading column of ${leadingColumns[0].index.indexName}) or add TOP`
+          : 'Add a filter or TOP'
+      });
+    } else if (filtered.length > 0 && !seekable) {
+      const partial = indexes.find((index) => (index.columns || []).some((c) => filteredKeys.includes(c.toLowerCase())));
+      const lead = partial
+        ? leadingColumns.find(({ index }) => index === partial)
+        : leadingColumns[0];
+      warnings.push({
+        code: 'table-scan',
+        message: `No index of ${tableName}${rows} starts with ${unseekable.join(', ')}: likely a table scan`,
+        suggestion: lead
+          ? `Also filter on ${lead.column}, the leading column of ${lead.index.indexName}`
+          : undefined
+      });
+    }
+
+    const orderColumns = parsed.orderBy.split(',')
+      .map((part) => part.trim().split(/\s+/)[0])
+      .filter(Boolean)
+      .map(unquote);
+    if (orderColumns.length > 0 && !seekable && !isLeading(orderColumns[0])) {
+      warnings.push({
+        code: 'unindexed-sort',
+        message: `Sorting on ${orderColumns[0]} needs all matching rows of ${tableName}${rows} first`,
+        suggestion: leadingColumns.length > 0 ? `Order by ${leadingColumns[0].column} or RECID instead` : undefined
+      });
+    }
+    return { tableName, rowCount, warnings };
+  }
+
+  // Add TOP to a single-table SELECT that has neither TOP nor OFFSET; returns null
+  // when the query cannot be limited that way
+  applyTop(sql, limit = QUERY_GUARD_TOP) {
+    const parsed = parseSelect(sql);
+    if (!parsed || parsed.hasTop || parsed.hasOffset) {
+      return null;
+    }
+    return sql.replace(/^(\s*select\s+(?:distinct\s+)?)/i, `$1TOP (${limit}) `);
+  }
+
+  // Analyze a query before it runs. Returns the SQL to execute, the warnings, the
+  // estimated rows of its table and whether a TOP limit was added
+  async check(pool, databaseName, sql, requestedMode) {
+    const mode = this.resolveMode(requestedMode);
+    if (mode === 'off') {
+      return { sql, warnings: [], rowCount: null, limited: false };
+    }
+    const parsed = parseSelect(sql);
+    // Row counts only matter for tables the index metadata knows; collected
+    // statistics save the sys.partitions query
+    let rowCount = null;
+    if (parsed && Array.isArray(this.getIndexes(parsed.tableName))) {
+      const stored = this.getStoredRowCount(databaseName, parsed.tableName);
+      rowCount = Number.isFinite(stored) ? stored : await this.getRowCount(pool, databaseName, parsed.tableName);
+    }
+    const { warnings } = this.analyze(sql, rowCount);
+    if (mode === 'enforce' && warnings.length > 0) {
+      const limited = this.applyTop(sql);
+      if (limited) {
+        return { sql: limited, warnings, rowCount, limited: true };
+      }
+    }
+    return { sql, warnings, rowCount, limited: false };
+  }
+}
+
+module.exports = new QueryGuard();
+module.exports.QUERY_GUARD_TOP = QUERY_GUARD_TOP;
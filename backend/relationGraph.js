@@ -0,0 +1,119 @@
+// Relations indexed in both directions, read from tableRelationGraph.json
+// (written by scripts/relation_graph.py). Answers "which tables reference this
+// table" and join path searches without scanning every table's relations.
+const GRAPH_VERSION = 1;
+const JOIN_PATH_MAX_DEPTH = 6;
+const JOIN_PATH_LIMIT = 5;
+
+class RelationGraph {
+  constructor() {
+    this.tables = new Map();
+  }
+
+  // Use the parsed content of a graph file, replacing the graph loaded before
+  load(graph, filePath) {
+    if (graph.version !== GRAPH_VERSION) {
+      throw new Error(`${filePath} is not a version ${GRAPH_VERSION} relation graph`);
+    }
+    this.tables = new Map(Object.entries(graph.tables));
+  }
+
+  // Check if a graph is loaded
+  isLoaded() {
+    return this.tables.size > 0;
+  }
+
+  // Get the node of a table (case-insensitive): { name, forward, reverse }
+  getNode(tableName) {
+    return this.tables.get(tableName.toLowerCase());
+  }
+
+  // Relations of other tables that point to this table
+  getReverseRelations(tableName) {
+    return this.getNode(tableName)?.reverse || [];
+  }
+
+  // Edges leaving a node in the given direction: 'forward', 'reverse' or 'both'
+  *edges(node, direction) {
+    if (direction !== 'reverse') {
+      for (const relation of node.forward) {
+        yield { relation, direction: 'forward' };
+      }
+    }
+    if (direction !== 'forward') {
+      for (const relation of node.reverse) {
+        yield { relation, direction: 'reverse' };
+      }
+    }
+  }
+
+  // Find the shortest join paths between two tables with a breadth-first search.
+  // Returns up to limit paths, each a list of steps
+  // { fromTable, toTable, relation, direction, constraints }; [] if none is found.
+  findJoinPaths(fromTable, toTable, { maxDepth = JOIN_PATH_MAX_DEPTH, limit = JOIN_PATH_LIMIT, direction = 'both' } = {}) {
+    const start = fromTable.toLowerCase();
+    const goal = toTable.toLowerCase();
+    if (!this.tables.has(start) || !this.tables.has(goal)) {
+      return [];
+    }
+    if (start === goal) {
+      return [[]];
+    }
+
+    // Every node remembers all edges reaching it on its shortest level
+    const depths = new Map([[start, 0]]);
+    const parents = new Map();
+    let frontier = [start];
+
+    for (let depth = 1; depth <= maxDepth && frontier.length > 0 && !depths.has(goal); depth++) {
+      const next = [];
+      for (const key of frontier) {
+        const node = this.tables.get(key);
+        for (const edge of this.edges(node, direction)) {
+          // Older graph files can hold relations without a related table
+          const target = edge.relation.relatedTable ? edge.relation.relatedTable.toLowerCase() : null;
+          if (!target || !this.tables.has(target)) {
+            continue;
+          }
+          if (!depths.has(target)) {
+            depths.set(target, depth);
+            parents.set(target, []);
+            next.push(target);
+          }
+          if (depths.get(target) === depth) {
+            parents.get(target).push({ from: key, ...edge });
+          }
+        }
+      }
+      frontier = next;
+    }
+
+    if (!depths.has(goal)) {
+      return [];
+    }
+
+    const paths = [];
+    const walk = (key, steps) => {
+      if (key === start) {
+        paths.push(steps);
+        return;
+      }
+      for (const parent of parents.get(key)) {
+        if (paths.length >= limit) {
+          return;
+        }
+        walk(parent.from, [{
+          fromTable: this.tables.get(parent.from).name,
+          toTable: this.tables.get(key).name,
+          relation: parent.relation.name,
+          direction: parent.direction,
+          constraints: parent.relation.constraints
+        }, ...steps]);
+      }
+    };
+    walk(goal, []);
+    return paths;
+  }
+}
+
+module.exports = new RelationGraph();
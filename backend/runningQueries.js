@@ -0,0 +1,96 @@
+const crypto = require('crypto');
+
+// Queries currently executing through /api/query, by id, so they can be listed
+// and cancelled on SQL Server: on request, when their statement timeout passes,
+// or when the HTTP client disconnects before the response is complete.
+const QUERY_TIMEOUT_MS = parseInt(process.env.QUERY_TIMEOUT_MS, 10) || 5 * 60 * 1000;
+const QUERY_MAX_TIMEOUT_MS = Math.max(parseInt(process.env.QUERY_MAX_TIMEOUT_MS, 10) || 30 * 60 * 1000, QUERY_TIMEOUT_MS);
+// Client supplied ids are echoed in headers and logs, so keep them short and plain
+const QUERY_ID_PATTERN = /^[A-Za-z0-9_-]{1,64}$/;
+
+class RunningQueries {
+  constructor() {
+    this.queries = new Map();
+  }
+
+  // Check if a client supplied query id can be used
+  isValidId(queryId) {
+    return typeof queryId === 'string' && QUERY_ID_PATTERN.test(queryId);
+  }
+
+  // Statement timeout of a query: the requested one, capped at QUERY_MAX_TIMEOUT_MS
+  resolveTimeout(timeoutMs) {
+    const requested = parseInt(timeoutMs, 10);
+    return requested > 0 ? Math.min(requested, QUERY_MAX_TIMEOUT_MS) : QUERY_TIMEOUT_MS;
+  }
+
+  // Check if a query with this id is running
+  has(queryId) {
+    return this.queries.has(queryId);
+  }
+
+  // Track a driver request and cancel it once its timeout passes; returns the entry.
+  // The request may be null while the query is being prepared and set on the entry later
+  register(request, { queryId, database, sql, timeoutMs }) {
+    const id = queryId || crypto.randomUUID();
+    const entry = {
+      id,
+      request,
+      database,
+      sql,
+      startedAt: Date.now(),
+      timeoutMs: this.resolveTimeout(timeoutMs),
+      reason: null
+    };
+    entry.timer = setTimeout(() => this.cancel(id, 'timeout'), entry.timeoutMs);
+    entry.timer.unref();
+    this.queries.set(id, entry);
+    return entry;
+  }
+
+  // Stop tracking a query once its response is complete
+  unregister(id) {
+    const entry = this.queries.get(id);
+    if (entry) {
+      clearTimeout(entry.timer);
+      this.queries.delete(id);
+    }
+  }
+
+  // Cancel a running query; the reason ('cancelled', 'timeout' or 'disconnected')
+  // tells its handler how to report the resulting error
+  cancel(id, reason = 'cancelled') {
+    const entry = this.queries.get(id);
+    if (!entry || entry.reason) {
+      return false;
+    }
+    entry.reason = reason;
+    clearTimeout(entry.timer);
+    if (entry.request) {
+      entry.request.cancel();
+    }
+    return true;
+  }
+
+  // Running queries, oldest first
+  list() {
+    const now = Date.now();
+    return [...this.queries.values()].map(({ id, database, sql, startedAt, timeoutMs, reason }) => ({
+      id,
+      database,
+      sql,
+      startedAt: new Date(startedAt).toISOString(),
+      elapsedMs: now - startedAt,
+      timeoutMs,
+      cancelling: Boolean(reason)
+    }));
+  }
+
+  get size() {
+    return this.queries.size;
+  }
+}
+
+module.exports = new RunningQueries();
+module.exports.QUERY_TIMEOUT_MS = QUERY_TIMEOUT_MS;
+module.exports.QUERY_MAX_TIMEOUT_MS = QUERY_MAX_TIMEOUT_MS;
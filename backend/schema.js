@@ -0,0 +1,433 @@
+const fs = require('fs');
+const path = require('path');
+const DatabaseCache = require('./cache');
+const Pools = require('./pool');
+const Metrics = require('./metrics');
+const logger = require('./logger');
+
+// Table/column schemas of each database, cached in DatabaseCache and kept fresh
+// by comparing sys.tables modify_date: only tables that were created or altered
+// since the last load are read again from INFORMATION_SCHEMA. Schemas are saved
+// to disk so a restarted server answers /api/tables without going cold.
+// Columns of tables found in the extracted field metadata (tableSchema.json or
+// tableMetadata.bin) come from memory; INFORMATION_SCHEMA is only read for the rest.
+// Clients that only need names use the sys.tables listing and load the columns
+// of single tables on demand; those are cached until the table's modify_date changes.
+const SCHEMA_CACHE_TTL_MS = parseInt(process.env.SCHEMA_CACHE_TTL_MS, 10) || 5 * 60 * 1000;
+const SCHEMA_REFRESH_INTERVAL_MS = parseInt(process.env.SCHEMA_REFRESH_INTERVAL_MS, 10) || 10 * 60 * 1000;
+const SCHEMA_CACHE_DIR = process.env.SCHEMA_CACHE_DIR || path.join(__dirname, 'resources', 'cache');
+// Above this many changed tables a single full load is cheaper than a filtered one
+const PARTIAL_LOAD_LIMIT = 1000;
+// SQL Server column types of the AxTable field base types
+const BASE_TYPE_SQL = {
+  String: 'nvarchar',
+  Int: 'int',
+  Int64: 'bigint',
+  Real: 'numeric',
+  Date: 'datetime',
+  UtcDateTime: 'datetime',
+  Time: 'int',
+  Enum: 'int',
+  Guid: 'uniqueidentifier',
+  Container: 'varbinary'
+};
+
+class SchemaManager {
+  constructor() {
+    this.versions = new Map();
+    this.refreshing = new Map();
+    this.listings = new Map();
+    this.listing = new Map();
+    this.columns = new Map();
+    this.refreshTimer = null;
+    this.getColumnIndexes = () => undefined;
+    this.getTableSchema = () => undefined;
+    this.onChange = () => {};
+  }
+
+  // Set how column index info and extracted table fields are looked up and what to
+  // do when a schema changes, restore persisted schemas and start the background refresh
+  configure({ getColumnIndexes, getTableSchema, onChange }) {
+    this.getColumnIndexes = getColumnIndexes || this.getColumnIndexes;
+    this.getTableSchema = getTableSchema || this.getTableSchema;
+    this.onChange = onChange || this.onChange;
+    this.loadPersisted();
+    if (!this.refreshTimer) {
+      this.refreshTimer = setInterval(() => this.refreshAll(), SCHEMA_REFRESH_INTERVAL_MS);
+      this.refreshTimer.unref();
+    }
+  }
+
+  // Get the tables of a database; cached schemas older than the TTL are returned
+  // as they are and checked for changes in the background
+  async getTables(databaseName) {
+    const cached = DatabaseCache.getTables(databaseName);
+    if (!cached) {
+      return this.refresh(databaseName);
+    }
+    if (Date.now() - DatabaseCache.getTimestamp(databaseName) > SCHEMA_CACHE_TTL_MS) {
+      this.refresh(databaseName).catch((err) => {
+        logger.error(`Background schema refresh failed for database ${databaseName}:`, err.message);
+      });
+    }
+    return cached;
+  }
+
+  // Get the table names of a database, optionally filtered by a case-insensitive
+  // prefix or substring and paged with offset/limit
+  async listTables(databaseName, { search, prefix, offset = 0, limit } = {}) {
+    const { names } = await this.getListing(databaseName);
+    let matches = names;
+    if (prefix) {
+      const lowerPrefix = prefix.toLowerCase();
+      matches = matches.filter((name) => name.toLowerCase().startsWith(lowerPrefix));
+    }
+    if (search) {
+      const lowerSearch = search.toLowerCase();
+      matches = matches.filter((name) => name.toLowerCase().includes(lowerSearch));
+    }
+    return {
+      total: matches.length,
+      offset,
+      names: matches.slice(offset, limit ? offset + limit : undefined)
+    };
+  }
+
+  // Get one table with its columns, or undefined if the database has no such table
+  async getTableColumns(databaseName, tableName) {
+    if (DatabaseCache.hasTables(databaseName)) {
+      const table = DatabaseCache.findTable(databaseName, tableName);
+      if (table) {
+        return table;
+      }
+    }
+
+    const listing = await this.getListing(databaseName);
+    const name = listing.lookup.get(tableName.toLowerCase());
+    if (!name) {
+      return undefined;
+    }
+    if (!this.columns.has(databaseName)) {
+      this.columns.set(databaseName, new Map());
+    }
+    const columns = this.columns.get(databaseName);
+    const key = name.toLowerCase();
+    if (!columns.has(key)) {
+      // Cache the pending read so concurrent requests for a table share it
+      const loading = Pools.getPool(databaseName)
+        .then((pool) => this.loadTables(pool, databaseName, [name]))
+        .then(([table]) => table || { name, columns: [] });
+      loading.catch(() => columns.delete(key));
+      columns.set(key, { table: loading, modified: listing.versions.get(name) });
+    }
+    return columns.get(key).table;
+  }
+
+  // Get the sys.tables listing of a database, read again once SCHEMA_CACHE_TTL_MS passed;
+  // concurrent calls share one read
+  getListing(databaseName) {
+    const listing = this.listings.get(databaseName);
+    if (listing && Date.now() - listing.timestamp <= SCHEMA_CACHE_TTL_MS) {
+      return Promise.resolve(listing);
+    }
+    const key = databaseName.toLowerCase();
+    if (!this.listing.has(key)) {
+      const loading = Pools.getPool(databaseName)
+        .then((pool) => this.readVersions(pool))
+        .then((versions) => this.setListing(databaseName, versions))
+        .finally(() => this.listing.delete(key));
+      this.listing.set(key, loading);
+    }
+    return this.listing.get(key);
+  }
+
+  // Store the sys.tables listing of a database and drop the cached columns of
+  // tables that were altered or dropped since they were read
+  setListing(databaseName, versions) {
+    const names = [...versions.keys()];
+    const listing = {
+      versions,
+      names,
+      lookup: new Map(names.map((name) => [name.toLowerCase(), name])),
+      timestamp: Date.now()
+    };
+    this.listings.set(databaseName, listing);
+
+    const columns = this.columns.get(databaseName);
+    if (columns) {
+      for (const [key, entry] of columns) {
+        const name = listing.lookup.get(key);
+        if (!name || versions.get(name) !== entry.modified) {
+          columns.delete(key);
+        }
+      }
+    }
+    return listing;
+  }
+
+  // Bring the cached schema of a database up to date; concurrent calls share one refresh
+  refresh(databaseName) {
+    const key = databaseName.toLowerCase();
+    if (!this.refreshing.has(key)) {
+      const refreshing = this.loadChanges(databaseName).finally(() => this.refreshing.delete(key));
+      this.refreshing.set(key, refreshing);
+    }
+    return this.refreshing.get(key);
+  }
+
+  // Check every cached database for changes
+  async refreshAll() {
+    for (const databaseName of [...this.versions.keys()]) {
+      try {
+        await this.refresh(databaseName);
+      } catch (err) {
+        logger.error(`Background schema refresh failed for database ${databaseName}:`, err.message);
+      }
+    }
+  }
+
+  // Reload the tables whose modify_date changed and drop the ones that are gone
+  async loadChanges(databaseName) {
+    const pool = await Pools.getPool(databaseName);
+    const versions = await this.readVersions(pool);
+    this.setListing(databaseName, versions);
+    const previous = DatabaseCache.hasTables(databaseName) ? this.versions.get(databaseName) : undefined;
+    const cachedTables = DatabaseCache.peekTables(databaseName) || [];
+
+    const changed = [];
+    for (const [name, modified] of versions) {
+      if (!previous || previous.get(name) !== modified) {
+        changed.push(name);
+      }
+    }
+    const removed = previous ? [...previous.keys()].filter((name) => !versions.has(name)) : [];
+
+    if (previous && changed.length === 0 && removed.length === 0) {
+      DatabaseCache.touch(databaseName);
+      return cachedTables;
+    }
+
+    const partial = previous && changed.length <= PARTIAL_LOAD_LIMIT;
+    const loaded = await this.loadTables(pool, databaseName, partial ? changed : [...versions.keys()]);
+    const byName = new Map(partial ? cachedTables.map((table) => [table.name, table]) : []);
+    for (const name of changed) {
+      byName.delete(name);
+    }
+    for (const table of loaded) {
+      byName.set(table.name, table);
+    }
+
+    // Keep the order of sys.tables (ORDER BY name) like a full load
+    const tables = [...versions.keys()].filter((name) => byName.has(name)).map((name) => byName.get(name));
+    DatabaseCache.setTables(databaseName, tables);
+    this.versions.set(databaseName, versions);
+    logger.info(previous
+      ? `Schema of ${databaseName} refreshed: ${changed.length} changed, ${removed.length} removed tables`
+      : `Cached ${tables.length} tables for database: ${databaseName}`);
+
+    this.onChange(databaseName);
+    await this.persist(databaseName);
+    return tables;
+  }
+
+  // Read the last modification time of every table
+  async readVersions(pool) {
+    const elapsed = Metrics.startTimer();
+    const result = await pool.request().query(`
+      SELECT name, modify_date
+      FROM sys.tables
+      ORDER BY name
+    `);
+    Metrics.observe('sql_duration_ms', { operation: 'schema_versions' }, elapsed());
+    return new Map(result.recordset.map((row) => [row.name, new Date(row.modify_date).getTime()]));
+  }
+
+  // Get the given tables with their columns, from the field metadata where it has
+  // them and from INFORMATION_SCHEMA otherwise
+  async loadTables(pool, databaseName, tableNames) {
+    const tables = new Map();
+    const missing = [];
+    for (const name of tableNames) {
+      const table = this.tableFromMetadata(name);
+      if (table) {
+        tables.set(name, table);
+      } else {
+        missing.push(name);
+      }
+    }
+
+    if (missing.length > 0) {
+      // A filter on more names than PARTIAL_LOAD_LIMIT is slower than one full read
+      const read = await this.readTables(pool, databaseName, missing.length <= PARTIAL_LOAD_LIMIT ? missing : null);
+      const wanted = new Set(missing);
+      for (const table of read) {
+        if (wanted.has(table.name)) {
+          tables.set(table.name, table);
+        }
+      }
+    }
+    logger.debug(() => `Loaded ${tables.size - missing.length} tables of ${databaseName} from metadata, ` +
+      `${missing.length} from INFORMATION_SCHEMA`);
+    return tableNames.filter((name) => tables.has(name)).map((name) => tables.get(name));
+  }
+
+  // Build a table from its extracted fields, including the system fields, in the
+  // shape readTables returns; undefined if the metadata does not have it
+  tableFromMetadata(tableName) {
+    const schema = this.getTableSchema(tableName);
+    if (!schema || !Array.isArray(schema.fields) || schema.fields.length === 0) {
+      return undefined;
+    }
+    const columnIndexes = this.getColumnIndexes(tableName) || new Map();
+    return {
+      name: tableName,
+      columns: schema.fields.map((field) => {
+        const indexes = columnIndexes.get(field.name.toLowerCase()) || [];
+        return {
+          // Database columns are the upper-cased field names
+          name: field.name.toUpperCase(),
+          type: BASE_TYPE_SQL[field.type] || 'nvarchar',
+          indexInfo: indexes.length > 0 ? indexes : null
+        };
+      })
+    };
+  }
+
+  // Rebuild the cached tables of every database that the reloaded field metadata
+  // describes; tables read from INFORMATION_SCHEMA are kept. Returns the number of
+  // tables rebuilt
+  applyMetadata() {
+    let rebuilt = 0;
+    for (const databaseName of this.versions.keys()) {
+      const tables = DatabaseCache.peekTables(databaseName);
+      if (!tables) {
+        continue;
+      }
+      const updated = tables.map((table) => {
+        const fresh = this.tableFromMetadata(table.name);
+        rebuilt += fresh ? 1 : 0;
+        return fresh || table;
+      });
+      DatabaseCache.setTables(databaseName, updated, DatabaseCache.getTimestamp(databaseName));
+      this.persist(databaseName);
+    }
+    this.columns.clear();
+    return rebuilt;
+  }
+
+  // Read the columns of all tables, or only of the given ones
+  async readTables(pool, databaseName, tableNames) {
+    if (tableNames && tableNames.length === 0) {
+      return [];
+    }
+    const request = pool.request();
+    request.input('database', databaseName);
+    let filter = '';
+    if (tableNames) {
+      tableNames.forEach((name, i) => request.input(`table${i}`, name));
+      filter = `AND t.TABLE_NAME IN (${tableNames.map((_, i) => `@table${i}`).join(', ')})`;
+    }
+
+    const elapsed = Metrics.startTimer();
+    const result = await request.query(`
+      SELECT
+        t.TABLE_NAME as name,
+        c.COLUMN_NAME as column_name,
+        c.DATA_TYPE as data_type
+      FROM INFORMATION_SCHEMA.TABLES t
+      JOIN INFORMATION_SCHEMA.COLUMNS c
+        ON t.TABLE_NAME = c.TABLE_NAME
+      WHERE t.TABLE_TYPE = 'BASE TABLE'
+        AND t.TABLE_CATALOG = @database
+        ${filter}
+      ORDER BY t.TABLE_NAME, c.ORDINAL_POSITION
+    `);
+    Metrics.observe('sql_duration_ms', { operation: 'schema_columns' }, elapsed());
+
+    // Transform the data
+    const tables = [];
+    let currentTable = null;
+    let currentColumnIndexes = new Map();
+
+    for (const row of result.recordset) {
+      if (!currentTable || currentTable.name !== row.name) {
+        if (currentTable) {
+          tables.push(currentTable);
+        }
+        currentTable = {
+          name: row.name,
+          columns: []
+        };
+        currentColumnIndexes = this.getColumnIndexes(row.name) || new Map();
+      }
+
+      // Get index info for this column
+      const columnIndexes = currentColumnIndexes.get(row.column_name.toLowerCase()) || [];
+
+      currentTable.columns.push({
+        name: row.column_name,
+        type: row.data_type,
+        indexInfo: columnIndexes.length > 0 ? columnIndexes : null
+      });
+    }
+
+    if (currentTable) {
+      tables.push(currentTable);
+    }
+    return tables;
+  }
+
+  // File holding the persisted schema of a database
+  cacheFile(databaseName) {
+    return path.join(SCHEMA_CACHE_DIR, `${encodeURIComponent(databaseName)}.json`);
+  }
+
+  // Save the schema of a database, replacing the previous file atomically
+  async persist(databaseName) {
+    const filePath = this.cacheFile(databaseName);
+    const data = JSON.stringify({
+      database: databaseName,
+      timestamp: DatabaseCache.getTimestamp(databaseName),
+      versions: [...this.versions.get(databaseName)],
+      tables: DatabaseCache.peekTables(databaseName)
+    });
+    try {
+      await fs.promises.mkdir(SCHEMA_CACHE_DIR, { recursive: true });
+      await fs.promises.writeFile(`${filePath}.tmp`, data);
+      await fs.promises.rename(`${filePath}.tmp`, filePath);
+    } catch (err) {
+      logger.error(`Error saving schema cache for database ${databaseName}:`, err.message);
+    }
+  }
+
+  // Restore schemas saved by earlier runs; they are checked for changes on first use
+  loadPersisted() {
+    if (!fs.existsSync(SCHEMA_CACHE_DIR)) {
+      return;
+    }
+    for (const fileName of fs.readdirSync(SCHEMA_CACHE_DIR)) {
+      if (!fileName.endsWith('.json')) {
+        continue;
+      }
+      try {
+        const saved = JSON.parse(fs.readFileSync(path.join(SCHEMA_CACHE_DIR, fileName), 'utf8'));
+        DatabaseCache.setTables(saved.database, saved.tables, saved.timestamp);
+        this.versions.set(saved.database, new Map(saved.versions));
+        logger.info(`Restored ${saved.tables.length} cached tables for database: ${saved.database}`);
+      } catch (err) {
+        logger.error(`Error reading schema cache ${fileName}:`, err.message);
+      }
+    }
+  }
+
+  // Forget the schema of a database, in memory and on disk
+  clear(databaseName) {
+    DatabaseCache.clearDatabase(databaseName);
+    this.versions.delete(databaseName);
+    this.listings.delete(databaseName);
+    this.columns.delete(databaseName);
+    fs.promises.unlink(this.cacheFile(databaseName)).catch(() => {});
+  }
+}
+
+module.exports = new SchemaManager();
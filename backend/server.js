@@ -1,14 +1,30 @@
+// Load .env before the modules below read their settings from process.env
+require('dotenv').config();
 const express = require('express');
-const sql = require('mssql/msnodesqlv8');
 const cors = require('cors');
+const logger = require('./logger');
+const Metrics = require('./metrics');
 const DatabaseCache = require('./cache');
-require('dotenv').config();
+const Pools = require('./pool');
+const MetadataStore = require('./metadataStore');
+const Schema = require('./schema');
+const RelationGraph = require('./relationGraph');
+const TableStats = require('./tableStats');
+const QueryCache = require('./queryCache');
+const RunningQueries = require('./runningQueries');
+const QueryGuard = require('./queryGuard');
+const { readJsonFile } = require('./jsonFile');
+const { isCacheableSql } = QueryCache;
+const { QUERY_MAX_ROWS, TIEBREAKER_COLUMN, buildTableQuery, streamQuery, withRowId, createColumnarResult } = require('./query');
 const fs = require('fs');
 const path = require('path');
 
 const app = express();
-app.use(cors());
+app.use(cors({
+  exposedHeaders: ['X-Row-Count', 'X-Truncated', 'X-Next-Key', 'X-Next-RecId', 'X-Cache', 'X-Query-Id', 'X-Query-Warnings', 'X-Query-Limited']
+}));
 app.use(express.json());
+app.use(Metrics.middleware());
 
 // Update database configuration to match working test config
 const config = {
@@ -23,58 +39,221 @@ const config = {
   }
 };
 
-// Load tableIndex.json and store in cache
-const loadTableIndexToCache = () => {
-  const filePath = path.join(__dirname, 'resources', 'tableIndex.json');
-  fs.readFile(filePath, 'utf8', (err, data) => {
-    if (err) {
-      console.error('Error reading tableIndex.json:', err);
+// Share one connection pool per database across all requests
+Pools.configure(config);
+
+// Read a file of backend/resources: { data } once read, { missing: true } if it
+// does not exist or { error } if it cannot be read or parsed
+const readResource = async (fileName, read = readJsonFile) => {
+  try {
+    return { data: await read(path.join(__dirname, 'resources', fileName)) };
+  } catch (err) {
+    return err.code === 'ENOENT' ? { missing: true } : { error: err };
+  }
+};
+
+// Read every metadata file with asynchronous I/O (JSON.parse itself still blocks
+// the event loop while it runs): the binary table metadata first, then the JSON
+// files of the sections it does not carry
+const readMetadata = async () => {
+  const store = await readResource('tableMetadata.bin', (filePath) => MetadataStore.read(filePath));
+  const sections = store.data ? store.data.sections : [];
+  const readSection = (section, fileName) => (sections.includes(section) ? null : readResource(fileName));
+  const [tableIndex, tableRelations, tableSchema, graph, stats] = await Promise.all([
+    readSection('indexes', 'tableIndex.json'),
+    readSection('relations', 'tableRelations.json'),
+    readSection('fields', 'tableSchema.json'),
+    readResource('tableRelationGraph.json'),
+    readResource('tableStats.json')
+  ]);
+  return { store, tableIndex, tableRelations, tableSchema, graph, stats };
+};
+
+// Put one read file in place; a file that could not be read keeps its previous data
+const applyResource = (fileName, result, apply) => {
+  if (!result) {
+    return;
+  }
+  try {
+    if (result.error) {
+      throw result.error;
+    }
+    apply(result.data);
+  } catch (err) {
+    logger.error(`Error loading ${fileName}:`, err);
+  }
+};
+
+// Swap the read metadata in, synchronously, so no request sees a mix of old and new files
+const applyMetadataFiles = ({ store, tableIndex, tableRelations, tableSchema, graph, stats }) => {
+  applyResource('tableMetadata.bin', store, (opened) => {
+    if (opened) {
+      MetadataStore.use(opened);
+      logger.info(`Table metadata store opened with ${MetadataStore.size} tables.`);
+    } else if (MetadataStore.isOpen()) {
+      // Removed since it was opened: fall back to the JSON files
+      MetadataStore.close();
+      logger.info('tableMetadata.bin was removed, table metadata store closed.');
+    }
+  });
+
+  applyResource('tableIndex.json', tableIndex, (tableIndexData) => {
+    if (!tableIndexData) {
+      logger.error('tableIndex.json not found, index metadata is not available.');
+      return;
+    }
+    DatabaseCache.setTables('tableIndex', tableIndexData);
+    logger.info(`Table index data cached successfully (${tableIndexData.length} tables).`);
+  });
+
+  applyResource('tableRelations.json', tableRelations, (tableRelationData) => {
+    if (!tableRelationData) {
+      logger.error('tableRelations.json not found, relation metadata is not available.');
+      return;
+    }
+    DatabaseCache.setTables('tableRelation', tableRelationData);
+    logger.info('Table relation data cached successfully.');
+  });
+
+  applyResource('tableSchema.json', tableSchema, (tableSchemaData) => {
+    if (!tableSchemaData) {
+      logger.info('tableSchema.json not found, table columns are read from INFORMATION_SCHEMA.');
       return;
     }
-    try {
-      const tableIndexData = JSON.parse(data);
-      DatabaseCache.setTables('tableIndex', tableIndexData);
-      console.log('Table index data cached successfully.');
-      console.log('Available tables in cache:', tableIndexData.map(table => table.tableName));
-    } catch (parseErr) {
-      console.error('Error parsing tableIndex.json:', parseErr);
+    DatabaseCache.setTables('tableSchema', tableSchemaData);
+    logger.info(`Table schema data cached successfully (${tableSchemaData.length} tables).`);
+  });
+
+  applyResource('tableRelationGraph.json', graph, (graphData) => {
+    if (graphData) {
+      RelationGraph.load(graphData, 'tableRelationGraph.json');
+      logger.info(`Relation graph loaded with ${RelationGraph.tables.size} tables.`);
+    }
+  });
+
+  applyResource('tableStats.json', stats, (statsData) => {
+    if (statsData) {
+      TableStats.load(statsData, 'tableStats.json');
+      logger.info(`Table statistics of ${TableStats.database} loaded (${TableStats.size} tables, collected ${TableStats.collectedAt}).`);
     }
   });
 };
 
-// Call the function to load table index data into cache
-loadTableIndexToCache();
+// Load the metadata files; the server starts listening once they are in place
+const loadMetadata = async () => applyMetadataFiles(await readMetadata());
+const metadataLoaded = loadMetadata();
+
+// Files written by the extractor; a change to any of them triggers a reload
+// when METADATA_WATCH is set
+const METADATA_FILES = ['tableMetadata.bin', 'tableIndex.json', 'tableRelations.json', 'tableSchema.json', 'tableRelationGraph.json', 'tableStats.json'];
+const METADATA_WATCH = process.env.METADATA_WATCH === 'true';
+const METADATA_WATCH_DEBOUNCE_MS = parseInt(process.env.METADATA_WATCH_DEBOUNCE_MS, 10) || 1000;
+
+// Load every metadata file again after it was regenerated, e.g. by
+// scripts/watch_metadata.py. The extractor replaces the files atomically; they are
+// read without blocking I/O, parsed and then swapped in together, so requests are
+// answered from the previous metadata until the new one is in place. A file that
+// cannot be read keeps its previous data, a removed tableMetadata.bin is closed.
+const reloadMetadata = async (trigger) => {
+  const elapsed = Metrics.startTimer();
+  await loadMetadata();
+  const rebuiltTables = Schema.applyMetadata();
+  const durationMs = Math.round(elapsed());
+  Metrics.increment('metadata_reloads_total', { trigger });
+  logger.info(`Metadata reloaded (${trigger}) in ${durationMs} ms, ${rebuiltTables} cached tables rebuilt.`);
+  return { durationMs, rebuiltTables, metadataStore: MetadataStore.getStats() };
+};
 
-// Load tableRelation.json and store in cache
-const loadTableRelationToCache = () => {
-  const filePath = path.join(__dirname, 'resources', 'tableRelations.json');
-  fs.readFile(filePath, 'utf8', (err, data) => {
-    if (err) {
-      console.error('Error reading tableRelations.json:', err);
+// Reload the metadata shortly after the extractor has written its files; the
+// extractor writes several of them in a row, so changes are batched
+const watchMetadata = () => {
+  const resourcesDir = path.join(__dirname, 'resources');
+  if (!fs.existsSync(resourcesDir)) {
+    logger.warn('METADATA_WATCH is set but backend/resources does not exist.');
+    return;
+  }
+  let timer = null;
+  fs.watch(resourcesDir, (eventType, fileName) => {
+    if (!METADATA_FILES.includes(fileName)) {
       return;
     }
-    try {
-      const tableRelationData = JSON.parse(data);
-      DatabaseCache.setTables('tableRelation', tableRelationData);
-      console.log('Table relation data cached successfully.');
-    } catch (parseErr) {
-      console.error('Error parsing tableRelations.json:', parseErr);
-    }
+    clearTimeout(timer);
+    timer = setTimeout(() => {
+      reloadMetadata('watch').catch((err) => logger.error('Metadata reload error:', err));
+    }, METADATA_WATCH_DEBOUNCE_MS);
   });
+  logger.info('Watching backend/resources for metadata changes.');
 };
 
-// Call the function to load table relation data into cache
-loadTableRelationToCache();
+if (METADATA_WATCH) {
+  watchMetadata();
+}
+
+// Check if index or relation metadata is available from the store or the JSON cache
+const hasTableMetadata = (cacheKey, section) => {
+  return MetadataStore.hasSection(section) || Boolean(DatabaseCache.getTables(cacheKey));
+};
 
-// Ensure case-insensitive comparisons
-const caseInsensitiveFind = (array, key, value) => {
-  return array.find(item => item[key].toLowerCase() === value.toLowerCase());
+// Find the metadata of a table, e.g. { tableName, indexes }, from the store or the JSON cache
+const findTableMetadata = (cacheKey, section, tableName) => {
+  if (MetadataStore.hasSection(section)) {
+    const record = MetadataStore.getTable(tableName);
+    return record && record[section] ? { tableName: record.tableName, [section]: record[section] } : undefined;
+  }
+  return DatabaseCache.findTable(cacheKey, tableName);
 };
 
+const findTableIndex = (tableName) => findTableMetadata('tableIndex', 'indexes', tableName);
+
+// Get the precomputed column -> indexes map of a table
+const getColumnIndexes = (tableName) => {
+  if (MetadataStore.hasSection('indexes')) {
+    return MetadataStore.getColumnIndexes(tableName);
+  }
+  return DatabaseCache.getColumnIndexes('tableIndex', tableName);
+};
+const findTableRelation = (tableName) => findTableMetadata('tableRelation', 'relations', tableName);
+const findTableSchema = (tableName) => findTableMetadata('tableSchema', 'fields', tableName);
+
+// Headers reporting the query guard's findings on a /api/query response
+const guardHeaders = ({ warnings, limited, sql }) => {
+  const headers = {};
+  for (const { code } of warnings) {
+    Metrics.increment('query_guard_warnings_total', { code });
+  }
+  if (warnings.length > 0) {
+    logger.debug(() => ['Query guard warnings:', warnings.map(warning => warning.message)]);
+    headers['X-Query-Warnings'] = encodeURIComponent(JSON.stringify(warnings));
+  }
+  if (limited) {
+    logger.info('Query guard added a TOP limit:', sql);
+    headers['X-Query-Limited'] = String(QueryGuard.QUERY_GUARD_TOP);
+  }
+  return headers;
+};
+
+// Most tables accepted by one /api/table-metadata request
+const TABLE_METADATA_BATCH_LIMIT = 500;
+
+// Check queries against the extracted indexes before they run
+QueryGuard.configure({
+  getIndexes: (tableName) => findTableIndex(tableName)?.indexes,
+  getStoredRowCount: (databaseName, tableName) => TableStats.getRowCount(databaseName, tableName)
+});
+
+// Restore saved schemas and keep them in sync with the databases; cached query
+// results of a database are dropped whenever its schema changes
+Schema.configure({
+  getColumnIndexes,
+  getTableSchema: findTableSchema,
+  onChange: (databaseName) => QueryCache.clear(databaseName)
+});
+
 // API endpoint to get databases
 app.get('/api/databases', async (req, res) => {
   try {
-    const pool = await sql.connect(config);
+    const pool = await Pools.getPool();
+    const elapsed = Metrics.startTimer();
     const result = await pool.request()
       .query(`
         SELECT 
@@ -85,177 +264,350 @@ app.get('/api/databases', async (req, res) => {
           AND state_desc = 'ONLINE'
         ORDER BY name
       `);
-    console.log('Available databases:', result.recordset);
+    Metrics.observe('sql_duration_ms', { operation: 'databases' }, elapsed());
+    logger.debug(() => ['Available databases:', result.recordset]);
     res.json(result.recordset);
   } catch (err) {
-    console.error('Database Error:', err);
+    logger.error('Database Error:', err);
     res.status(500).json({ error: err.message });
   }
 });
 
 // API endpoint to get tables for a database
+// Cached schemas are served at once and checked for changes once SCHEMA_CACHE_TTL_MS passed
 app.get('/api/tables/:database', async (req, res) => {
   const dbName = req.params.database;
-  console.log('Fetching tables for database:', dbName);
+  logger.debug('Fetching tables for database:', dbName);
   
   try {
-    // Check cache first
-    const cachedTables = DatabaseCache.getTables(dbName);
-    if (cachedTables) {
-      console.log('Returning cached tables for:', dbName);
-      return res.json(cachedTables);
-    }
-
-    // If not in cache, fetch from database
-    const dbConfig = {
-      ...config,
-      database: dbName
-    };
-
-    const pool = await sql.connect(dbConfig);
-    
-    const result = await pool.request().query(`
-      SELECT 
-        t.TABLE_NAME as name,
-        c.COLUMN_NAME as column_name,
-        c.DATA_TYPE as data_type
-      FROM INFORMATION_SCHEMA.TABLES t
-      JOIN INFORMATION_SCHEMA.COLUMNS c 
-        ON t.TABLE_NAME = c.TABLE_NAME
-      WHERE t.TABLE_TYPE = 'BASE TABLE'
-        AND t.TABLE_CATALOG = '${dbName}'
-      ORDER BY t.TABLE_NAME, c.ORDINAL_POSITION
-    `);
-
-    // Transform the data
-    const tables = [];
-    let currentTable = null;
-
-    // Get index information from cache
-    const tableIndexData = DatabaseCache.getTables('tableIndex');
-    const indexLookup = new Map();
-    
-    if (tableIndexData) {
-      for (const table of tableIndexData) {
-        indexLookup.set(table.tableName.toLowerCase(), table.indexes || []);
-      }
-    }
+    const tables = await Schema.getTables(dbName);
+    res.json(tables);
+  } catch (err) {
+    logger.error('Error:', err);
+    res.status(500).json({ error: err.message });
+  }
+});
 
-    for (const row of result.recordset) {
-      if (!currentTable || currentTable.name !== row.name) {
-        if (currentTable) {
-          tables.push(currentTable);
-        }
-        currentTable = {
-          name: row.name,
-          columns: []
-        };
-      }
+// API endpoint to list the table names of a database without their columns
+// Query: optional search (substring), prefix, offset and limit; responds with { total, offset, names }
+app.get('/api/tables/:database/names', async (req, res) => {
+  const dbName = req.params.database;
+  const { search, prefix } = req.query;
+  logger.debug('Listing table names for database:', dbName);
 
-      // Get index info for this column
-      const tableIndexes = indexLookup.get(row.name.toLowerCase()) || [];
-      const columnIndexes = tableIndexes.filter(index => 
-        index.columns.map(c => c.toLowerCase()).includes(row.column_name.toLowerCase())
-      );
+  try {
+    const listing = await Schema.listTables(dbName, {
+      search: typeof search === 'string' ? search : undefined,
+      prefix: typeof prefix === 'string' ? prefix : undefined,
+      offset: Math.max(parseInt(req.query.offset, 10) || 0, 0),
+      limit: Math.max(parseInt(req.query.limit, 10) || 0, 0)
+    });
+    res.json(listing);
+  } catch (err) {
+    logger.error('Error:', err);
+    res.status(500).json({ error: err.message });
+  }
+});
 
-      currentTable.columns.push({
-        name: row.column_name,
-        type: row.data_type,
-        indexInfo: columnIndexes.length > 0 ? columnIndexes : null
-      });
-    }
+// API endpoint to get the columns of one table, loaded on first use and cached
+// until the table is altered
+app.get('/api/tables/:database/:tableName/columns', async (req, res) => {
+  const { database, tableName } = req.params;
+  logger.debug(`Fetching columns of ${tableName} in database:`, database);
 
-    if (currentTable) {
-      tables.push(currentTable);
+  try {
+    const table = await Schema.getTableColumns(database, tableName);
+    if (!table) {
+      return res.status(404).json({ error: 'Table not found' });
     }
+    res.json(table);
+  } catch (err) {
+    logger.error('Error:', err);
+    res.status(500).json({ error: err.message });
+  }
+});
 
-    // Store in cache
-    DatabaseCache.setTables(dbName, tables);
-    console.log(`Cached ${tables.length} tables for database:`, dbName);
+// API endpoint to reload the changed tables of a database right away
+app.post('/api/tables/:database/refresh', async (req, res) => {
+  const dbName = req.params.database;
+  logger.info('Refreshing tables for database:', dbName);
 
+  try {
+    const tables = await Schema.refresh(dbName);
     res.json(tables);
   } catch (err) {
-    console.error('Error:', err);
+    logger.error('Error:', err);
+    res.status(500).json({ error: err.message });
+  }
+});
+
+// API endpoint to reload the metadata files without restarting, called by
+// scripts/watch_metadata.py after it regenerated them
+app.post('/api/metadata/reload', async (req, res) => {
+  try {
+    res.json(await reloadMetadata('api'));
+  } catch (err) {
+    logger.error('Metadata reload error:', err);
     res.status(500).json({ error: err.message });
   }
 });
 
 // API endpoint to execute queries
+// Results are read through row events and capped at QUERY_MAX_ROWS (or maxRows).
+// Table queries can be paged with pageSize plus page (OFFSET/FETCH) or afterKey
+// and afterRecId (keyset on orderByColumn and RECID, from X-Next-Key and
+// X-Next-RecId). With stream: true rows are sent as NDJSON while they arrive,
+// followed by a summary line { done, rowCount, truncated }.
+// With format: 'columnar' the column names are sent once and rows as value arrays
+// without an id: { columns, rows } (streamed: a { columns } line, then one array
+// per line).
+// When QUERY_CACHE_ENABLED is set, non-streamed read queries are served from the
+// result cache unless noCache is true; X-Cache tells whether it was a HIT or MISS.
+// Every query gets an id (the client's queryId if valid, sent back in X-Query-Id) to
+// cancel it with DELETE /api/query/:queryId, and is cancelled after timeoutMs
+// (default QUERY_TIMEOUT_MS) or when the client disconnects.
+// Likely table scans are reported in X-Query-Warnings (URI-encoded JSON); with
+// guard 'enforce' (or QUERY_GUARD_MODE=enforce) such queries get a TOP limit,
+// announced in X-Query-Limited. A request can make the guard stricter than
+// QUERY_GUARD_MODE, but not turn it off.
 app.post('/api/query', async (req, res) => {
-  const { database, rawQuery, tableName, whereColumn, whereValue, orderByColumn, orderDirection } = req.body;
+  const { database, rawQuery, tableName, orderByColumn, stream, noCache, queryId, timeoutMs } = req.body;
+  const columnar = req.body.format === 'columnar';
+  let running = null;
+
+  if (queryId !== undefined && !RunningQueries.isValidId(queryId)) {
+    return res.status(400).json({ error: 'queryId must be 1-64 letters, digits, - or _' });
+  }
+  if (queryId !== undefined && RunningQueries.has(queryId)) {
+    return res.status(409).json({ error: `Query ${queryId} is already running` });
+  }
+
+  // Stop the query on SQL Server when the client goes away before the response is complete
+  res.on('close', () => {
+    if (running && !res.writableFinished) {
+      RunningQueries.cancel(running.id, 'disconnected');
+    }
+  });
   
+  // Registered before any SQL runs, so the query can be cancelled while the pool
+  // connects or the guard checks it; the driver request is attached once created
+  running = RunningQueries.register(null, { queryId, database, sql: rawQuery || null, timeoutMs });
+  res.setHeader('X-Query-Id', running.id);
+
   try {
-    console.log('Executing query with params:', { database, rawQuery, tableName });
+    logger.debug('Executing query with params:', { database, rawQuery, tableName });
     
-    const pool = await sql.connect({
-      ...config,
-      database: database
-    });
+    const pool = await Pools.getPool(database);
 
     let query;
-    let request = pool.request();
+    let pageSize = 0;
+    const request = pool.request();
+    running.request = request;
 
     if (rawQuery) {
       // Use the raw SQL query if provided
       query = rawQuery;
-      console.log('Executing raw SQL:', query);
+      logger.debug('Executing raw SQL:', query);
     } else {
       // Build query from filters
-      query = `SELECT * FROM [${tableName}]`;
-      
-      if (whereColumn && whereValue) {
-        query += ` WHERE [${whereColumn}] = @whereValue`;
-        request.input('whereValue', whereValue);
+      ({ query, pageSize } = buildTableQuery(request, req.body));
+      logger.debug('Executing built SQL:', query);
+    }
+
+    const requestedRows = pageSize || parseInt(req.body.maxRows, 10) || QUERY_MAX_ROWS;
+    const maxRows = Math.min(requestedRows, QUERY_MAX_ROWS);
+    const route = '/api/query';
+
+    // Cached results are looked up before the guard, which may query row counts; the
+    // key holds the SQL before the guard and the guard mode, which decides about TOP
+    const useCache = !stream && QueryCache.enabled && !noCache && isCacheableSql(query);
+    const cacheKey = useCache
+      ? QueryCache.key(database, query, {
+        whereValue: req.body.whereValue,
+        afterKey: req.body.afterKey,
+        afterRecId: req.body.afterRecId,
+        maxRows,
+        columnar,
+        guard: QueryGuard.resolveMode(req.body.guard)
+      })
+      : null;
+    if (useCache) {
+      const cached = QueryCache.get(cacheKey);
+      if (cached) {
+        logger.debug('Query served from result cache');
+        Metrics.increment('rows_returned_total', { route }, Number(cached.headers['X-Row-Count']) || 0);
+        res.set({ ...cached.headers, 'X-Cache': 'HIT' });
+        res.type('json').send(cached.body);
+        return;
       }
-      
-      if (orderByColumn) {
-        query += ` ORDER BY [${orderByColumn}] ${orderDirection || 'ASC'}`;
+    }
+
+    const guard = await QueryGuard.check(pool, database, query, req.body.guard);
+    query = guard.sql;
+    const headers = guardHeaders(guard);
+
+    running.sql = query;
+    // The query may have been cancelled, timed out or lost its client meanwhile
+    if (running.reason) {
+      throw new Error(`Query ${running.reason} before it was executed`);
+    }
+
+    if (stream) {
+      res.set(headers);
+      res.setHeader('Content-Type', 'application/x-ndjson');
+      const elapsed = Metrics.startTimer();
+      let serializeMs = 0;
+      let columns = null;
+      // Pause the driver while the socket buffer is full, with a single drain listener
+      let paused = false;
+      res.on('drain', () => {
+        if (paused) {
+          paused = false;
+          request.resume();
+        }
+      });
+      const { rowCount, truncated } = await streamQuery(request, query, {
+        maxRows,
+        onColumns: columnar
+          ? (names) => {
+            columns = names;
+            res.write(`${JSON.stringify({ columns })}\n`);
+          }
+          : undefined,
+        onRow: (row, index) => {
+          const serialized = Metrics.startTimer();
+          const line = columnar
+            ? JSON.stringify((columns || Object.keys(row)).map((column) => row[column]))
+            : JSON.stringify(withRowId(row, index));
+          if (!res.write(`${line}\n`) && !paused) {
+            paused = true;
+            request.pause();
+          }
+          serializeMs += serialized();
+        }
+      });
+      // Rows are serialized while the query runs; count that time only once
+      Metrics.observe('sql_duration_ms', { operation: 'query' }, elapsed() - serializeMs);
+      Metrics.observe('serialize_duration_ms', { route }, serializeMs);
+      Metrics.increment('rows_returned_total', { route }, rowCount);
+      logger.debug(`Query streamed ${rowCount} rows${truncated ? ' (truncated)' : ''}`);
+      res.end(`${JSON.stringify({ done: true, rowCount, truncated })}\n`);
+      return;
+    }
+
+    const collector = columnar ? createColumnarResult() : null;
+    const rows = columnar ? collector.result.rows : [];
+    const elapsed = Metrics.startTimer();
+    const { truncated } = await streamQuery(request, query, {
+      maxRows,
+      onColumns: columnar ? collector.onColumns : undefined,
+      onRow: columnar ? collector.onRow : (row, index) => rows.push(withRowId(row, index))
+    });
+    Metrics.observe('sql_duration_ms', { operation: 'query' }, elapsed());
+
+    headers['X-Row-Count'] = String(rows.length);
+    headers['X-Truncated'] = String(truncated);
+    if (truncated && pageSize > 0 && orderByColumn && rows.length > 0) {
+      const lastRow = rows[rows.length - 1];
+      const valueOf = (column) => (columnar ? lastRow[collector.result.columns.indexOf(column)] : lastRow[column]);
+      headers['X-Next-Key'] = JSON.stringify(valueOf(orderByColumn));
+      if (valueOf(TIEBREAKER_COLUMN) !== undefined) {
+        headers['X-Next-RecId'] = JSON.stringify(valueOf(TIEBREAKER_COLUMN));
       }
-      console.log('Executing built SQL:', query);
     }
 
-    const result = await request.query(query);
-    
-    // Ensure we're sending an array
-    const rows = Array.isArray(result.recordset) ? result.recordset : [];
-    
-    // Add row IDs if they don't exist
-    const rowsWithIds = rows.map((row, index) => ({
-      id: index,
-      ...row
-    }));
-
-    console.log(`Query returned ${rowsWithIds.length} rows`);
-    res.json(rowsWithIds);
+    logger.debug(`Query returned ${rows.length} rows${truncated ? ' (truncated)' : ''}`);
+    const serialized = Metrics.startTimer();
+    const body = JSON.stringify(columnar ? collector.result : rows);
+    if (useCache) {
+      QueryCache.set(cacheKey, body, headers);
+      headers['X-Cache'] = 'MISS';
+    }
+    res.set(headers);
+    res.type('json').send(body);
+    Metrics.observe('serialize_duration_ms', { route }, serialized());
+    Metrics.increment('rows_returned_total', { route }, rows.length);
     
   } catch (err) {
-    console.error('Query execution error:', err);
+    const reason = running && running.reason;
+    if (reason) {
+      Metrics.increment('queries_cancelled_total', { reason });
+      logger.info(`Query ${running.id} ${reason === 'timeout' ? `timed out after ${running.timeoutMs} ms` : reason}`);
+    }
+    if (res.writableEnded || res.destroyed) {
+      return;
+    }
+    if (reason) {
+      const error = reason === 'timeout' ? `Query timed out after ${running.timeoutMs} ms` : 'Query cancelled';
+      if (res.headersSent) {
+        res.end(`${JSON.stringify({ error, cancelled: true })}\n`);
+        return;
+      }
+      // 499 is the conventional status of a request abandoned on purpose
+      res.status(reason === 'timeout' ? 408 : 499).json({ error, queryId: running.id, cancelled: true });
+      return;
+    }
+    logger.error('Query execution error:', err);
+    if (res.headersSent) {
+      res.end(`${JSON.stringify({ error: err.message })}\n`);
+      return;
+    }
     res.status(500).json({ 
       error: err.message,
       details: 'Error executing query'
     });
+  } finally {
+    if (running) {
+      RunningQueries.unregister(running.id);
+    }
+    Pools.touch(database);
   }
 });
 
+// API endpoint to check a query without running it; takes the body of /api/query
+// and responds with { sql, warnings, rowCount, limited }
+app.post('/api/query/analyze', async (req, res) => {
+  const { database, rawQuery } = req.body;
+  try {
+    const pool = await Pools.getPool(database);
+    const query = rawQuery || buildTableQuery(pool.request(), req.body).query;
+    res.json(await QueryGuard.check(pool, database, query, req.body.guard === 'enforce' ? 'enforce' : 'warn'));
+  } catch (err) {
+    logger.error('Query analysis error:', err);
+    res.status(500).json({ error: err.message });
+  }
+});
+
+// API endpoint to list the queries currently running
+app.get('/api/queries', (req, res) => {
+  res.json(RunningQueries.list());
+});
+
+// API endpoint to cancel a running query on SQL Server
+app.delete('/api/query/:queryId', (req, res) => {
+  const { queryId } = req.params;
+  if (!RunningQueries.cancel(queryId)) {
+    return res.status(404).json({ error: 'Query not found or already finished' });
+  }
+  logger.info(`Cancelling query ${queryId}`);
+  res.json({ queryId, cancelled: true });
+});
+
 // API endpoint to get indexed columns for a table
 app.get('/api/indexed-columns/:tableName', (req, res) => {
   const tableName = req.params.tableName;
-  console.log('Fetching indexed columns for table:', tableName);
+  logger.debug('Fetching indexed columns for table:', tableName);
 
-  // Retrieve table index data from cache
-  const tableIndexData = DatabaseCache.getTables('tableIndex');
-  if (!tableIndexData) {
-    console.error('Table index data not found in cache');
+  // Retrieve table index data from the metadata store or cache
+  if (!hasTableMetadata('tableIndex', 'indexes')) {
+    logger.warn('Table index data not found in cache');
     return res.status(404).json({ error: 'Table index data not found in cache' });
   }
 
-  // Log available table names in cache
-  console.log('Available tables in cache:', tableIndexData.map(table => table.tableName.toLowerCase()));
-
   // Find the indexed columns for the specified table
-  const tableData = tableIndexData.find(table => table.tableName.toLowerCase() === tableName.toLowerCase());
+  const tableData = findTableIndex(tableName);
   if (!tableData) {
-    console.error('Table not found in index data');
+    logger.debug('Table not found in index data');
     return res.status(404).json({ error: 'Table not found in index data' });
   }
 
@@ -267,17 +619,10 @@ app.get('/api/indexed-columns/:tableName', (req, res) => {
 // API endpoint to get table index information
 app.get('/api/table-index/:tableName', async (req, res) => {
   const { tableName } = req.params;
-  const tableIndexData = DatabaseCache.getTables('tableIndex');
-  
-  if (!tableIndexData) {
-    console.log(`No index information found for table: ${tableName}`);
-    return res.json({ indexes: [] });
-  }
-  
-  const tableData = tableIndexData.find(table => table.tableName.toLowerCase() === tableName.toLowerCase());
+  const tableData = findTableIndex(tableName);
   
   if (!tableData) {
-    console.log(`No index information found for table: ${tableName}`);
+    logger.debug(`No index information found for table: ${tableName}`);
     return res.json({ indexes: [] });
   }
   
@@ -287,24 +632,138 @@ app.get('/api/table-index/:tableName', async (req, res) => {
 // API endpoint to get table relation information
 app.get('/api/table-relation/:tableName', async (req, res) => {
   const { tableName } = req.params;
-  const tableRelationData = DatabaseCache.getTables('tableRelation');
-  
-  if (!tableRelationData) {
-    console.log(`No relation information found for table: ${tableName}`);
-    return res.json({ relations: [] });
-  }
-  
-  const tableData = tableRelationData.find(table => table.tableName.toLowerCase() === tableName.toLowerCase());
+  const tableData = findTableRelation(tableName);
   
   if (!tableData) {
-    console.log(`No relation information found for table: ${tableName}`);
+    logger.debug(`No relation information found for table: ${tableName}`);
     return res.json({ relations: [] });
   }
   
   res.json(tableData);
 });
 
+// API endpoint to get the row count and size of every table of a database, from
+// the collected statistics; empty if none were collected for it
+app.get('/api/table-stats/:database', (req, res) => {
+  res.json(TableStats.summary(req.params.database));
+});
+
+// API endpoint to get the collected statistics of one table, with index usage
+// and fragmentation
+app.get('/api/table-stats/:database/:tableName', (req, res) => {
+  const { database, tableName } = req.params;
+  const stats = TableStats.get(database, tableName);
+  if (!stats) {
+    return res.status(404).json({ error: 'No statistics collected for this table' });
+  }
+  res.json({ ...stats, collectedAt: TableStats.collectedAt });
+});
+
+// API endpoint to get the relations of other tables that point to a table
+app.get('/api/table-relation/:tableName/reverse', (req, res) => {
+  const { tableName } = req.params;
+  if (!RelationGraph.isLoaded()) {
+    logger.warn('Relation graph not loaded');
+    return res.status(404).json({ error: 'Relation graph not loaded' });
+  }
+  res.json({ tableName, relations: RelationGraph.getReverseRelations(tableName) });
+});
+
+// API endpoint to find the shortest join paths between two tables
+// Query: from, to, optional maxDepth, limit and direction ('forward', 'reverse' or 'both')
+app.get('/api/join-path', (req, res) => {
+  const { from, to, direction } = req.query;
+  if (!from || !to) {
+    return res.status(400).json({ error: 'from and to are required' });
+  }
+  if (!RelationGraph.isLoaded()) {
+    logger.warn('Relation graph not loaded');
+    return res.status(404).json({ error: 'Relation graph not loaded' });
+  }
+  const paths = RelationGraph.findJoinPaths(from, to, {
+    maxDepth: parseInt(req.query.maxDepth, 10) || undefined,
+    limit: parseInt(req.query.limit, 10) || undefined,
+    direction: ['forward', 'reverse'].includes(direction) ? direction : 'both'
+  });
+  res.json({ from, to, paths });
+});
+
+// API endpoint to get indexes, indexed columns and relations of several tables at once
+// Body: { tables: [name, ...] }. Responds with an object keyed by the requested names,
+// each holding the payloads of /api/indexed-columns, /api/table-index and /api/table-relation.
+app.post('/api/table-metadata', (req, res) => {
+  const { tables } = req.body;
+  if (!Array.isArray(tables) || tables.some(tableName => typeof tableName !== 'string')) {
+    return res.status(400).json({ error: 'tables must be an array of table names' });
+  }
+  if (tables.length > TABLE_METADATA_BATCH_LIMIT) {
+    return res.status(400).json({ error: `At most ${TABLE_METADATA_BATCH_LIMIT} tables can be requested at once` });
+  }
+
+  const metadata = {};
+  for (const tableName of tables) {
+    const tableIndex = findTableIndex(tableName);
+    const tableRelation = findTableRelation(tableName);
+    metadata[tableName] = {
+      indexedColumns: tableIndex ? tableIndex.indexes.flatMap(index => index.columns) : [],
+      tableIndex: tableIndex || { indexes: [] },
+      tableRelation: tableRelation || { tableName, relations: [] }
+    };
+  }
+  res.json(metadata);
+});
+
+// API endpoint to get query result cache statistics
+app.get('/api/query-cache/stats', (req, res) => {
+  res.json(QueryCache.getStats());
+});
+
+// API endpoint to clear the query result cache, optionally for one database
+app.delete('/api/query-cache', (req, res) => {
+  QueryCache.clear(req.query.database);
+  res.json(QueryCache.getStats());
+});
+
+// Gauges read when /metrics is scraped
+Metrics.addCollector(() => {
+  const gauges = [];
+  for (const [database, stats] of Object.entries(DatabaseCache.getStats())) {
+    gauges.push({ name: 'database_cache_hits_total', type: 'counter', help: 'DatabaseCache lookups answered from the cache', labels: { database }, value: stats.hits });
+    gauges.push({ name: 'database_cache_misses_total', type: 'counter', help: 'DatabaseCache lookups not found in the cache', labels: { database }, value: stats.misses });
+  }
+
+  const queryCache = QueryCache.getStats();
+  gauges.push({ name: 'query_cache_hits_total', type: 'counter', help: 'Query results served from the result cache', value: queryCache.hits });
+  gauges.push({ name: 'query_cache_misses_total', type: 'counter', help: 'Cacheable queries not found in the result cache', value: queryCache.misses });
+  gauges.push({ name: 'query_cache_bytes', help: 'Memory used by cached query results', value: queryCache.bytes });
+
+  gauges.push({ name: 'running_queries', help: 'Queries currently executing through /api/query', value: RunningQueries.size });
+
+  const metadataStore = MetadataStore.getStats();
+  gauges.push({ name: 'metadata_store_record_hits_total', type: 'counter', help: 'Table metadata records served from memory', value: metadataStore.hits });
+  gauges.push({ name: 'metadata_store_record_misses_total', type: 'counter', help: 'Table metadata records read from disk', value: metadataStore.misses });
+
+  for (const [database, stats] of Object.entries(Pools.getStats())) {
+    for (const state of ['size', 'available', 'borrowed', 'pending']) {
+      gauges.push({ name: 'db_pool_connections', help: 'Connections per database pool by state', labels: { database, state }, value: stats[state] });
+    }
+    gauges.push({ name: 'db_pool_max_connections', help: 'Maximum connections per database pool', labels: { database }, value: stats.max });
+  }
+  return gauges;
+});
+
+// Endpoint exposing request latencies, SQL and serialization times, rows returned,
+// cache hit counts and pool utilization; Prometheus text, or JSON with ?format=json
+app.get('/metrics', (req, res) => {
+  if (req.query.format === 'json') {
+    return res.json(Metrics.toJSON());
+  }
+  res.type('text/plain; version=0.0.4').send(Metrics.toPrometheus());
+});
+
 const PORT = process.env.PORT || 3001;
-app.listen(PORT, () => {
-  console.log(`Server running on port ${PORT}`);
+metadataLoaded.then(() => {
+  app.listen(PORT, () => {
+    logger.info(`Server running on port ${PORT}`);
+  });
 });
\ No newline at end of file
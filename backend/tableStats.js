@@ -0,0 +1,54 @@
+// Row counts, sizes and index usage per table, read from tableStats.json (written
+// by scripts/collect_table_stats.py). The file describes a single database, so
+// lookups for any other database find nothing.
+const STATS_VERSION = 1;
+
+class TableStats {
+  constructor() {
+    this.database = null;
+    this.collectedAt = null;
+    this.tables = new Map();
+  }
+
+  // Use the parsed content of a statistics file, replacing the statistics loaded before
+  load(stats, filePath) {
+    if (stats.version !== STATS_VERSION) {
+      throw new Error(`${filePath} is not a version ${STATS_VERSION} table statistics file`);
+    }
+    this.tables = new Map(Object.entries(stats.tables));
+    this.database = stats.database;
+    this.collectedAt = stats.collectedAt;
+  }
+
+  // Check if statistics of a database are loaded (case-insensitive)
+  isLoaded(databaseName) {
+    return this.database !== null && this.database.toLowerCase() === String(databaseName).toLowerCase();
+  }
+
+  // Get the statistics of a table: { name, rowCount, reservedKb, usedKb, indexes }
+  get(databaseName, tableName) {
+    return this.isLoaded(databaseName) ? this.tables.get(tableName.toLowerCase()) : undefined;
+  }
+
+  // Estimated rows of a table, or undefined if it was not collected
+  getRowCount(databaseName, tableName) {
+    return this.get(databaseName, tableName)?.rowCount;
+  }
+
+  // Row count and size of every table of a database, keyed by lowercased name
+  summary(databaseName) {
+    const tables = {};
+    if (this.isLoaded(databaseName)) {
+      for (const [key, { rowCount, reservedKb }] of this.tables) {
+        tables[key] = { rowCount, reservedKb };
+      }
+    }
+    return { collectedAt: this.isLoaded(databaseName) ? this.collectedAt : null, tables };
+  }
+
+  get size() {
+    return this.tables.size;
+  }
+}
+
+module.exports = new TableStats();
@@ -0,0 +1,42 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const QueryGuard = require('../queryGuard');
+
+// A large InventTrans with an index on ItemId; NAME is not indexed
+QueryGuard.configure({
+  getIndexes: (tableName) => (tableName.toLowerCase() === 'inventtrans'
+    ? [{ indexName: 'ItemIdx', columns: ['PARTITION', 'DATAAREAID', 'ItemId'] }]
+    : undefined),
+  getStoredRowCount: () => 5000000
+});
+
+const codes = (sql) => QueryGuard.analyze(sql, 5000000).warnings.map((warning) => warning.code);
+
+test('a parenthesized predicate is a filter', () => {
+  assert.deepStrictEqual(codes("SELECT * FROM InventTrans WHERE (ItemId = 'A')"), []);
+});
+
+test('enforce mode does not limit a parenthesized selective query', async () => {
+  const { limited } = await QueryGuard.check(null, 'AxDB', "SELECT * FROM InventTrans WHERE (ItemId = 'A')", 'enforce');
+  assert.strictEqual(limited, false);
+});
+
+test('an OR group seeks only if every branch does', () => {
+  assert.deepStrictEqual(codes("SELECT * FROM InventTrans WHERE (ItemId = 'A' OR RECID = 5)"), []);
+  assert.deepStrictEqual(codes("SELECT * FROM InventTrans WHERE (ItemId = 'A' OR NAME = 'B')"), ['table-scan']);
+});
+
+test('the keyset condition of paged table queries sees the ordering column', () => {
+  const where = '([NAME] > @afterKey OR ([NAME] = @afterKey AND [RECID] > @afterRecId))';
+  const unindexed = QueryGuard.analyze(
+    `SELECT TOP (51) * FROM [InventTrans] WHERE ${where} ORDER BY [NAME] ASC, [RECID] ASC`, 5000000);
+  assert.deepStrictEqual(unindexed.warnings.map((warning) => warning.code), ['table-scan', 'unindexed-sort']);
+  assert.match(unindexed.warnings[0].message, /starts with NAME:/);
+
+  const indexed = where.replace(/NAME/g, 'ItemId');
+  assert.deepStrictEqual(codes(`SELECT TOP (51) * FROM [InventTrans] WHERE ${indexed} ORDER BY [ItemId] ASC, [RECID] ASC`), []);
+});
+
+test('a column wrapped in a function is not a plain filter', () => {
+  assert.deepStrictEqual(codes("SELECT * FROM InventTrans WHERE UPPER(ItemId) = 'A'"), ['non-sargable']);
+});
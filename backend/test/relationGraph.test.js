@@ -0,0 +1,18 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const RelationGraph = require('../relationGraph');
+
+const edge = (name, relatedTable) => ({ name, relatedTable, constraints: [] });
+
+test('relations without a related table are skipped when searching join paths', () => {
+  RelationGraph.load({
+    version: 1,
+    tables: {
+      salesline: { name: 'SalesLine', forward: [edge('Broken', null), edge('SalesTable', 'SalesTable')], reverse: [] },
+      salestable: { name: 'SalesTable', forward: [], reverse: [edge('SalesLine', 'SalesLine')] }
+    }
+  }, 'tableRelationGraph.json');
+
+  const paths = RelationGraph.findJoinPaths('SalesLine', 'SalesTable');
+  assert.deepStrictEqual(paths.map((path) => path.map((step) => step.relation)), [['SalesTable']]);
+});
@@ -30,6 +30,9 @@ ICONS = {
 
 DEFAULT_BASE_DIR = r"C:\git\ApplicationSuite\Source\Metadata"
 RESOURCES_DIR = Path(__file__).parent / 'backend' / 'resources'
+PROFILE_REPORT = RESOURCES_DIR / 'extractionProfile.json'
+# Prefix of the progress lines printed by the extractor's --progress option
+PROGRESS_PREFIX = 'PROGRESS'
 
 class Spinner:
     """A simple spinner class for showing loading animation."""
@@ -60,6 +63,34 @@ class Spinner:
         sys.stdout.write('\r✓ ' + self.message + ' completed!      \n')
         sys.stdout.flush()
 
+class ProgressLine:
+    """Rewrites one console line with files done, rate and estimated time left."""
+    def __init__(self, message):
+        self.message = message
+        self.started = None
+        self.first_done = 0
+        self.shown = False
+
+    def update(self, done, total):
+        now = time.perf_counter()
+        if self.started is None:
+            # Measure the rate from the first report, after the extractor started up
+            self.started, self.first_done = now, done
+        elapsed = now - self.started
+        rate = (done - self.first_done) / elapsed if elapsed > 0 else 0
+        eta = format_duration((total - done) / rate) if rate else '?'
+        percent = done * 100 // total if total else 100
+        sys.stdout.write(f"\r{self.message}: {done}/{total} ({percent}%), "
+                         f"{rate:.0f} files/sec, ETA {eta}   ")
+        sys.stdout.flush()
+        self.shown = True
+
+    def finish(self):
+        if self.shown:
+            sys.stdout.write(f"\r{self.message}: done in {format_duration(time.perf_counter() - self.started)}"
+                             f"{' ' * 30}\n")
+            sys.stdout.flush()
+
 def check_node_installation():
     """Check if Node.js is installed and install if not."""
     try:
@@ -236,6 +267,16 @@ def get_user_confirmation(file_type):
             f"\n{ICONS['file']} Generate tableRelations.json?"
             f"\n{ICONS['info']} This will recreate the entire relationship metadata between tables."
             f"\n{ICONS['backup']} Existing relationship metadata will be backed up if present."
+        ),
+        'schema': (
+            f"\n{ICONS['file']} Generate tableSchema.json?"
+            f"\n{ICONS['info']} This will extract the fields of all tables, so columns load without querying SQL Server."
+            f"\n{ICONS['backup']} Existing schema metadata will be backed up if present."
+        ),
+        'stats': (
+            f"\n{ICONS['file']} Generate tableStats.json?"
+            f"\n{ICONS['info']} This will read row counts, sizes and index usage of all tables from SQL Server,"
+            f"\n{ICONS['info']} so table sizes are shown before a table is opened."
         )
     }
     
@@ -266,34 +307,120 @@ def backup_existing_files(files_to_backup):
             except Exception as e:
                 print(f"{ICONS['warning']} Could not backup {filename}: {e}")
 
-def run_script(script_name, base_dir):
-    """Run a Python script and move its output to the resources directory."""
+def run_script(script_name, base_dir, extractor_names):
+    """
+    Run the metadata extractor once, writing the selected files into the resources directory.
+
+    The extractor runs in a child process of this interpreter, so it parses with its
+    own worker pool while its progress lines are shown here as they arrive. It streams
+    every file and writes each record as it arrives, so memory stays flat however large
+    the Metadata tree is. It does not run incrementally: the manifest of an incremental
+    run keeps every record in memory, which is what scripts/watch_metadata.py does for
+    the later updates.
+    """
     script_path = Path(__file__).parent / 'scripts' / script_name
     if not script_path.exists():
         raise FileNotFoundError(f"Script not found: {script_path}")
-    
-    try:
-        with Spinner(f"{ICONS['tools']} Running {script_name}"):
-            result = subprocess.run(
-                ['python', str(script_path), base_dir], 
-                check=True,
-                capture_output=True,
-                text=True
-            )
-        
-        # Move generated files to resources directory
-        output_file = 'tableIndex.json' if 'index' in script_name else 'tableRelations.json'
-        source = Path(__file__).parent / output_file
-        if source.exists():
-            target = RESOURCES_DIR / output_file
-            source.rename(target)
-                
-        print(f"\n{result.stdout.strip()}")
-    except subprocess.CalledProcessError as e:
+
+    command = [sys.executable, str(script_path), base_dir,
+               '--only', *extractor_names,
+               '--output-dir', str(RESOURCES_DIR),
+               '--workers', '0',
+               '--stream',
+               '--cache-discovery',
+               '--binary',
+               '--graph',
+               '--profile', str(PROFILE_REPORT),
+               '--progress']
+    print(f"{ICONS['tools']} Running {script_name}...")
+    output = []
+    progress = ProgressLine(f"{ICONS['file']} Parsing AxTable files")
+    with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          text=True, encoding='utf-8', errors='replace') as process:
+        for line in process.stdout:
+            if line.startswith(PROGRESS_PREFIX + ' '):
+                done, total = map(int, line.split()[1:3])
+                progress.update(done, total)
+            else:
+                output.append(line.rstrip('\n'))
+    progress.finish()
+
+    if process.returncode != 0:
         print(f"\n{ICONS['error']} Error running {script_name}:")
-        print(f"{ICONS['error']} Exit code: {e.returncode}")
-        print(f"{ICONS['error']} Error output: {e.stderr.strip()}")
-        raise
+        print(f"{ICONS['error']} Exit code: {process.returncode}")
+        print(f"{ICONS['error']} Error output: " + '\n'.join(output[-20:]).strip())
+        raise subprocess.CalledProcessError(process.returncode, command)
+
+    print_extraction_summary('\n'.join(output))
+
+def format_duration(seconds):
+    """Formats a number of seconds as m:ss."""
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
+
+def format_bytes(size):
+    """Formats a byte count as a human-readable string."""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+def print_extraction_summary(output):
+    """Prints the key figures of the extractor's profile report instead of its full output."""
+    # Warnings and errors of the extractor are still worth seeing
+    problems = [line for line in output.splitlines() if line.startswith(('WARNING', 'Error', 'An unexpected error'))]
+    if problems:
+        print(f"\n{ICONS['warning']} {len(problems)} warnings during extraction (first 5):")
+        for line in problems[:5]:
+            print(f"   {line}")
+
+    try:
+        with open(PROFILE_REPORT, encoding='utf-8') as infile:
+            report = json.load(infile)
+    except (OSError, ValueError):
+        print(f"\n{output.strip()}")
+        return
+
+    print(f"\n{ICONS['info']} Extraction summary:")
+    print(f"   Files: {report['filesParsed']} parsed of {report['filesTotal']} "
+          f"({format_bytes(report['bytesParsed'])}) in {report['wallSeconds']:.1f}s "
+          f"with {report['workers']} workers")
+    if report['filesPerSecond']:
+        print(f"   Throughput: {report['filesPerSecond']:.0f} files/sec")
+    phases = ', '.join(f"{name} {seconds:.2f}s" for name, seconds in report['phaseSeconds'].items())
+    print(f"   Phases: {phases}")
+    if report['peakMemoryBytes']['main']:
+        print(f"   Peak memory: {format_bytes(report['peakMemoryBytes']['main'])}")
+    if report['slowestFiles']:
+        slowest = report['slowestFiles'][0]
+        print(f"   Slowest file: {os.path.basename(slowest['path'])} ({slowest['seconds'] * 1000:.1f} ms)")
+    print(f"   Full report: {PROFILE_REPORT}")
+
+def collect_table_stats(config):
+    """
+    Collect the row counts, sizes and index usage of the tables into tableStats.json.
+
+    Statistics are optional, so a failure is reported without stopping the initialization.
+    """
+    script_path = Path(__file__).parent / 'scripts' / 'collect_table_stats.py'
+    command = [sys.executable, str(script_path),
+               '--server', config['server_name'],
+               '--database', config['db_name'],
+               '--driver', config['db_driver'],
+               '--output-dir', str(RESOURCES_DIR),
+               '--reload-url', '']
+    try:
+        with Spinner(f"{ICONS['database']} Collecting table statistics"):
+            result = subprocess.run(command, capture_output=True, text=True, encoding='utf-8', errors='replace')
+    except OSError as e:
+        print(f"{ICONS['warning']} Could not collect table statistics: {e}")
+        return
+    if result.returncode != 0:
+        print(f"{ICONS['warning']} Could not collect table statistics:")
+        print((result.stdout + result.stderr).strip())
+        return
+    lines = result.stdout.strip().splitlines()
+    print(f"{ICONS['success']} {lines[-1] if lines else 'Table statistics collected'}")
 
 def print_next_steps():
     print(f"\n{ICONS['sparkles']} === Next Steps === {ICONS['sparkles']}")
@@ -315,9 +442,8 @@ def main():
     try:
         print(f"\n{ICONS['sparkles']} === SQL Explorer Project Initialization === {ICONS['sparkles']}\n")
         
-        # Check Node.js installation
-        with Spinner(f"Checking Node.js {ICONS['node']} installation"):
-            check_node_installation()
+        # Check Node.js installation; it may ask to install Node.js, so no spinner here
+        check_node_installation()
         
         # Get user input
         config = get_user_input()
@@ -340,11 +466,15 @@ def main():
         
         # Ask for tableIndex.json generation
         if get_user_confirmation('index'):
-            files_to_generate.append(('extract_table_indexes.py', 'tableIndex.json'))
+            files_to_generate.append(('index', 'tableIndex.json'))
             
         # Ask for tableRelations.json generation
         if get_user_confirmation('relations'):
-            files_to_generate.append(('extract_table_relations.py', 'tableRelations.json'))
+            files_to_generate.append(('relations', 'tableRelations.json'))
+
+        # Ask for tableSchema.json generation
+        if get_user_confirmation('schema'):
+            files_to_generate.append(('schema', 'tableSchema.json'))
             
         if not files_to_generate:
             print(f"\n{ICONS['info']} No files selected for generation. Skipping metadata extraction.")
@@ -353,10 +483,13 @@ def main():
             files_to_backup = [f[1] for f in files_to_generate]
             backup_existing_files(files_to_backup)
             
-            # Generate selected files
+            # Generate all selected files from a single pass over the metadata
             print(f"\n{ICONS['tools']} Generating selected metadata files...")
-            for script_name, _ in files_to_generate:
-                run_script(script_name, config['base_dir'])
+            run_script('extract_table_metadata.py', config['base_dir'], [f[0] for f in files_to_generate])
+
+        # Ask for tableStats.json collection
+        if get_user_confirmation('stats'):
+            collect_table_stats(config)
         
         print(f"\n{ICONS['sparkles']} === Project initialization completed successfully! === {ICONS['sparkles']}")
         
@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from extraction_profile import PROFILE_FILE
+from synthetic_metadata import add_generator_arguments, generate_metadata_tree, generator_options
+
+# Runs extract_table_metadata.py against synthetic Metadata trees of several sizes
+# and reports throughput and memory per run mode, so speedups and regressions can
+# be measured on any machine. Every run is a separate process, so the peak memory
+# of one run does not hide that of the next.
+EXTRACTOR_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'extract_table_metadata.py')
+DEFAULT_SCALES = (1000, 5000, 20000)
+# Extractor options of each benchmark mode
+MODES = {
+    'serial': [],
+    'parallel': ['--workers', '0'],
+    'stream': ['--stream'],
+    'parallel-stream': ['--workers', '0', '--stream'],
+    'binary': ['--workers', '0', '--stream', '--binary', '--graph'],
+    'incremental-noop': ['--workers', '0', '--incremental'],
+}
+DEFAULT_MODES = ('serial', 'parallel', 'stream', 'incremental-noop')
+
+def run_extractor(base_directory, output_dir, options):
+    """
+    Runs the extractor once with profiling and returns its report.
+
+    Args:
+        base_directory (str): The Metadata directory.
+        output_dir (str): Directory the outputs and the report are written to.
+        options (list): Extra extractor arguments.
+
+    Returns:
+        dict: The profile report, plus the wall time seen by this process.
+    """
+    start = time.perf_counter()
+    subprocess.run([sys.executable, EXTRACTOR_SCRIPT, base_directory, '--output-dir', output_dir,
+                    '--profile', *options],
+                   check=True, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    with open(os.path.join(output_dir, PROFILE_FILE), encoding='utf-8') as infile:
+        report = json.load(infile)
+    report['processSeconds'] = round(elapsed, 3)
+    return report
+
+def benchmark_mode(base_directory, work_dir, mode, repeat):
+    """
+    Runs one mode repeat times and keeps the fastest run.
+
+    The incremental-noop mode first runs a full incremental extraction to create the
+    manifest, then measures the run that finds nothing to do.
+    """
+    output_dir = os.path.join(work_dir, mode)
+    best = None
+    for run in range(repeat):
+        if mode != 'incremental-noop' or run == 0:
+            shutil.rmtree(output_dir, ignore_errors=True)
+        if mode == 'incremental-noop' and run == 0:
+            run_extractor(base_directory, output_dir, MODES[mode])
+        report = run_extractor(base_directory, output_dir, MODES[mode])
+        if best is None or report['wallSeconds'] < best['wallSeconds']:
+            best = report
+    return best
+
+def summarize(scale, mode, report):
+    peak = report['peakMemoryBytes']
+    total_files = report['filesTotal']
+    return {
+        "tables": scale,
+        "mode": mode,
+        "workers": report['workers'],
+        "wallSeconds": report['wallSeconds'],
+        "processSeconds": report['processSeconds'],
+        "filesPerSecond": round(total_files / report['wallSeconds'], 1) if report['wallSeconds'] else None,
+        "megabytesPerSecond": round(report['bytesParsed'] / 1048576 / report['wallSeconds'], 2)
+        if report['wallSeconds'] else None,
+        "peakMemoryMainMB": round(peak['main'] / 1048576, 1) if peak['main'] else None,
+        "peakMemoryWorkerMB": round(peak['largestWorker'] / 1048576, 1) if peak['largestWorker'] else None,
+        "phaseSeconds": report['phaseSeconds'],
+    }
+
+def print_results(results):
+    header = f"{'tables':>8} {'mode':<18} {'workers':>7} {'wall s':>8} {'files/s':>9} {'MB/s':>7} {'peak MB':>8} {'worker MB':>9}"
+    print(header)
+    print('-' * len(header))
+    for row in results:
+        print(f"{row['tables']:>8} {row['mode']:<18} {row['workers']:>7} {row['wallSeconds']:>8.2f} "
+              f"{row['filesPerSecond'] or 0:>9.0f} {row['megabytesPerSecond'] or 0:>7.1f} "
+              f"{row['peakMemoryMainMB'] or 0:>8.1f} {row['peakMemoryWorkerMB'] or 0:>9.1f}")
+
+def run_benchmarks(scales, modes, repeat=1, work_dir=None, keep=False, generator=None):
+    """
+    Generates a tree per scale and benchmarks every mode against it.
+
+    Args:
+        scales (list): Numbers of tables to generate.
+        modes (list): Keys of MODES to run.
+        repeat (int, optional): Runs per mode; the fastest is reported.
+        work_dir (str, optional): Where trees and outputs go, a temporary directory by default.
+            Trees already generated there are reused.
+        keep (bool, optional): Keep the temporary directory.
+        generator (dict, optional): Extra generate_metadata_tree keyword arguments.
+
+    Returns:
+        list: One result dict per scale and mode.
+    """
+    temporary = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix='axtable-bench-')
+    results = []
+    try:
+        for scale in scales:
+            base_directory = os.path.join(work_dir, f"tables{scale}", 'Metadata')
+            if not os.path.exists(base_directory):
+                print(f"Generating {scale} tables in {base_directory}...")
+                generate_metadata_tree(base_directory, scale, **(generator or {}))
+            for mode in modes:
+                print(f"Running {mode} on {scale} tables...")
+                report = benchmark_mode(base_directory, os.path.join(work_dir, f"tables{scale}"), mode, repeat)
+                results.append(summarize(scale, mode, report))
+    finally:
+        if temporary and not keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        elif temporary:
+            print(f"Benchmark files kept in {work_dir}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the AxTable extractors on synthetic Metadata trees.")
+    parser.add_argument('--scales', type=int, nargs='+', default=list(DEFAULT_SCALES),
+                        help=f"Numbers of tables to benchmark (default: {' '.join(map(str, DEFAULT_SCALES))})")
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(DEFAULT_MODES),
+                        help=f"Extractor modes to run (default: {' '.join(DEFAULT_MODES)})")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per mode, the fastest is reported (default: 1)")
+    parser.add_argument('--work-dir', help="Directory for generated trees and outputs, reused across runs "
+                                           "(default: a temporary directory)")
+    parser.add_argument('--keep', action='store_true', help="Keep the temporary directory")
+    parser.add_argument('--output', help="Also write the results as JSON to this file")
+    add_generator_arguments(parser)
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.scales, args.modes, args.repeat, args.work_dir, args.keep, generator_options(args))
+    print()
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as outfile:
+            json.dump(results, outfile, indent=4)
+        print(f"\nResults saved to {args.output}")
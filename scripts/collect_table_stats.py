@@ -0,0 +1,295 @@
+import os
+import sys
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+
+try:
+    import pyodbc
+except ImportError:
+    print("pyodbc is required to collect table statistics: pip install pyodbc")
+    sys.exit(1)
+
+from watch_metadata import DEFAULT_OUTPUT_DIR, DEFAULT_RELOAD_URL, notify_backend
+
+# Row counts, sizes and index usage of the AxDB tables, read from the SQL Server
+# DMVs into tableStats.json next to the extracted metadata. The backend shows the
+# estimated rows before a table is opened and picks default limits from them:
+#
+#   {"version": 1, "database": "AxDbRain", "collectedAt": "...",
+#    "sqlServerStartTime": "...",
+#    "tables": {"custtable": {"name": "CustTable", "rowCount": 120000,
+#                             "reservedKb": 52000, "usedKb": 51000,
+#                             "indexes": [{"name": ..., "seeks": ..., ...}]}}}
+#
+# Index usage counters start at zero when SQL Server starts, so sqlServerStartTime
+# tells over which period they were counted.
+STATS_FILE = 'tableStats.json'
+STATS_VERSION = 1
+ENV_FILE = os.path.join(os.path.dirname(DEFAULT_OUTPUT_DIR), '.env')
+DEFAULT_DRIVER = 'ODBC Driver 17 for SQL Server'
+# Fragmentation only matters for indexes of at least this many 8 KB pages
+FRAGMENTATION_MIN_PAGES = 1000
+
+TABLE_SIZES_SQL = """
+    SELECT t.object_id, t.name,
+           SUM(CASE WHEN p.index_id IN (0, 1) THEN p.row_count ELSE 0 END) AS row_count,
+           SUM(p.reserved_page_count) * 8 AS reserved_kb,
+           SUM(p.used_page_count) * 8 AS used_kb
+    FROM sys.dm_db_partition_stats p
+    JOIN sys.tables t ON t.object_id = p.object_id
+    GROUP BY t.object_id, t.name
+"""
+
+INDEX_USAGE_SQL = """
+    SELECT i.object_id, i.index_id, i.name, i.type_desc,
+           ISNULL(u.user_seeks, 0) AS seeks,
+           ISNULL(u.user_scans, 0) AS scans,
+           ISNULL(u.user_lookups, 0) AS lookups,
+           ISNULL(u.user_updates, 0) AS updates,
+           u.last_user_seek, u.last_user_scan
+    FROM sys.indexes i
+    JOIN sys.tables t ON t.object_id = i.object_id
+    LEFT JOIN sys.dm_db_index_usage_stats u
+        ON u.object_id = i.object_id AND u.index_id = i.index_id AND u.database_id = DB_ID()
+    WHERE i.index_id > 0
+    ORDER BY i.object_id, i.index_id
+"""
+
+FRAGMENTATION_SQL = """
+    SELECT index_id, avg_fragmentation_in_percent, page_count
+    FROM sys.dm_db_index_physical_stats(DB_ID(), ?, NULL, NULL, 'LIMITED')
+    WHERE index_id > 0 AND alloc_unit_type_desc = 'IN_ROW_DATA'
+"""
+
+def read_env_file(path):
+    """
+    Reads the KEY=VALUE lines of the backend .env file written by initialize_project.py.
+
+    Args:
+        path (str): Path of the .env file.
+
+    Returns:
+        dict: The variables, empty if the file does not exist.
+    """
+    values = {}
+    if not os.path.exists(path):
+        return values
+    with open(path, encoding='utf-8') as infile:
+        for line in infile:
+            line = line.strip()
+            if line and not line.startswith('#') and '=' in line:
+                key, value = line.split('=', 1)
+                values[key.strip()] = value.strip()
+    return values
+
+def connection_string(server, database, driver):
+    """Builds the trusted-connection ODBC string also used by initialize_project.py."""
+    return f"Driver={{{driver}}};Server={server};Database={database};Trusted_Connection=yes;"
+
+def load_table_names(output_dir):
+    """
+    Reads the names of the tables in tableIndex.json.
+
+    Args:
+        output_dir (str): Directory holding the extracted metadata.
+
+    Returns:
+        dict: Lowercased name mapped to the name in the metadata, or None if there is
+        no tableIndex.json, in which case every table is collected.
+    """
+    index_path = os.path.join(output_dir, 'tableIndex.json')
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path, encoding='utf-8') as infile:
+        return {table['tableName'].lower(): table['tableName'] for table in json.load(infile)}
+
+def fetch_dicts(cursor, sql, params=()):
+    """Runs a query and returns its rows as dicts keyed by column name."""
+    cursor.execute(sql, params)
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def isoformat(value):
+    return value.isoformat() if value is not None else None
+
+def read_server_start_time(cursor):
+    """When SQL Server started, or None without the VIEW SERVER STATE permission."""
+    try:
+        cursor.execute("SELECT sqlserver_start_time FROM sys.dm_os_sys_info")
+        return isoformat(cursor.fetchone()[0])
+    except pyodbc.Error:
+        return None
+
+def collect_table_stats(connection, table_names=None, fragmentation=True, verbose=False):
+    """
+    Reads row counts, sizes, index usage and optionally fragmentation of the tables.
+
+    Args:
+        connection (pyodbc.Connection): Connection to the AxDB database.
+        table_names (dict, optional): Lowercased name mapped to the metadata name, see
+            load_table_names. Tables not in it are skipped; None collects every table.
+        fragmentation (bool, optional): Also read index fragmentation (LIMITED mode)
+            of tables with at least FRAGMENTATION_MIN_PAGES used pages.
+        verbose (bool, optional): Print every table whose fragmentation is read.
+
+    Returns:
+        dict: Lowercased table name mapped to its statistics.
+    """
+    cursor = connection.cursor()
+    tables = {}
+    by_object_id = {}
+    for row in fetch_dicts(cursor, TABLE_SIZES_SQL):
+        key = row['name'].lower()
+        if table_names is not None and key not in table_names:
+            continue
+        table = {
+            "name": table_names[key] if table_names is not None else row['name'],
+            "rowCount": int(row['row_count']),
+            "reservedKb": int(row['reserved_kb']),
+            "usedKb": int(row['used_kb']),
+            "indexes": [],
+        }
+        tables[key] = table
+        by_object_id[row['object_id']] = table
+
+    indexes = {}
+    for row in fetch_dicts(cursor, INDEX_USAGE_SQL):
+        table = by_object_id.get(row['object_id'])
+        if table is None:
+            continue
+        index = {
+            "name": row['name'],
+            "type": row['type_desc'],
+            "seeks": int(row['seeks']),
+            "scans": int(row['scans']),
+            "lookups": int(row['lookups']),
+            "updates": int(row['updates']),
+            "lastUserSeek": isoformat(row['last_user_seek']),
+            "lastUserScan": isoformat(row['last_user_scan']),
+        }
+        table['indexes'].append(index)
+        indexes[(row['object_id'], row['index_id'])] = index
+
+    if fragmentation:
+        large = [(object_id, table) for object_id, table in by_object_id.items()
+                 if table['usedKb'] // 8 >= FRAGMENTATION_MIN_PAGES]
+        print(f"Reading index fragmentation of {len(large)} tables...")
+        for object_id, table in large:
+            if verbose:
+                print(f"  {table['name']}")
+            for row in fetch_dicts(cursor, FRAGMENTATION_SQL, (object_id,)):
+                index = indexes.get((object_id, row['index_id']))
+                if index is not None and row['page_count'] >= FRAGMENTATION_MIN_PAGES:
+                    index['pageCount'] = int(row['page_count'])
+                    index['fragmentationPercent'] = round(row['avg_fragmentation_in_percent'], 1)
+    cursor.close()
+    return tables
+
+def write_table_stats(output_dir, database, tables, server_start_time=None):
+    """
+    Writes tableStats.json through a temporary file, so the backend never reads a
+    partial file.
+
+    Returns:
+        str: The path of the written file.
+    """
+    path = os.path.join(output_dir, STATS_FILE)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as outfile:
+        json.dump({
+            "version": STATS_VERSION,
+            "database": database,
+            "collectedAt": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "sqlServerStartTime": server_start_time,
+            "tables": tables,
+        }, outfile, separators=(',', ':'))
+    os.replace(temp_path, path)
+    return path
+
+def collect_once(server, database, driver, output_dir, fragmentation=True, reload_url=None, verbose=False):
+    """
+    Collects the statistics of one database, writes them and notifies the backend.
+
+    Args:
+        server (str): SQL Server instance.
+        database (str): The AxDB database.
+        driver (str): ODBC driver name.
+        output_dir (str): Directory of the extracted metadata, tableStats.json goes there.
+        fragmentation (bool, optional): Also read index fragmentation.
+        reload_url (str, optional): Reload endpoint of the backend; not notified when empty.
+        verbose (bool, optional): Print every table whose fragmentation is read.
+
+    Returns:
+        str: The path of the written file.
+    """
+    start = time.perf_counter()
+    table_names = load_table_names(output_dir)
+    if table_names is None:
+        print("tableIndex.json not found, collecting statistics of every table.")
+    connection = pyodbc.connect(connection_string(server, database, driver), timeout=30)
+    try:
+        server_start_time = read_server_start_time(connection.cursor())
+        tables = collect_table_stats(connection, table_names, fragmentation, verbose)
+    finally:
+        connection.close()
+    path = write_table_stats(output_dir, database, tables, server_start_time)
+    total_rows = sum(table['rowCount'] for table in tables.values())
+    print(f"Statistics of {len(tables)} tables ({total_rows:,} rows) saved to {path} "
+          f"in {time.perf_counter() - start:.1f}s")
+    if reload_url:
+        notify_backend(reload_url)
+    return path
+
+def parse_args(argv=None):
+    env = read_env_file(ENV_FILE)
+    parser = argparse.ArgumentParser(
+        description=f"Collect row counts, sizes and index usage of the AxDB tables into {STATS_FILE}.")
+    parser.add_argument('--server', default=env.get('DB_SERVER'),
+                        help="SQL Server instance (default: DB_SERVER of backend/.env)")
+    parser.add_argument('--database', default=env.get('DB_NAME', 'AxDbRain'),
+                        help="Database to collect (default: DB_NAME of backend/.env, or AxDbRain)")
+    parser.add_argument('--driver', default=env.get('DB_DRIVER', DEFAULT_DRIVER),
+                        help=f"ODBC driver (default: DB_DRIVER of backend/.env, or {DEFAULT_DRIVER})")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help="Directory of the extracted metadata (default: backend/resources)")
+    parser.add_argument('--no-fragmentation', dest='fragmentation', action='store_false',
+                        help="Skip reading index fragmentation, the slowest part on large databases")
+    parser.add_argument('--every', type=float, default=None, metavar='MINUTES',
+                        help="Keep running and collect again every MINUTES minutes")
+    parser.add_argument('--reload-url', default=DEFAULT_RELOAD_URL,
+                        help=f"Backend endpoint notified after each collection, empty to skip "
+                             f"(default: {DEFAULT_RELOAD_URL})")
+    parser.add_argument('--verbose', action='store_true',
+                        help="Print every table whose fragmentation is read")
+    args = parser.parse_args(argv)
+    if not args.server:
+        parser.error("--server is required when backend/.env does not set DB_SERVER")
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+    os.makedirs(args.output_dir, exist_ok=True)
+    print(f"Collecting table statistics of {args.database} on {args.server}")
+
+    if args.every is None:
+        try:
+            collect_once(args.server, args.database, args.driver, args.output_dir, args.fragmentation,
+                         args.reload_url, args.verbose)
+        except pyodbc.Error as e:
+            print(f"ERROR: Could not collect table statistics: {e}")
+            sys.exit(1)
+        sys.exit(0)
+
+    try:
+        while True:
+            try:
+                collect_once(args.server, args.database, args.driver, args.output_dir, args.fragmentation,
+                             args.reload_url, args.verbose)
+            except pyodbc.Error as e:
+                # Keep the schedule; the previous tableStats.json stays in place
+                print(f"ERROR: Could not collect table statistics, retrying in {args.every:g} minutes: {e}")
+            time.sleep(args.every * 60)
+    except KeyboardInterrupt:
+        print("\nStopped collecting.")
@@ -0,0 +1,859 @@
+import os
+import xml.etree.ElementTree as ET
+import json
+import sys
+import argparse
+import hashlib
+import io
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import metadata_discovery
+from extraction_profile import DEFAULT_SLOWEST, PROFILE_FILE, ExtractionProfile, profile_phase, profile_worker
+from metadata_store import BINARY_OUTPUT_FILE, BinaryMetadataWriter
+from relation_graph import RELATION_GRAPH_FILE, RelationGraphBuilder
+
+DEFAULT_BASE_DIR = r"C:\git\ApplicationSuite\Source\Metadata"
+MANIFEST_FILE = 'tableMetadataManifest.json'
+MANIFEST_VERSION = 1
+# Prefix of the machine-readable lines written with --progress
+PROGRESS_PREFIX = 'PROGRESS'
+PROGRESS_INTERVAL = 0.2
+
+def find_ax_table_directories(base_directory, full_walk=False, workers=1, cache_dir=None):
+    """
+    Find all directories named 'AxTable' starting from the base directory.
+
+    Args:
+        base_directory (str): The base directory to start searching from.
+        full_walk (bool, optional): Walk the whole tree instead of only the
+            <Package>/<Model> levels where AxTable folders live.
+        workers (int, optional): Threads scanning the top-level packages in parallel.
+        cache_dir (str, optional): Directory holding the discovery cache, reused while
+            no package or model directory has changed.
+
+    Returns:
+        list: A list of paths to directories named 'AxTable'.
+    """
+    return metadata_discovery.find_ax_table_directories(
+        base_directory, None if full_walk else metadata_discovery.LAYOUT_DEPTH, workers, cache_dir)
+
+def extract_indexes_from_root(root, filename):
+    """
+    Extracts index information from a parsed AxTable XML root element.
+
+    Args:
+        root (Element): The root element of the AxTable XML file.
+        filename (str): The XML file name, used as a fallback table name.
+
+    Returns:
+        dict: The table name and its indexes.
+    """
+    # Extract the table name
+    name_node = root.find('Name')
+    table_name = name_node.text.strip() if name_node is not None and name_node.text else filename.split('.')[0]
+    if name_node is None or not name_node.text:
+        print(f"WARNING: Missing 'Name' element in {filename}. Using filename as table name.")
+
+    indexes = []
+
+    # Find all AxTableIndex nodes within Indexes
+    indexes_node = root.find('Indexes')
+    if indexes_node is not None:
+        for index_node in indexes_node.findall('AxTableIndex'):
+            # Extract index name
+            index_name_node = index_node.find('Name')
+            index_name = index_name_node.text.strip() if index_name_node is not None and index_name_node.text else 'Unnamed_Index'
+            if index_name_node is None or not index_name_node.text:
+                print(f"WARNING: Missing 'Name' element in index of {filename}. Using 'Unnamed_Index' as index name.")
+
+            # Extract AllowDuplicates
+            allow_duplicates_node = index_node.find('AllowDuplicates')
+            allow_duplicates = False  # Default value
+            if allow_duplicates_node is not None and allow_duplicates_node.text:
+                allow_duplicates_text = allow_duplicates_node.text.strip().lower()
+                allow_duplicates = True if allow_duplicates_text == 'yes' else False
+
+            # Extract columns
+            columns = []
+            fields_node = index_node.find('Fields')
+            if fields_node is not None:
+                for field_node in fields_node.findall('AxTableIndexField'):
+                    data_field_node = field_node.find('DataField')
+                    if data_field_node is not None and data_field_node.text:
+                        columns.append(data_field_node.text.strip())
+                    else:
+                        print(f"WARNING: Missing 'DataField' in an index field of {filename}.")
+
+            if not columns:
+                print(f"WARNING: No columns found for index '{index_name}' in {filename}.")
+
+            indexes.append({
+                "indexName": index_name,
+                "columns": columns,
+                "allowDuplicates": allow_duplicates
+            })
+    else:
+        print(f"WARNING: No 'Indexes' section found in {filename}.")
+
+    return {
+        "tableName": table_name,
+        "indexes": indexes
+    }
+
+def extract_relations_from_root(root, filename):
+    """
+    Extracts relationship information from a parsed AxTable XML root element.
+
+    Args:
+        root (Element): The root element of the AxTable XML file.
+        filename (str): The XML file name, used as a fallback table name.
+
+    Returns:
+        dict: The table name and its relations.
+    """
+    # Extract the table name
+    name_node = root.find('Name')
+    table_name = name_node.text if name_node is not None else None
+    if not table_name:
+        print(f"WARNING: Missing 'Name' element in {filename}")
+        table_name = filename.split('.')[0]  # Use filename as fallback
+
+    relations = []
+
+    # Handle potential namespaces
+    namespaces = {'ns': root.tag.split('}')[0][1:]} if '}' in root.tag else {}
+
+    # Find all AxTableRelation nodes
+    for relation_node in root.findall('.//AxTableRelation', namespaces):
+        relation_name = relation_node.find('Name', namespaces).text if relation_node.find('Name', namespaces) is not None else 'Unnamed_Relation'
+        # An empty <RelatedTable/> counts as missing
+        related_table = relation_node.find('RelatedTable', namespaces).text if relation_node.find('RelatedTable', namespaces) is not None else None
+        related_table = related_table.strip() if related_table and related_table.strip() else 'Unknown'
+        cardinality = relation_node.find('Cardinality', namespaces).text if relation_node.find('Cardinality', namespaces) is not None else 'Unknown'
+        relationship_type = relation_node.find('RelationshipType', namespaces).text if relation_node.find('RelationshipType', namespaces) is not None else 'Unknown'
+        constraints = []
+
+        # Extract constraints
+        for constraint_node in relation_node.findall('.//AxTableRelationConstraint', namespaces):
+            field = constraint_node.find('Field', namespaces).text if constraint_node.find('Field', namespaces) is not None else 'Unknown'
+            related_field = constraint_node.find('RelatedField', namespaces).text if constraint_node.find('RelatedField', namespaces) is not None else 'Unknown'
+            constraints.append({"field": field, "relatedField": related_field})
+
+        relations.append({
+            "name": relation_name,
+            "relatedTable": related_table,
+            "cardinality": cardinality,
+            "relationshipType": relationship_type,
+            "constraints": constraints
+        })
+
+    return {"tableName": table_name, "relations": relations}
+
+XSI_TYPE = '{http://www.w3.org/2001/XMLSchema-instance}type'
+# Table properties that add system columns to the table in the database
+SYSTEM_FIELD_PROPERTIES = (
+    ('CreatedDateTime', 'CREATEDDATETIME', 'UtcDateTime'),
+    ('CreatedBy', 'CREATEDBY', 'String'),
+    ('ModifiedDateTime', 'MODIFIEDDATETIME', 'UtcDateTime'),
+    ('ModifiedBy', 'MODIFIEDBY', 'String'),
+)
+
+def child_text(node, tag):
+    child = node.find(tag)
+    return child.text.strip() if child is not None and child.text else None
+
+def extract_fields_from_root(root, filename):
+    """
+    Extracts field information from a parsed AxTable XML root element.
+
+    Fields are listed in declaration order, followed by the system fields every
+    table gets in the database (RECID, RECVERSION, PARTITION, DATAAREAID for
+    per-company tables, and the created/modified fields the table enables).
+
+    Args:
+        root (Element): The root element of the AxTable XML file.
+        filename (str): The XML file name, used as a fallback table name.
+
+    Returns:
+        dict: The table name and its fields, each with name, base type, extended
+        data type, enum type, string size and whether it is mandatory.
+    """
+    table_name = child_text(root, 'Name')
+    if not table_name:
+        print(f"WARNING: Missing 'Name' element in {filename}. Using filename as table name.")
+        table_name = filename.split('.')[0]
+
+    fields = []
+    fields_node = root.find('Fields')
+    if fields_node is not None:
+        for field_node in fields_node.findall('AxTableField'):
+            name = child_text(field_node, 'Name')
+            if not name:
+                print(f"WARNING: Missing 'Name' element in a field of {filename}.")
+                continue
+            string_size = child_text(field_node, 'StringSize')
+            fields.append({
+                "name": name,
+                "type": field_node.get(XSI_TYPE, 'AxTableField').replace('AxTableField', '', 1) or None,
+                "extendedDataType": child_text(field_node, 'ExtendedDataType'),
+                "enumType": child_text(field_node, 'EnumType'),
+                "stringSize": int(string_size) if string_size and string_size.isdigit() else None,
+                "mandatory": (child_text(field_node, 'Mandatory') or '').lower() == 'yes',
+            })
+
+    system_fields = [("RECID", 'Int64'), ("RECVERSION", 'Int'), ("PARTITION", 'Int64')]
+    if (child_text(root, 'SaveDataPerCompany') or '').lower() != 'no':
+        system_fields.append(("DATAAREAID", 'String'))
+    system_fields += [(name, base_type) for prop, name, base_type in SYSTEM_FIELD_PROPERTIES
+                      if (child_text(root, prop) or '').lower() == 'yes']
+    for name, base_type in system_fields:
+        fields.append({"name": name, "type": base_type, "system": True})
+
+    return {"tableName": table_name, "fields": fields}
+
+# Every output produced from the single pass over the AxTable files.
+# Adding a new artifact only requires a new entry here. 'sections' lists the
+# top-level elements of the AxTable XML the extractor reads; streaming mode
+# discards all others while parsing. 'record_fields' are the keys the extractor
+# adds to the per-table record of the binary artifact.
+EXTRACTORS = {
+    'index': {
+        'output_file': 'tableIndex.json',
+        'extract': extract_indexes_from_root,
+        'sections': ('Name', 'Indexes'),
+        'record_fields': ('indexes',),
+    },
+    'relations': {
+        'output_file': 'tableRelations.json',
+        'extract': extract_relations_from_root,
+        'sections': ('Name', 'Relations'),
+        'record_fields': ('relations',),
+    },
+    'schema': {
+        'output_file': 'tableSchema.json',
+        'extract': extract_fields_from_root,
+        'sections': ('Name', 'Fields', 'SaveDataPerCompany') + tuple(prop for prop, _, _ in SYSTEM_FIELD_PROPERTIES),
+        'record_fields': ('fields',),
+    },
+}
+
+def local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def parse_ax_table_streaming(source, sections):
+    """
+    Parses an AxTable XML file with iterparse, keeping only the requested top-level sections.
+
+    Elements of every other top-level section (source code, field groups, ...) are
+    cleared as soon as they are parsed, so memory is bounded by the kept sections.
+
+    Args:
+        source (str or file): The path or opened contents of the XML file.
+        sections (set): Local names of the top-level elements to keep.
+
+    Returns:
+        Element: The root element holding only the kept sections.
+    """
+    root = None
+    depth = 0
+    skipping = False
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = elem
+            elif depth == 1:
+                skipping = local_name(elem.tag) not in sections
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth == 1 and skipping:
+            root.remove(elem)
+            skipping = False
+        elif skipping:
+            elem.clear()
+    return root
+
+def extract_file_metadata(file_path, extractor_names, source=None, stream=False, timings=None):
+    """
+    Parses a single AxTable XML file once and runs every requested extractor on it.
+
+    Args:
+        file_path (str): The path of the AxTable XML file.
+        extractor_names (list): Keys of EXTRACTORS to run.
+        source (file, optional): Already opened file contents to parse instead of file_path.
+        stream (bool, optional): Parse with iterparse and keep only the sections the
+            extractors read.
+        timings (dict, optional): Filled with the size of the file and the seconds
+            spent reading, parsing and extracting it.
+
+    Returns:
+        dict: Extractor name mapped to the extracted record. Extractors that failed
+        are left out; an empty dict is returned if the file could not be parsed.
+    """
+    filename = os.path.basename(file_path)
+    if timings is not None and source is None:
+        # Read separately so reading and parsing are timed apart
+        start = time.perf_counter()
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        timings['read'] = time.perf_counter() - start
+        timings['size'] = len(data)
+        source = io.BytesIO(data)
+    source = source if source is not None else file_path
+
+    start = time.perf_counter()
+    try:
+        if stream:
+            sections = {section for name in extractor_names for section in EXTRACTORS[name]['sections']}
+            root = parse_ax_table_streaming(source, sections)
+        else:
+            root = ET.parse(source).getroot()
+    except ET.ParseError as e:
+        print(f"Error parsing {filename}: {e}")
+        return {}
+    except Exception as e:
+        print(f"An unexpected error occurred with {filename}: {e}")
+        return {}
+    parsed = time.perf_counter()
+
+    records = {}
+    for name in extractor_names:
+        try:
+            records[name] = EXTRACTORS[name]['extract'](root, filename)
+        except Exception as e:
+            print(f"An unexpected error occurred with {filename} ({name}): {e}")
+    if timings is not None:
+        timings['parse'] = parsed - start
+        timings['extract'] = time.perf_counter() - parsed
+    return records
+
+def file_digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+def extract_file_entry(file_path, extractor_names, stream=False, timings=None):
+    """
+    Extracts a file's records together with the change-detection data kept in the manifest.
+
+    Args:
+        file_path (str): The path of the AxTable XML file.
+        extractor_names (list): Keys of EXTRACTORS to run.
+        stream (bool, optional): Parse with iterparse, see extract_file_metadata.
+        timings (dict, optional): Filled like in extract_file_metadata.
+
+    Returns:
+        dict: The manifest entry (mtime, size, sha1, extractors, records) of the file.
+    """
+    start = time.perf_counter()
+    stat = os.stat(file_path)
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if timings is not None:
+        timings['read'] = time.perf_counter() - start
+        timings['size'] = len(data)
+    return {
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha1": file_digest(data),
+        "extractors": sorted(extractor_names),
+        "records": extract_file_metadata(file_path, extractor_names, io.BytesIO(data), stream, timings),
+    }
+
+def load_manifest(output_dir, base_directory):
+    """
+    Loads the manifest of a previous run.
+
+    Args:
+        output_dir (str): Directory the metadata files and the manifest are written to.
+        base_directory (str): The Metadata directory of the current run.
+
+    Returns:
+        dict: Relative file path mapped to its manifest entry. Empty if there is no
+        usable manifest for this base directory.
+    """
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    try:
+        with open(manifest_path, encoding='utf-8') as infile:
+            manifest = json.load(infile)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"WARNING: Ignoring unreadable manifest {manifest_path}: {e}")
+        return {}
+
+    if manifest.get('version') != MANIFEST_VERSION or \
+            manifest.get('baseDirectory') != os.path.abspath(base_directory):
+        print("Manifest was written for another version or base directory, running a full extraction.")
+        return {}
+    return manifest.get('files', {})
+
+def save_manifest(output_dir, base_directory, entries):
+    """Writes the manifest atomically so an interrupted run never leaves a truncated file."""
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as outfile:
+        json.dump({
+            "version": MANIFEST_VERSION,
+            "baseDirectory": os.path.abspath(base_directory),
+            "files": entries,
+        }, outfile, separators=(',', ':'))
+    os.replace(temp_path, manifest_path)
+
+def find_unchanged_entries(file_paths, base_directory, manifest_files, extractor_names):
+    """
+    Splits the current files into entries reusable from the manifest and files to re-parse.
+
+    A file is unchanged when its mtime and size match the manifest. If only the mtime
+    differs, the content hash decides, so touched-but-identical files are not re-parsed.
+
+    Args:
+        file_paths (list): Paths of the AxTable XML files of this run.
+        base_directory (str): The Metadata directory, manifest keys are relative to it.
+        manifest_files (dict): Entries loaded by load_manifest.
+        extractor_names (list): Keys of EXTRACTORS to run.
+
+    Returns:
+        tuple: (dict of relative path to reusable entry, list of file paths to re-parse,
+        number of reusable entries whose mtime was refreshed)
+    """
+    unchanged = {}
+    changed = []
+    refreshed = 0
+    for file_path in file_paths:
+        key = os.path.relpath(file_path, base_directory)
+        entry = manifest_files.get(key)
+        if entry is None or not set(extractor_names) <= set(entry['extractors']):
+            changed.append(file_path)
+            continue
+
+        stat = os.stat(file_path)
+        if stat.st_size != entry['size']:
+            changed.append(file_path)
+        elif stat.st_mtime_ns == entry['mtime']:
+            unchanged[key] = entry
+        else:
+            with open(file_path, 'rb') as f:
+                if file_digest(f.read()) == entry['sha1']:
+                    entry['mtime'] = stat.st_mtime_ns
+                    unchanged[key] = entry
+                    refreshed += 1
+                else:
+                    changed.append(file_path)
+    return unchanged, changed, refreshed
+
+def list_ax_table_files(ax_table_dirs, verbose=False):
+    """
+    Lists the AxTable XML files of the given directories in a stable order.
+
+    Args:
+        ax_table_dirs (list): Paths of directories named 'AxTable'.
+        verbose (bool, optional): Print every directory.
+
+    Returns:
+        list: Paths of the XML files, grouped by directory in the given order.
+    """
+    file_paths = []
+    for ax_table_dir in ax_table_dirs:
+        if verbose:
+            print(f"Processing directory: {ax_table_dir}")
+        for filename in os.listdir(ax_table_dir):
+            if filename.endswith(".xml"):
+                file_paths.append(os.path.join(ax_table_dir, filename))
+    return file_paths
+
+def resolve_worker_count(workers):
+    """Maps the --workers option to a process count; 0 means one worker per CPU."""
+    if workers is None or workers < 0:
+        return 1
+    return workers or os.cpu_count() or 1
+
+def extract_chunk(worker, file_paths, extractor_names):
+    return [worker(file_path, extractor_names) for file_path in file_paths]
+
+def run_file_workers(file_paths, extractor_names, workers=1, chunk_size=None, worker=extract_file_metadata):
+    """
+    Yields the result of worker for each file, in the order of file_paths.
+
+    With more than one worker the file list is sharded into chunks across a
+    process pool; results are still yielded in input order so the output is
+    identical to a serial run. Only a few chunks per worker are in flight at a
+    time, which keeps memory bounded when the consumer streams the results.
+    """
+    workers = resolve_worker_count(workers)
+    if workers == 1 or len(file_paths) < 2:
+        for file_path in file_paths:
+            yield worker(file_path, extractor_names)
+        return
+
+    if not chunk_size:
+        # Enough chunks per worker to balance uneven file sizes without paying
+        # the inter-process overhead on every single file.
+        chunk_size = max(1, min(256, len(file_paths) // (workers * 8)))
+    chunks = (file_paths[i:i + chunk_size] for i in range(0, len(file_paths), chunk_size))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(extract_chunk, worker, chunk, extractor_names))
+            if len(pending) >= workers * 4:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+class ProgressPrinter:
+    """
+    Prints 'PROGRESS <done> <total>' lines for a parent process to follow a run.
+
+    Lines are written at most every interval seconds, plus one for the last file,
+    so the output stays small on large trees.
+    """
+    def __init__(self, interval=PROGRESS_INTERVAL):
+        self.interval = interval
+        self.last = None
+
+    def __call__(self, done, total):
+        now = time.perf_counter()
+        if done == total or self.last is None or now - self.last >= self.interval:
+            self.last = now
+            print(f"{PROGRESS_PREFIX} {done} {total}", flush=True)
+
+def iter_file_metadata(file_paths, extractor_names, workers=1, chunk_size=None,
+                       worker=extract_file_metadata, profile=None, verbose=False, progress=None):
+    """
+    Yields the extracted records of each file, in the order of file_paths.
+
+    Args:
+        file_paths (list): Paths of the AxTable XML files.
+        extractor_names (list): Keys of EXTRACTORS to run.
+        workers (int, optional): Number of worker processes, 0 for one per CPU.
+        chunk_size (int, optional): Files handed to a worker at a time.
+        worker (callable, optional): Picklable function called per file; it must
+            accept a timings keyword when profiling.
+        profile (ExtractionProfile, optional): Records the timings of every file.
+        verbose (bool, optional): Print every file as its result arrives.
+        progress (callable, optional): Called with (files done, total files) after every file.
+
+    Yields:
+        dict: The result of worker for each file, by default the extractor name
+        mapped to the extracted record.
+    """
+    if profile is not None:
+        worker = partial(profile_worker, worker)
+    results = run_file_workers(file_paths, extractor_names, workers, chunk_size, worker)
+    for done, (file_path, result) in enumerate(zip(file_paths, results), 1):
+        if verbose:
+            print(f"Processing file: {file_path}")
+        if profile is not None:
+            result, timings = result
+            profile.add_file(file_path, timings)
+        if progress is not None:
+            progress(done, len(file_paths))
+        yield result
+
+class JsonArrayWriter:
+    """
+    Writes a JSON array one record at a time.
+
+    The output is byte-identical to json.dump(records, outfile, indent=4), without
+    holding the records in memory.
+    """
+    def __init__(self, outfile, indent=4):
+        self.outfile = outfile
+        self.indent = indent
+        self.count = 0
+
+    def write(self, record):
+        lines = json.dumps(record, indent=self.indent).split('\n')
+        padding = ' ' * self.indent
+        self.outfile.write(('[\n' if self.count == 0 else ',\n') + '\n'.join(padding + line for line in lines))
+        self.count += 1
+
+    def close(self):
+        self.outfile.write('\n]' if self.count else '[]')
+
+def collect_table_metadata(file_paths, extractor_names, workers=1, stream=False):
+    """
+    Runs the extractors over the given files and groups the records per extractor.
+
+    Args:
+        file_paths (list): Paths of the AxTable XML files.
+        extractor_names (list): Keys of EXTRACTORS to run.
+        workers (int, optional): Number of worker processes, 0 for one per CPU.
+        stream (bool, optional): Parse with iterparse, see extract_file_metadata.
+
+    Returns:
+        dict: Extractor name mapped to the list of extracted records.
+    """
+    results = {name: [] for name in extractor_names}
+    worker = partial(extract_file_metadata, stream=True) if stream else extract_file_metadata
+    for records in iter_file_metadata(file_paths, extractor_names, workers, worker=worker):
+        for name, record in records.items():
+            results[name].append(record)
+    return results
+
+def merge_table_records(records):
+    """Combines the records extracted from one file into a single per-table record."""
+    merged = {}
+    for record in records.values():
+        for key, value in record.items():
+            merged.setdefault(key, value)
+    return merged
+
+def write_table_metadata(file_records, extractor_names, output_paths, binary_path=None, graph_path=None,
+                         profile=None):
+    """
+    Appends each file's records to the output files as they arrive, so memory does not
+    grow with the size of the Metadata tree. Every file is written under a temporary
+    name and only replaces its target once complete, so a running backend never
+    reads a half-written file.
+
+    Args:
+        file_records (iterable): Per-file dicts of extractor name to record, in order.
+        extractor_names (list): Keys of EXTRACTORS to write.
+        output_paths (dict): Extractor name mapped to the JSON file to write.
+        binary_path (str, optional): Also write the binary per-table artifact here.
+        graph_path (str, optional): Also write the relation graph here; needs the
+            'relations' extractor.
+        profile (ExtractionProfile, optional): Times the writing as the 'serialize' phase.
+    """
+    temp_paths = {name: output_paths[name] + '.tmp' for name in extractor_names}
+    outfiles = {name: open(temp_paths[name], "w", encoding='utf-8') for name in extractor_names}
+    binary_writer = None
+    graph_builder = RelationGraphBuilder() if graph_path else None
+    replaced = False
+    try:
+        writers = {name: JsonArrayWriter(outfile) for name, outfile in outfiles.items()}
+        if binary_path:
+            sections = [key for name in extractor_names for key in EXTRACTORS[name]['record_fields']]
+            binary_writer = BinaryMetadataWriter(binary_path, sections)
+        for records in file_records:
+            with profile_phase(profile, 'serialize'):
+                for name, record in records.items():
+                    writers[name].write(record)
+                if binary_writer and records:
+                    binary_writer.write(merge_table_records(records))
+                if graph_builder and 'relations' in records:
+                    graph_builder.add(records['relations'])
+        with profile_phase(profile, 'serialize'):
+            for writer in writers.values():
+                writer.close()
+            for name, outfile in outfiles.items():
+                outfile.close()
+                os.replace(temp_paths[name], output_paths[name])
+            replaced = True
+            if binary_writer:
+                binary_writer.close()
+                binary_writer = None
+            if graph_builder:
+                graph_builder.write(graph_path)
+    finally:
+        for outfile in outfiles.values():
+            outfile.close()
+        if not replaced:
+            for temp_path in temp_paths.values():
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        if binary_writer:
+            binary_writer.discard()
+
+def extract_table_metadata_from_directory(directory, extractor_names, workers=1):
+    """
+    Extracts metadata from all AxTable XML files in a given directory.
+
+    Args:
+        directory (str): The directory containing the XML files.
+        extractor_names (list): Keys of EXTRACTORS to run.
+        workers (int, optional): Number of worker processes, 0 for one per CPU.
+
+    Returns:
+        dict: Extractor name mapped to the list of extracted records.
+    """
+    file_paths = [os.path.join(directory, filename)
+                  for filename in os.listdir(directory) if filename.endswith(".xml")]
+    return collect_table_metadata(file_paths, extractor_names, workers)
+
+def collect_table_metadata_incremental(file_paths, base_directory, output_dir, extractor_names, workers=1,
+                                       stream=False, profile=None, verbose=False, progress=None):
+    """
+    Re-parses only added or changed files and takes everything else from the manifest.
+
+    Args:
+        file_paths (list): Paths of the AxTable XML files of this run.
+        base_directory (str): The Metadata directory.
+        output_dir (str): Directory holding the manifest.
+        extractor_names (list): Keys of EXTRACTORS to run.
+        workers (int, optional): Number of worker processes, 0 for one per CPU.
+        stream (bool, optional): Parse with iterparse, see extract_file_metadata.
+        profile (ExtractionProfile, optional): Records phase and per-file timings.
+        verbose (bool, optional): Print every parsed file.
+        progress (callable, optional): Called with (files parsed, files to parse) after every file.
+
+    Returns:
+        tuple: (list of per-file dicts of extractor name to record, bool whether anything changed)
+    """
+    with profile_phase(profile, 'changeDetection'):
+        manifest_files = load_manifest(output_dir, base_directory)
+        entries, changed, refreshed = find_unchanged_entries(file_paths, base_directory, manifest_files,
+                                                             extractor_names)
+    removed = len(set(manifest_files) - {os.path.relpath(p, base_directory) for p in file_paths})
+    print(f"Incremental run: {len(entries)} unchanged, {len(changed)} to parse, {removed} removed.")
+
+    worker = partial(extract_file_entry, stream=True) if stream else extract_file_entry
+    results = iter_file_metadata(changed, extractor_names, workers, worker=worker, profile=profile, verbose=verbose,
+                                 progress=progress)
+    for file_path, entry in zip(changed, results):
+        entries[os.path.relpath(file_path, base_directory)] = entry
+
+    file_records = []
+    ordered_entries = {}
+    for file_path in file_paths:
+        key = os.path.relpath(file_path, base_directory)
+        entry = entries[key]
+        ordered_entries[key] = entry
+        file_records.append({name: entry['records'][name] for name in extractor_names if name in entry['records']})
+
+    modified = bool(changed or removed)
+    if modified or refreshed:
+        with profile_phase(profile, 'manifest'):
+            save_manifest(output_dir, base_directory, ordered_entries)
+    return file_records, modified
+
+def extract_table_metadata(base_directory, extractor_names=None, output_dir='.', workers=1, incremental=False,
+                           stream=False, full_walk=False, cache_discovery=False, binary=False, graph=False,
+                           profile_path=None, slowest=DEFAULT_SLOWEST, verbose=False, progress=None):
+    """
+    Walks the Metadata tree once and writes every requested metadata file.
+
+    Args:
+        base_directory (str): The base directory to start searching from.
+        extractor_names (list, optional): Keys of EXTRACTORS to run. Defaults to all.
+        output_dir (str, optional): Directory the JSON files are written to.
+        workers (int, optional): Number of worker processes, 0 for one per CPU.
+        incremental (bool, optional): Reuse the records of unchanged files from the
+            manifest of the previous run instead of parsing everything again.
+        stream (bool, optional): Parse with iterparse, keeping only the sections the
+            extractors read. Combined with incremental, records are still collected in
+            memory for the manifest.
+        full_walk (bool, optional): Search the whole tree for AxTable folders instead
+            of only the <Package>/<Model> levels.
+        cache_discovery (bool, optional): Reuse the AxTable directory list of the last
+            run while the package and model directories are unchanged.
+        binary (bool, optional): Also write the binary per-table artifact
+            (tableMetadata.bin) the backend reads records from on demand.
+        graph (bool, optional): Also write the relation graph with forward and
+            reverse edges (tableRelationGraph.json). Only used with the 'relations'
+            extractor.
+        profile_path (str, optional): Write a JSON report with phase timings, the
+            slowest files, files/sec and peak memory here.
+        slowest (int, optional): Number of slowest files listed in the report.
+        verbose (bool, optional): Print every AxTable directory and file.
+        progress (callable, optional): Called with (files parsed, files to parse) after
+            every file, e.g. a ProgressPrinter.
+
+    Returns:
+        dict: Extractor name mapped to the path of the written file.
+    """
+    profile = ExtractionProfile(slowest) if profile_path else None
+    extractor_names = list(extractor_names or EXTRACTORS)
+    os.makedirs(output_dir, exist_ok=True)
+    with profile_phase(profile, 'walk'):
+        ax_table_dirs = find_ax_table_directories(base_directory, full_walk, resolve_worker_count(workers),
+                                                  output_dir if cache_discovery else None)
+        file_paths = list_ax_table_files(ax_table_dirs, verbose)
+    print(f"Found {len(file_paths)} AxTable files in {len(ax_table_dirs)} directories.")
+    output_paths = {name: os.path.join(output_dir, EXTRACTORS[name]['output_file'])
+                    for name in extractor_names}
+
+    binary_path = os.path.join(output_dir, BINARY_OUTPUT_FILE) if binary else None
+    graph_path = os.path.join(output_dir, RELATION_GRAPH_FILE) if graph and 'relations' in extractor_names else None
+
+    if incremental:
+        file_records, changed = collect_table_metadata_incremental(
+            file_paths, base_directory, output_dir, extractor_names, workers, stream, profile, verbose, progress)
+        expected_files = list(output_paths.values()) + [path for path in (binary_path, graph_path) if path]
+        if not changed and all(os.path.exists(path) for path in expected_files):
+            print("No AxTable changes detected, metadata files are up to date.")
+            write_profile(profile, profile_path, base_directory, file_paths, workers, incremental, stream)
+            return output_paths
+    else:
+        worker = partial(extract_file_metadata, stream=True) if stream else extract_file_metadata
+        file_records = iter_file_metadata(file_paths, extractor_names, workers, worker=worker, profile=profile,
+                                          verbose=verbose, progress=progress)
+
+    # Save extracted data as it arrives
+    write_table_metadata(file_records, extractor_names, output_paths, binary_path, graph_path, profile)
+    for name in extractor_names:
+        print(f"{name.capitalize()} data extracted and saved to {output_paths[name]}")
+    if binary_path:
+        print(f"Binary table metadata saved to {binary_path}")
+    if graph_path:
+        print(f"Relation graph saved to {graph_path}")
+    write_profile(profile, profile_path, base_directory, file_paths, workers, incremental, stream)
+    return output_paths
+
+def write_profile(profile, profile_path, base_directory, file_paths, workers, incremental, stream):
+    """Writes the profile report of a run, if profiling was requested."""
+    if profile is None:
+        return
+    profile.write(profile_path,
+                  baseDirectory=os.path.abspath(base_directory),
+                  filesTotal=len(file_paths),
+                  workers=resolve_worker_count(workers),
+                  incremental=incremental,
+                  stream=stream)
+    print(f"Profile report saved to {profile_path}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract AxTable metadata in a single pass over the Metadata tree.")
+    parser.add_argument('base_directory', nargs='?', default=DEFAULT_BASE_DIR,
+                        help="ApplicationSuite Metadata directory")
+    parser.add_argument('--only', nargs='+', choices=list(EXTRACTORS), default=list(EXTRACTORS),
+                        help="Metadata files to generate (default: all)")
+    parser.add_argument('--output-dir', default='.',
+                        help="Directory the JSON files are written to (default: current directory)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes used to parse the XML files, 0 for one per CPU (default: 1)")
+    parser.add_argument('--incremental', action='store_true',
+                        help=f"Only re-parse files changed since the last run, tracked in {MANIFEST_FILE}; "
+                             f"keeps every record in memory for the manifest, also with --stream")
+    parser.add_argument('--stream', action='store_true',
+                        help="Parse with iterparse, keeping only the XML sections the extractors read, to keep memory flat")
+    parser.add_argument('--full-walk', action='store_true',
+                        help="Search the whole tree for AxTable folders, for non-standard layouts")
+    parser.add_argument('--cache-discovery', action='store_true',
+                        help=f"Reuse the AxTable folder list cached in {metadata_discovery.DISCOVERY_CACHE_FILE} "
+                             "while the package and model folders are unchanged")
+    parser.add_argument('--binary', action='store_true',
+                        help=f"Also write {BINARY_OUTPUT_FILE}, a compact per-table artifact with a name index")
+    parser.add_argument('--graph', action='store_true',
+                        help=f"Also write {RELATION_GRAPH_FILE}, the relations indexed in both directions")
+    parser.add_argument('--profile', '--stats', dest='profile', nargs='?', const=True, default=None,
+                        metavar='REPORT',
+                        help=f"Write a JSON report with phase timings, slowest files, files/sec and peak memory "
+                             f"(default: {PROFILE_FILE} in the output directory)")
+    parser.add_argument('--slowest', type=int, default=DEFAULT_SLOWEST,
+                        help=f"Number of slowest files listed in the profile report (default: {DEFAULT_SLOWEST})")
+    parser.add_argument('--verbose', action='store_true',
+                        help="Print every AxTable directory and file as it is processed")
+    parser.add_argument('--progress', action='store_true',
+                        help=f"Print '{PROGRESS_PREFIX} <done> <total>' lines while files are parsed, "
+                             "for scripts following the run")
+    args = parser.parse_args(argv)
+    if args.profile is True:
+        args.profile = os.path.join(args.output_dir, PROFILE_FILE)
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if not os.path.exists(args.base_directory):
+        print(f"Directory not found: {args.base_directory}")
+        sys.exit(1)
+
+    print(f"Using base directory: {args.base_directory}")
+    extract_table_metadata(args.base_directory, args.only, args.output_dir, args.workers, args.incremental,
+                           args.stream, args.full_walk, args.cache_discovery, args.binary, args.graph,
+                           args.profile, args.slowest, args.verbose, ProgressPrinter() if args.progress else None)
+    print("Table metadata extraction completed successfully!")
@@ -0,0 +1,139 @@
+import heapq
+import json
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+# Timing and memory report of an extraction run (--profile / --stats).
+#
+# Phases measured in the main process (walk, changeDetection, serialize, manifest)
+# are wall-clock time. The per-file phases (read, parse, extract) are measured in
+# whichever process handled the file and summed over all files, so with several
+# workers they add up to more than the wall-clock time of the run.
+PROFILE_FILE = 'extractionProfile.json'
+FILE_PHASES = ('read', 'parse', 'extract')
+DEFAULT_SLOWEST = 10
+
+class ExtractionProfile:
+    """
+    Collects phase timings and per-file timings of one extraction run.
+
+    Args:
+        slowest (int, optional): Number of slowest files kept for the report.
+    """
+    def __init__(self, slowest=DEFAULT_SLOWEST):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.files = 0
+        self.bytes = 0
+        self.slowest_count = slowest
+        self.slowest = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def add_file(self, file_path, timings):
+        self.files += 1
+        self.bytes += timings.get('size', 0)
+        for name in FILE_PHASES:
+            self.phases[name] = self.phases.get(name, 0.0) + timings.get(name, 0.0)
+
+        total = sum(timings.get(name, 0.0) for name in FILE_PHASES)
+        entry = (total, self.files, file_path, timings)
+        if len(self.slowest) < self.slowest_count:
+            heapq.heappush(self.slowest, entry)
+        elif self.slowest and total > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def report(self, **details):
+        """
+        Builds the machine-readable report.
+
+        Args:
+            **details: Extra top-level fields, e.g. the run options.
+
+        Returns:
+            dict: The report.
+        """
+        wall = time.perf_counter() - self.started
+        slowest = sorted(self.slowest, key=lambda entry: (-entry[0], entry[1]))
+        return {
+            **details,
+            "wallSeconds": round(wall, 3),
+            "filesParsed": self.files,
+            "bytesParsed": self.bytes,
+            "filesPerSecond": round(self.files / wall, 1) if wall > 0 else None,
+            "phaseSeconds": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+            "peakMemoryBytes": peak_memory(),
+            "slowestFiles": [
+                {"path": file_path, "size": timings.get('size', 0), "seconds": round(total, 4),
+                 **{name: round(timings.get(name, 0.0), 4) for name in FILE_PHASES}}
+                for total, _, file_path, timings in slowest
+            ],
+        }
+
+    def write(self, path, **details):
+        """Writes the report as JSON and returns it."""
+        report = self.report(**details)
+        with open(path, 'w', encoding='utf-8') as outfile:
+            json.dump(report, outfile, indent=4)
+        return report
+
+def profile_phase(profile, name):
+    """Times a phase when profiling, otherwise does nothing."""
+    return profile.phase(name) if profile is not None else nullcontext()
+
+def profile_worker(worker, file_path, extractor_names):
+    """Runs a per-file worker and returns its result with the file's timings."""
+    timings = {}
+    result = worker(file_path, extractor_names, timings=timings)
+    return result, timings
+
+def windows_peak_working_set():
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        get_current_process = ctypes.windll.kernel32.GetCurrentProcess
+        get_current_process.restype = wintypes.HANDLE
+        get_memory_info = ctypes.windll.psapi.GetProcessMemoryInfo
+        get_memory_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        if not get_memory_info(get_current_process(), ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize
+    except (ImportError, AttributeError, OSError):
+        return None
+
+def peak_memory():
+    """
+    Peak resident memory of this process and of its largest finished worker.
+
+    Returns:
+        dict: 'main' and 'largestWorker' in bytes; None where the platform does not
+        report it (worker memory is not available on Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return {"main": windows_peak_working_set(), "largestWorker": None}
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return {
+        "main": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+        "largestWorker": workers or None,
+    }
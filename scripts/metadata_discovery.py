@@ -0,0 +1,163 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+AX_TABLE_DIR = 'AxTable'
+# Metadata/<Package>/<Model>/AxTable: AxTable folders sit two levels below the root.
+LAYOUT_DEPTH = 2
+DISCOVERY_CACHE_FILE = 'axTableDirectories.json'
+DISCOVERY_CACHE_VERSION = 1
+
+def list_subdirectories(path):
+    """
+    Lists the sub-directories of a directory with a single os.scandir call.
+
+    Args:
+        path (str): The directory to list.
+
+    Returns:
+        list: (name, path, is_symlink) tuples in directory order.
+    """
+    try:
+        with os.scandir(path) as entries:
+            return [(entry.name, entry.path, entry.is_symlink()) for entry in entries if entry.is_dir()]
+    except OSError as e:
+        print(f"WARNING: Could not scan {path}: {e}")
+        return []
+
+def scan_ax_table_directories(directory, depth, max_depth, ax_table_dirs, visited):
+    """
+    Collects AxTable directories below a directory, in the same order as os.walk.
+
+    Only directories up to max_depth are opened, so the contents of model folders
+    (AxClass, AxForm, AxTable, ...) are never walked.
+
+    Args:
+        directory (str): The directory to scan.
+        depth (int): Depth of directory below the Metadata root.
+        max_depth (int): Deepest level whose sub-directories are scanned, None for no limit.
+        ax_table_dirs (list): Receives the AxTable directory paths.
+        visited (list): Receives every scanned directory, used to validate the cache.
+    """
+    visited.append(directory)
+    subdirectories = list_subdirectories(directory)
+    if any(name == AX_TABLE_DIR for name, _, _ in subdirectories):
+        ax_table_dirs.append(os.path.join(directory, AX_TABLE_DIR))
+    if max_depth is not None and depth >= max_depth:
+        return
+    for _, path, is_symlink in subdirectories:
+        # Like os.walk, do not follow symlinks
+        if is_symlink:
+            continue
+        scan_ax_table_directories(path, depth + 1, max_depth, ax_table_dirs, visited)
+
+def scan_package(package_path, max_depth):
+    ax_table_dirs = []
+    visited = []
+    scan_ax_table_directories(package_path, 1, max_depth, ax_table_dirs, visited)
+    return ax_table_dirs, visited
+
+def discover_ax_table_directories(base_directory, max_depth=LAYOUT_DEPTH, workers=1):
+    """
+    Finds the AxTable directories of a Metadata tree.
+
+    Args:
+        base_directory (str): The Metadata root directory.
+        max_depth (int, optional): Deepest level scanned for sub-directories. The
+            default follows the <Package>/<Model>/AxTable layout; None walks the
+            whole tree.
+        workers (int, optional): Threads scanning the top-level packages in parallel.
+
+    Returns:
+        tuple: (list of AxTable directory paths, list of scanned directories)
+    """
+    ax_table_dirs = []
+    visited = [base_directory]
+    packages = list_subdirectories(base_directory)
+    if any(name == AX_TABLE_DIR for name, _, _ in packages):
+        ax_table_dirs.append(os.path.join(base_directory, AX_TABLE_DIR))
+    package_paths = [path for _, path, is_symlink in packages if not is_symlink]
+
+    if max_depth == 0:
+        return ax_table_dirs, visited
+    if workers > 1 and len(package_paths) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(scan_package, package_paths, [max_depth] * len(package_paths)))
+    else:
+        results = [scan_package(path, max_depth) for path in package_paths]
+
+    for package_dirs, package_visited in results:
+        ax_table_dirs.extend(package_dirs)
+        visited.extend(package_visited)
+    return ax_table_dirs, visited
+
+def directory_mtimes(directories):
+    mtimes = {}
+    for directory in directories:
+        try:
+            mtimes[directory] = os.stat(directory).st_mtime_ns
+        except OSError:
+            mtimes[directory] = None
+    return mtimes
+
+def load_cached_directories(cache_path, base_directory, max_depth):
+    """
+    Returns the cached AxTable directory list if none of the scanned directories changed.
+
+    Adding or removing a package, model or AxTable folder updates the mtime of its
+    parent, and every parent down to the model level is part of the cache, so a
+    stat of those few hundred directories replaces the full scan.
+    """
+    try:
+        with open(cache_path, encoding='utf-8') as infile:
+            cache = json.load(infile)
+    except (OSError, ValueError):
+        return None
+
+    if cache.get('version') != DISCOVERY_CACHE_VERSION or \
+            cache.get('baseDirectory') != os.path.abspath(base_directory) or \
+            cache.get('maxDepth') != max_depth:
+        return None
+    cached_mtimes = cache.get('directories', {})
+    if directory_mtimes(cached_mtimes) != cached_mtimes:
+        return None
+    return cache.get('axTableDirectories')
+
+def save_cached_directories(cache_path, base_directory, max_depth, ax_table_dirs, visited):
+    temp_path = cache_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as outfile:
+        json.dump({
+            "version": DISCOVERY_CACHE_VERSION,
+            "baseDirectory": os.path.abspath(base_directory),
+            "maxDepth": max_depth,
+            "directories": directory_mtimes(visited),
+            "axTableDirectories": ax_table_dirs,
+        }, outfile, separators=(',', ':'))
+    os.replace(temp_path, cache_path)
+
+def find_ax_table_directories(base_directory, max_depth=LAYOUT_DEPTH, workers=1, cache_dir=None):
+    """
+    Finds the AxTable directories of a Metadata tree, reusing a cached list when possible.
+
+    Args:
+        base_directory (str): The Metadata root directory.
+        max_depth (int, optional): Deepest level scanned, None to walk the whole tree.
+        workers (int, optional): Threads scanning the top-level packages in parallel.
+        cache_dir (str, optional): Directory holding the discovery cache. No cache is
+            used when omitted.
+
+    Returns:
+        list: A list of paths to directories named 'AxTable'.
+    """
+    cache_path = os.path.join(cache_dir, DISCOVERY_CACHE_FILE) if cache_dir else None
+    if cache_path:
+        cached = load_cached_directories(cache_path, base_directory, max_depth)
+        if cached is not None:
+            print(f"Reusing {len(cached)} cached AxTable directories.")
+            return cached
+
+    ax_table_dirs, visited = discover_ax_table_directories(base_directory, max_depth, workers)
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        save_cached_directories(cache_path, base_directory, max_depth, ax_table_dirs, visited)
+    return ax_table_dirs
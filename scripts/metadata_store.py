@@ -0,0 +1,101 @@
+import json
+import os
+import struct
+
+# Compact per-table metadata artifact read by backend/metadataStore.js.
+#
+# Layout (little-endian):
+#   header  magic 'SQXM', u16 version, u16 reserved, u32 table count,
+#           u32 info length, u64 index offset
+#   info    JSON object describing the file (e.g. which sections records hold)
+#   data    one compact JSON record per table, back to back
+#   index   per table: u16 name length, lowercased UTF-8 name, u64 record offset,
+#           u32 record length
+#
+# The index sits at the end so records can be streamed to disk as they are
+# extracted; the backend only reads the header and index at startup and then
+# fetches single records by offset.
+BINARY_OUTPUT_FILE = 'tableMetadata.bin'
+MAGIC = b'SQXM'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHIIQ')
+INDEX_ENTRY = struct.Struct('<QI')
+NAME_LENGTH = struct.Struct('<H')
+
+class BinaryMetadataWriter:
+    """
+    Writes per-table metadata records into the binary artifact one table at a time.
+
+    Records go to a temporary file that replaces the target on close(), so a
+    running backend never sees a half-written artifact.
+
+    Args:
+        path (str): The file to write.
+        sections (list): Names of the record fields present in every record, stored
+            in the info block so readers know which lookups the file can answer.
+    """
+    def __init__(self, path, sections):
+        self.path = path
+        self.temp_path = path + '.tmp'
+        self.outfile = open(self.temp_path, 'wb')
+        self.entries = []
+        self.names = set()
+        info = json.dumps({"sections": list(sections)}, separators=(',', ':')).encode('utf-8')
+        self.info_length = len(info)
+        self.outfile.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, 0, self.info_length, 0))
+        self.outfile.write(info)
+
+    def write(self, record):
+        # Lookups return the first table of a given name, like Array.find over the JSON
+        key = record['tableName'].lower()
+        if key in self.names:
+            return
+        data = json.dumps(record, separators=(',', ':')).encode('utf-8')
+        self.entries.append((key, self.outfile.tell(), len(data)))
+        self.names.add(key)
+        self.outfile.write(data)
+
+    def close(self):
+        index_offset = self.outfile.tell()
+        for key, offset, length in self.entries:
+            name = key.encode('utf-8')
+            self.outfile.write(NAME_LENGTH.pack(len(name)) + name + INDEX_ENTRY.pack(offset, length))
+        self.outfile.seek(0)
+        self.outfile.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(self.entries), self.info_length, index_offset))
+        self.outfile.close()
+        os.replace(self.temp_path, self.path)
+
+    def discard(self):
+        self.outfile.close()
+        os.remove(self.temp_path)
+
+def read_table_record(path, table_name):
+    """
+    Looks up a single table in a binary metadata file.
+
+    Args:
+        path (str): The binary metadata file.
+        table_name (str): The table to look up, case-insensitive.
+
+    Returns:
+        dict: The table record, or None if the table is not in the file.
+    """
+    with open(path, 'rb') as infile:
+        magic, version, _, count, _, index_offset = HEADER.unpack(infile.read(HEADER.size))
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} table metadata file")
+        infile.seek(index_offset)
+        index = infile.read()
+        key = table_name.lower()
+        position = 0
+        for _ in range(count):
+            (name_length,) = NAME_LENGTH.unpack_from(index, position)
+            position += NAME_LENGTH.size
+            name = index[position:position + name_length].decode('utf-8')
+            position += name_length
+            offset, length = INDEX_ENTRY.unpack_from(index, position)
+            position += INDEX_ENTRY.size
+            if name == key:
+                infile.seek(offset)
+                return json.loads(infile.read(length))
+    return None
@@ -0,0 +1,69 @@
+import json
+import os
+
+# Adjacency index over the AxTable relations, read by backend/relationGraph.js.
+#
+# tableRelations.json only lists the outgoing relations of each table, so finding
+# the tables that reference a given table means scanning all of them. The graph
+# stores both directions per table, keyed by lowercased table name:
+#
+#   {"version": 1,
+#    "tables": {"custtable": {"name": "CustTable",
+#                             "forward": [edge, ...],
+#                             "reverse": [edge, ...]}}}
+#
+# Edges have the shape of the entries of tableRelations.json. 'relatedTable' is
+# the table on the other side, and in the constraints 'field' is always a column
+# of the table the edge belongs to, so a reverse edge is joined like a forward one.
+RELATION_GRAPH_FILE = 'tableRelationGraph.json'
+GRAPH_VERSION = 1
+# Related table the extractor records when a relation does not name one
+UNKNOWN_TABLE = 'Unknown'
+
+class RelationGraphBuilder:
+    """
+    Collects relation records one table at a time and writes the adjacency index.
+
+    Like the table lookups of the backend, only the first record of a table name
+    is used. Relations without a related table cannot be joined and are left out.
+    """
+    def __init__(self):
+        self.tables = {}
+        self.seen = set()
+
+    def node(self, table_name):
+        key = table_name.lower()
+        if key not in self.tables:
+            self.tables[key] = {"name": table_name, "forward": [], "reverse": []}
+        return self.tables[key]
+
+    def add(self, record):
+        table_name = record['tableName']
+        if table_name.lower() in self.seen:
+            return
+        self.seen.add(table_name.lower())
+        source = self.node(table_name)
+        # A referenced table may have been added before its own record was seen
+        source['name'] = table_name
+
+        for relation in record['relations']:
+            related_table = relation.get('relatedTable')
+            if not related_table or related_table == UNKNOWN_TABLE:
+                continue
+            target = self.node(related_table)
+            source['forward'].append(relation)
+            target['reverse'].append({
+                "name": relation['name'],
+                "relatedTable": table_name,
+                "cardinality": relation['cardinality'],
+                "relationshipType": relation['relationshipType'],
+                "constraints": [{"field": c['relatedField'], "relatedField": c['field']}
+                                for c in relation['constraints']],
+            })
+
+    def write(self, path):
+        """Writes the graph through a temporary file so readers never see a partial file."""
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as outfile:
+            json.dump({"version": GRAPH_VERSION, "tables": self.tables}, outfile, separators=(',', ':'))
+        os.replace(temp_path, path)
@@ -0,0 +1,154 @@
+import argparse
+import os
+import random
+from xml.sax.saxutils import escape
+
+# Generates a synthetic ApplicationSuite Metadata tree for benchmarking the
+# extractors without a D365 checkout. The layout and the AxTable XML follow the
+# real files: Metadata/<Package>/<Model>/AxTable/<Table>.xml, next to other
+# element folders (AxClass, AxForm, ...) the extractors have to skip.
+FIELD_TYPES = ('AxTableFieldString', 'AxTableFieldInt', 'AxTableFieldInt64', 'AxTableFieldReal',
+               'AxTableFieldDate', 'AxTableFieldUtcDateTime', 'AxTableFieldEnum', 'AxTableFieldGuid')
+OTHER_ELEMENT_DIRS = ('AxClass', 'AxForm', 'AxEdt', 'AxEnum')
+SOURCE_LINE = '    // Synthetic method body used to give the file a realistic size.\n'
+
+def table_name(index):
+    return f"BenchTable{index:06d}"
+
+def build_ax_table_xml(name, field_count, index_count, relation_count, source_bytes, table_count, rng):
+    """
+    Builds the XML of one AxTable file.
+
+    Args:
+        name (str): The table name.
+        field_count (int): Number of fields.
+        index_count (int): Number of indexes, each over one to three fields.
+        relation_count (int): Number of relations to other synthetic tables.
+        source_bytes (int): Approximate size of the X++ source section, which the
+            extractors do not read but still have to parse or skip.
+        table_count (int): Number of tables in the tree, relation targets are picked from them.
+        rng (Random): Random source.
+
+    Returns:
+        str: The XML document.
+    """
+    fields = [f"Field{i}" for i in range(field_count)]
+    parts = ['<?xml version="1.0" encoding="utf-8"?>\n',
+             '<AxTable xmlns:i="http://www.w3.org/2001/XMLSchema-instance">\n',
+             f'\t<Name>{name}</Name>\n',
+             '\t<SourceCode>\n\t\t<Declaration><![CDATA[\n',
+             SOURCE_LINE * max(1, source_bytes // len(SOURCE_LINE)),
+             ']]></Declaration>\n\t</SourceCode>\n',
+             '\t<Label>@SYS0001</Label>\n',
+             '\t<Fields>\n']
+    for i, field in enumerate(fields):
+        parts.append(f'\t\t<AxTableField xmlns="" i:type="{FIELD_TYPES[i % len(FIELD_TYPES)]}">\n'
+                     f'\t\t\t<Name>{field}</Name>\n'
+                     f'\t\t\t<ExtendedDataType>BenchEdt{i}</ExtendedDataType>\n'
+                     f'\t\t</AxTableField>\n')
+    parts.append('\t</Fields>\n\t<FieldGroups />\n\t<Indexes>\n')
+    for i in range(index_count):
+        index_fields = rng.sample(fields, min(len(fields), rng.randint(1, 3)))
+        parts.append(f'\t\t<AxTableIndex>\n\t\t\t<Name>Idx{i}</Name>\n'
+                     f'\t\t\t<AllowDuplicates>{"Yes" if i else "No"}</AllowDuplicates>\n\t\t\t<Fields>\n')
+        for field in index_fields:
+            parts.append(f'\t\t\t\t<AxTableIndexField>\n\t\t\t\t\t<DataField>{field}</DataField>\n'
+                         f'\t\t\t\t</AxTableIndexField>\n')
+        parts.append('\t\t\t</Fields>\n\t\t</AxTableIndex>\n')
+    parts.append('\t</Indexes>\n\t<Mappings />\n\t<Relations>\n')
+    for i in range(relation_count):
+        related = table_name(rng.randrange(table_count))
+        field = rng.choice(fields)
+        parts.append(f'\t\t<AxTableRelation>\n\t\t\t<Name>{escape(related)}{i}</Name>\n'
+                     f'\t\t\t<Cardinality>ZeroMore</Cardinality>\n'
+                     f'\t\t\t<RelatedTable>{escape(related)}</RelatedTable>\n'
+                     f'\t\t\t<RelationshipType>Association</RelationshipType>\n\t\t\t<Constraints>\n'
+                     f'\t\t\t\t<AxTableRelationConstraint xmlns="" i:type="AxTableRelationConstraintField">\n'
+                     f'\t\t\t\t\t<Name>{field}</Name>\n\t\t\t\t\t<Field>{field}</Field>\n'
+                     f'\t\t\t\t\t<RelatedField>RecId</RelatedField>\n'
+                     f'\t\t\t\t</AxTableRelationConstraint>\n\t\t\t</Constraints>\n\t\t</AxTableRelation>\n')
+    parts.append('\t</Relations>\n\t<StateMachines />\n</AxTable>\n')
+    return ''.join(parts)
+
+def generate_metadata_tree(base_directory, tables=1000, packages=10, models=2, fields=20, indexes=4,
+                           relations=6, source_kb=8.0, source_sigma=1.0, other_files=2, seed=0):
+    """
+    Writes a synthetic Metadata tree.
+
+    Tables are spread evenly over the <Package>/<Model> folders. The size of the
+    X++ source section follows a log-normal distribution, which matches the long
+    tail of real AxTable files: most are small, a few are very large.
+
+    Args:
+        base_directory (str): The Metadata directory to create.
+        tables (int, optional): Total number of AxTable files.
+        packages (int, optional): Number of package folders.
+        models (int, optional): Model folders per package.
+        fields (int, optional): Fields per table.
+        indexes (int, optional): Indexes per table.
+        relations (int, optional): Relations per table.
+        source_kb (float, optional): Median size of the source section in KB.
+        source_sigma (float, optional): Spread of the log-normal size distribution.
+        other_files (int, optional): Files per non-table element folder.
+        seed (int, optional): Random seed; the same arguments produce the same tree.
+
+    Returns:
+        list: Paths of the written AxTable files.
+    """
+    rng = random.Random(seed)
+    model_dirs = [os.path.join(base_directory, f"BenchPackage{p}", f"BenchModel{p}_{m}")
+                  for p in range(packages) for m in range(models)]
+    file_paths = []
+    for number, model_dir in enumerate(model_dirs):
+        for element_dir in OTHER_ELEMENT_DIRS:
+            os.makedirs(os.path.join(model_dir, element_dir), exist_ok=True)
+            for i in range(other_files):
+                with open(os.path.join(model_dir, element_dir, f"{element_dir}{i}.xml"), 'w', encoding='utf-8') as f:
+                    f.write(f'<?xml version="1.0" encoding="utf-8"?>\n<{element_dir}><Name>X{i}</Name></{element_dir}>\n')
+
+        ax_table_dir = os.path.join(model_dir, 'AxTable')
+        os.makedirs(ax_table_dir, exist_ok=True)
+        for index in range(number, tables, len(model_dirs)):
+            name = table_name(index)
+            source_bytes = int(rng.lognormvariate(0, source_sigma) * source_kb * 1024)
+            xml = build_ax_table_xml(name, fields, indexes, relations, source_bytes, tables, rng)
+            file_path = os.path.join(ax_table_dir, f"{name}.xml")
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(xml)
+            file_paths.append(file_path)
+    return file_paths
+
+def add_generator_arguments(parser):
+    parser.add_argument('--packages', type=int, default=10, help="Package folders (default: 10)")
+    parser.add_argument('--models', type=int, default=2, help="Model folders per package (default: 2)")
+    parser.add_argument('--fields', type=int, default=20, help="Fields per table (default: 20)")
+    parser.add_argument('--indexes', type=int, default=4, help="Indexes per table (default: 4)")
+    parser.add_argument('--relations', type=int, default=6, help="Relations per table (default: 6)")
+    parser.add_argument('--source-kb', type=float, default=8.0,
+                        help="Median size of the X++ source section per file in KB (default: 8)")
+    parser.add_argument('--source-sigma', type=float, default=1.0,
+                        help="Spread of the log-normal file size distribution (default: 1.0)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0)")
+
+def generator_options(args):
+    """Maps parsed generator arguments to generate_metadata_tree keyword arguments."""
+    return {
+        "packages": args.packages,
+        "models": args.models,
+        "fields": args.fields,
+        "indexes": args.indexes,
+        "relations": args.relations,
+        "source_kb": args.source_kb,
+        "source_sigma": args.source_sigma,
+        "seed": args.seed,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic AxTable Metadata tree.")
+    parser.add_argument('base_directory', help="Metadata directory to create")
+    parser.add_argument('--tables', type=int, default=1000, help="Total AxTable files (default: 1000)")
+    add_generator_arguments(parser)
+    args = parser.parse_args()
+
+    written = generate_metadata_tree(args.base_directory, args.tables, **generator_options(args))
+    print(f"Generated {len(written)} AxTable files in {args.base_directory}")
@@ -0,0 +1,44 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+from extract_table_metadata import extract_relations_from_root
+from relation_graph import RelationGraphBuilder
+
+AX_TABLE = """<AxTable>
+    <Name>SalesLine</Name>
+    <Relations>
+        <AxTableRelation>
+            <Name>SalesTable</Name>
+            <RelatedTable>SalesTable</RelatedTable>
+            <Constraints>
+                <AxTableRelationConstraint>
+                    <Field>SalesId</Field>
+                    <RelatedField>SalesId</RelatedField>
+                </AxTableRelationConstraint>
+            </Constraints>
+        </AxTableRelation>
+        <AxTableRelation>
+            <Name>Broken</Name>
+            <RelatedTable />
+        </AxTableRelation>
+    </Relations>
+</AxTable>"""
+
+class RelationGraphTest(unittest.TestCase):
+    def test_empty_related_table_is_unknown(self):
+        record = extract_relations_from_root(ET.fromstring(AX_TABLE), 'SalesLine.xml')
+        self.assertEqual([r['relatedTable'] for r in record['relations']], ['SalesTable', 'Unknown'])
+
+    def test_relations_without_related_table_are_left_out(self):
+        record = extract_relations_from_root(ET.fromstring(AX_TABLE), 'SalesLine.xml')
+        record['relations'].append({"name": "Null", "relatedTable": None, "cardinality": None,
+                                    "relationshipType": None, "constraints": []})
+        builder = RelationGraphBuilder()
+        builder.add(record)
+
+        self.assertEqual(sorted(builder.tables), ['salesline', 'salestable'])
+        self.assertEqual([r['name'] for r in builder.tables['salesline']['forward']], ['SalesTable'])
+        self.assertEqual(builder.tables['salestable']['reverse'][0]['relatedTable'], 'SalesLine')
+
+if __name__ == '__main__':
+    unittest.main()
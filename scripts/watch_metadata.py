@@ -0,0 +1,238 @@
+import os
+import sys
+import argparse
+import time
+import urllib.error
+import urllib.request
+
+import metadata_discovery
+from extract_table_metadata import (DEFAULT_BASE_DIR, EXTRACTORS, extract_table_metadata,
+                                    find_ax_table_directories)
+from metadata_store import BINARY_OUTPUT_FILE
+from relation_graph import RELATION_GRAPH_FILE
+
+# Long-running companion of extract_table_metadata.py: polls the AxTable folders
+# and, once files were added, changed or removed, re-runs the incremental
+# extraction (only the touched files are parsed again) and asks the backend to
+# reload the regenerated files. Every artifact is replaced atomically, so the
+# backend keeps answering from the previous metadata until the reload.
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend', 'resources')
+DEFAULT_RELOAD_URL = 'http://localhost:3001/api/metadata/reload'
+DEFAULT_INTERVAL = 5.0
+DEFAULT_SETTLE = 2.0
+RELOAD_TIMEOUT = 30
+
+def current_ax_table_directories(base_directory, output_dir, full_walk=False, workers=1):
+    """
+    Lists the AxTable directories, from the discovery cache while no package or model
+    directory has changed, so polling does not walk the tree every time.
+
+    Args:
+        base_directory (str): The Metadata directory.
+        output_dir (str): Directory holding the discovery cache.
+        full_walk (bool, optional): Search the whole tree for AxTable folders.
+        workers (int, optional): Threads used when the tree has to be searched again.
+
+    Returns:
+        list: Paths of the AxTable directories.
+    """
+    max_depth = None if full_walk else metadata_discovery.LAYOUT_DEPTH
+    cache_path = os.path.join(output_dir, metadata_discovery.DISCOVERY_CACHE_FILE)
+    cached = metadata_discovery.load_cached_directories(cache_path, base_directory, max_depth)
+    if cached is not None:
+        return cached
+    return find_ax_table_directories(base_directory, full_walk, workers, output_dir)
+
+def snapshot_files(ax_table_dirs):
+    """
+    Reads the modification time and size of every AxTable XML file.
+
+    Args:
+        ax_table_dirs (list): Paths of directories named 'AxTable'.
+
+    Returns:
+        dict: File path mapped to a (mtime in ns, size) tuple.
+    """
+    snapshot = {}
+    for ax_table_dir in ax_table_dirs:
+        try:
+            with os.scandir(ax_table_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.xml') and entry.is_file():
+                        stat = entry.stat()
+                        snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            # Removed since the directories were listed; its files count as removed
+            continue
+    return snapshot
+
+def describe_changes(previous, current):
+    """Summarizes the difference between two snapshots, e.g. '2 added, 1 changed, 0 removed'."""
+    added = len(current.keys() - previous.keys())
+    removed = len(previous.keys() - current.keys())
+    changed = sum(1 for path, stat in current.items() if path in previous and previous[path] != stat)
+    return f"{added} added, {changed} changed, {removed} removed"
+
+def artifact_paths(output_dir, extractor_names):
+    """Paths of the metadata files the backend reads."""
+    names = [EXTRACTORS[name]['output_file'] for name in extractor_names]
+    names += [BINARY_OUTPUT_FILE, RELATION_GRAPH_FILE]
+    return [os.path.join(output_dir, name) for name in names]
+
+def artifact_mtimes(paths):
+    """Modification times of the given files, None for missing ones."""
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            mtimes[path] = None
+    return mtimes
+
+def notify_backend(reload_url):
+    """
+    Asks the backend to reload the metadata files.
+
+    Args:
+        reload_url (str): The reload endpoint, e.g. DEFAULT_RELOAD_URL.
+
+    Returns:
+        bool: True if the backend confirmed the reload.
+    """
+    request = urllib.request.Request(reload_url, data=b'{}', method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=RELOAD_TIMEOUT) as response:
+            print(f"Backend reloaded the metadata ({response.status}).")
+            return True
+    except (urllib.error.URLError, OSError) as e:
+        print(f"WARNING: Could not notify the backend at {reload_url}: {e}")
+        return False
+
+def sync_metadata(base_directory, output_dir, extractor_names, workers=1, full_walk=False, reload_url=None):
+    """
+    Runs one incremental extraction and notifies the backend if any artifact changed.
+
+    Args:
+        base_directory (str): The Metadata directory.
+        output_dir (str): Directory the metadata files are written to.
+        extractor_names (list): Keys of EXTRACTORS to run.
+        workers (int, optional): Number of worker processes, 0 for one per CPU.
+        full_walk (bool, optional): Search the whole tree for AxTable folders.
+        reload_url (str, optional): Reload endpoint of the backend; not notified when empty.
+
+    Returns:
+        bool: True if any metadata file was rewritten.
+    """
+    paths = artifact_paths(output_dir, extractor_names)
+    before = artifact_mtimes(paths)
+    extract_table_metadata(base_directory, extractor_names, output_dir, workers, incremental=True, stream=True,
+                           full_walk=full_walk, cache_discovery=True, binary=True, graph=True)
+    written = artifact_mtimes(paths) != before
+    if written and reload_url:
+        notify_backend(reload_url)
+    return written
+
+def wait_until_settled(ax_table_dirs, snapshot, settle):
+    """
+    Waits until no AxTable file changed for settle seconds, so a checkout or build
+    writing many files is extracted once instead of file by file.
+
+    Args:
+        ax_table_dirs (list): Paths of directories named 'AxTable'.
+        snapshot (dict): The snapshot that showed the change.
+        settle (float): Seconds without changes to wait for.
+
+    Returns:
+        dict: The settled snapshot.
+    """
+    while True:
+        time.sleep(settle)
+        current = snapshot_files(ax_table_dirs)
+        if current == snapshot:
+            return current
+        snapshot = current
+
+def watch_metadata(base_directory, output_dir, extractor_names=None, interval=DEFAULT_INTERVAL,
+                   settle=DEFAULT_SETTLE, workers=1, full_walk=False, reload_url=DEFAULT_RELOAD_URL):
+    """
+    Keeps the metadata files in sync with the Metadata tree until interrupted.
+
+    Args:
+        base_directory (str): The Metadata directory.
+        output_dir (str): Directory the metadata files are written to.
+        extractor_names (list, optional): Keys of EXTRACTORS to run. Defaults to all.
+        interval (float, optional): Seconds between two polls of the AxTable folders.
+        settle (float, optional): Seconds without further changes before extracting.
+        workers (int, optional): Number of worker processes, 0 for one per CPU.
+        full_walk (bool, optional): Search the whole tree for AxTable folders.
+        reload_url (str, optional): Reload endpoint of the backend; not notified when empty.
+    """
+    extractor_names = list(extractor_names or EXTRACTORS)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Catch up with changes made while nothing was watching
+    sync_metadata(base_directory, output_dir, extractor_names, workers, full_walk, reload_url)
+    ax_table_dirs = current_ax_table_directories(base_directory, output_dir, full_walk, workers)
+    previous = snapshot_files(ax_table_dirs)
+    print(f"Watching {len(previous)} AxTable files in {len(ax_table_dirs)} directories "
+          f"(every {interval:g}s, Ctrl+C to stop).")
+
+    while True:
+        time.sleep(interval)
+        ax_table_dirs = current_ax_table_directories(base_directory, output_dir, full_walk, workers)
+        current = snapshot_files(ax_table_dirs)
+        if current == previous:
+            continue
+
+        current = wait_until_settled(ax_table_dirs, current, settle)
+        print(f"[{time.strftime('%H:%M:%S')}] AxTable files changed: {describe_changes(previous, current)}")
+        try:
+            sync_metadata(base_directory, output_dir, extractor_names, workers, full_walk, reload_url)
+        except Exception as e:
+            # Keep the previous snapshot, so the extraction is tried again on the next poll
+            print(f"ERROR: Metadata extraction failed, retrying on the next change check: {e}")
+            continue
+        previous = current
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Watch the AxTable folders and keep the extracted metadata and the running backend up to date.")
+    parser.add_argument('base_directory', nargs='?', default=DEFAULT_BASE_DIR,
+                        help="ApplicationSuite Metadata directory")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help="Directory the metadata files are written to (default: backend/resources)")
+    parser.add_argument('--only', nargs='+', choices=list(EXTRACTORS), default=list(EXTRACTORS),
+                        help="Metadata files to generate (default: all)")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f"Seconds between two checks for changed files (default: {DEFAULT_INTERVAL:g})")
+    parser.add_argument('--settle', type=float, default=DEFAULT_SETTLE,
+                        help=f"Seconds without further changes before extracting (default: {DEFAULT_SETTLE:g})")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes used to parse changed files, 0 for one per CPU (default: 1)")
+    parser.add_argument('--full-walk', action='store_true',
+                        help="Search the whole tree for AxTable folders, for non-standard layouts")
+    parser.add_argument('--reload-url', default=DEFAULT_RELOAD_URL,
+                        help=f"Backend endpoint notified after each update, empty to rely on METADATA_WATCH "
+                             f"in the backend instead (default: {DEFAULT_RELOAD_URL})")
+    parser.add_argument('--once', action='store_true',
+                        help="Bring the metadata up to date once and exit, e.g. from a scheduled task")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if not os.path.exists(args.base_directory):
+        print(f"Directory not found: {args.base_directory}")
+        sys.exit(1)
+
+    print(f"Using base directory: {args.base_directory}")
+    try:
+        if args.once:
+            sync_metadata(args.base_directory, args.output_dir, args.only, args.workers, args.full_walk,
+                          args.reload_url)
+        else:
+            watch_metadata(args.base_directory, args.output_dir, args.only, args.interval, args.settle,
+                           args.workers, args.full_walk, args.reload_url)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
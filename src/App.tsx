@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { 
   Box, 
   Typography, 
@@ -23,7 +23,7 @@ import { sql } from '@codemirror/lang-sql';
 import { autocompletion, CompletionContext, CompletionResult } from '@codemirror/autocomplete';
 import LeftPanel from './components/LeftPanel';
 import ResultsGrid from './components/ResultsGrid';
-import { Database, Table, QueryParams, Relation } from './types/database';
+import { Database, Table, QueryParams, Relation, RelationData, TableMetadata } from './types/database';
 
 interface RelatedTab {
   id: string;
@@ -33,6 +33,7 @@ interface RelatedTab {
   columns: any[];
   indexedColumns: string[];
   tableData: any;
+  relationData: RelationData;
 }
 
 function App() {
@@ -47,12 +48,15 @@ function App() {
   const [isLoadingTables, setIsLoadingTables] = useState(false);
   const [indexedColumns, setIndexedColumns] = useState<string[]>([]);
   const [tableData, setTableData] = useState<{ indexes: Array<{ indexName: string; columns: string[] }> }>({ indexes: [] });
+  const [relationData, setRelationData] = useState<RelationData | null>(null);
   const [activeTableName, setActiveTableName] = useState<string>('');
   const [relatedTabs, setRelatedTabs] = useState<RelatedTab[]>([]);
   const [activeTab, setActiveTab] = useState<string>('main');
   const [sqlCommandOpen, setSqlCommandOpen] = useState(false);
   const [sqlCommand, setSqlCommand] = useState('');
   const [databaseLoading, setDatabaseLoading] = useState(false);
+  // Queries in flight by id, so they can be cancelled on SQL Server
+  const runningQueries = useRef(new Map<string, AbortController>());
 
   useEffect(() => {
     const fetchDatabases = async () => {
@@ -68,6 +72,8 @@ function App() {
   }, []);
 
   const handleDatabaseChange = async (database: string) => {
+    // Results of the previous database are no longer wanted
+    handleCancelQueries();
     setSelectedDatabase(database);
     setSelectedTable(null);
     setResults([]);
@@ -76,13 +82,17 @@ function App() {
     setDatabaseLoading(true);
 
     try {
-      const response = await fetch(`http://localhost:3001/api/tables/${database}`);
+      // Only names are needed to pick a table; columns are fetched when one is selected
+      const [response, stats] = await Promise.all([
+        fetch(`http://localhost:3001/api/tables/${encodeURIComponent(database)}/names`),
+        fetchTableStats(database)
+      ]);
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
       const data = await response.json();
-      if (Array.isArray(data)) {
-        setTables(data);
+      if (Array.isArray(data.names)) {
+        setTables(data.names.map((name: string) => ({ name, estimatedRows: stats[name.toLowerCase()]?.rowCount })));
       } else {
         console.error('Received invalid table data:', data);
         setTables([]);
@@ -96,6 +106,145 @@ function App() {
     }
   };
 
+  // Fetch the collected row counts of the tables of a database; tables without
+  // statistics are simply missing
+  const fetchTableStats = async (database: string): Promise<Record<string, { rowCount: number }>> => {
+    try {
+      const response = await fetch(`http://localhost:3001/api/table-stats/${encodeURIComponent(database)}`);
+      if (!response.ok) {
+        return {};
+      }
+      const data = await response.json();
+      return data.tables || {};
+    } catch (error) {
+      console.error('Error fetching table statistics:', error);
+      return {};
+    }
+  };
+
+  // Fetch the columns of a table the first time it is selected and keep them in the table list
+  const loadTableColumns = async (table: Table): Promise<Table> => {
+    if (table.columns) {
+      return table;
+    }
+    const response = await fetch(
+      `http://localhost:3001/api/tables/${encodeURIComponent(selectedDatabase)}/${encodeURIComponent(table.name)}/columns`
+    );
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    const loaded: Table = { ...table, ...(await response.json()) };
+    setTables(prev => prev.map(t => (t.name === table.name ? loaded : t)));
+    return loaded;
+  };
+
+  // Run a query with an id, so it can be stopped by handleCancelQueries
+  const postQuery = async (query: string): Promise<Response> => {
+    const queryId = crypto.randomUUID();
+    const controller = new AbortController();
+    runningQueries.current.set(queryId, controller);
+    try {
+      return await fetch('http://localhost:3001/api/query', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+          query,
+          database: selectedDatabase,
+          rawQuery: query,
+          queryId,
+          format: 'columnar'
+        }),
+        signal: controller.signal,
+      });
+    } finally {
+      runningQueries.current.delete(queryId);
+    }
+  };
+
+  // Read a columnar /api/query response ({ columns, rows } with value arrays) into
+  // grid rows, numbering them unless the result has its own id column; error
+  // bodies are returned as they are
+  const readQueryRows = async (response: Response): Promise<any> => {
+    const data = await response.json();
+    if (!data || !Array.isArray(data.columns) || !Array.isArray(data.rows)) {
+      return data;
+    }
+    const columns: string[] = data.columns;
+    const hasId = columns.includes('id');
+    return data.rows.map((values: any[], index: number) => {
+      const row: Record<string, any> = hasId ? {} : { id: index };
+      for (let i = 0; i < columns.length; i++) {
+        row[columns[i]] = values[i];
+      }
+      return row;
+    });
+  };
+
+  // Cancel every running query on SQL Server and stop waiting for its results
+  const handleCancelQueries = () => {
+    runningQueries.current.forEach((controller, queryId) => {
+      fetch(`http://localhost:3001/api/query/${queryId}`, { method: 'DELETE' }).catch(() => {});
+      controller.abort();
+    });
+    runningQueries.current.clear();
+  };
+
+  // Describe a failed request; aborted ones were cancelled by the user
+  const getErrorMessage = (error: unknown) => {
+    if (error instanceof DOMException && error.name === 'AbortError') {
+      return 'Query cancelled';
+    }
+    return error instanceof Error ? error.message : 'An unknown error occurred';
+  };
+
+  // Note in the SQL log the likely table scans the backend found, and any TOP limit it added
+  const logQueryWarnings = (response: Response, tableName?: string) => {
+    const header = response.headers.get('X-Query-Warnings');
+    const warnings: Array<{ message: string; suggestion?: string }> = header ? JSON.parse(decodeURIComponent(header)) : [];
+    const limited = response.headers.get('X-Query-Limited');
+    const notes = warnings.map(warning => `-- Warning${tableName ? ` for ${tableName}` : ''}: ${warning.message}${warning.suggestion ? `. ${warning.suggestion}` : ''}`);
+    if (limited) {
+      notes.push(`-- Query limited to TOP ${limited} rows to avoid a table scan`);
+    }
+    if (notes.length > 0) {
+      warnings.forEach(warning => console.warn('Query guard:', warning.message));
+      setSqlCommand(prev => `${prev}\n${notes.join('\n')}`);
+    }
+  };
+
+  // Note in the SQL log when the backend capped a result set
+  const logTruncation = (response: Response, tableName?: string) => {
+    if (response.headers.get('X-Truncated') === 'true') {
+      const rowCount = response.headers.get('X-Row-Count');
+      setSqlCommand(prev => `${prev}\n-- Result${tableName ? ` for ${tableName}` : ''} limited to the first ${rowCount} rows`);
+    }
+  };
+
+  // Fetch indexes, indexed columns and relations of several tables in one request
+  const fetchTableMetadata = async (tableNames: string[]): Promise<Record<string, TableMetadata>> => {
+    const response = await fetch('http://localhost:3001/api/table-metadata', {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ tables: tableNames }),
+    });
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    return response.json();
+  };
+
+  // Show the metadata of the table in the main tab
+  const applyTableMetadata = async (tableName: string) => {
+    const metadata = (await fetchTableMetadata([tableName]))[tableName];
+    setIndexedColumns(metadata.indexedColumns);
+    setTableData(metadata.tableIndex);
+    setRelationData(metadata.tableRelation);
+  };
+
   const handleTableSelect = async (table: Table, params: QueryParams) => {
     setSelectedTable(table);
     setLoading(true);
@@ -104,14 +253,8 @@ function App() {
     setActiveTableName(params.tableName);
 
     try {
-      // Fetch index information first
-      const indexResponse = await fetch(`http://localhost:3001/api/indexed-columns/${params.tableName}`);
-      const indexData = await indexResponse.json();
-      setIndexedColumns(indexData);
-      
-      const tableIndexResponse = await fetch(`http://localhost:3001/api/table-index/${params.tableName}`);
-      const tableIndexData = await tableIndexResponse.json();
-      setTableData(tableIndexData);
+      // Fetch index and relation information first
+      await applyTableMetadata(params.tableName);
 
       // Construct the query
       let query = generateQuery(params);
@@ -119,19 +262,11 @@ function App() {
       const currentTime = new Date().toLocaleTimeString();
       setSqlCommand(prev => `${prev}\n-- [${currentTime}] Selected table:\n${query}`);
 
-      const response = await fetch('http://localhost:3001/api/query', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          query,
-          database: selectedDatabase,
-          rawQuery: query
-        }),
-      });
+      const response = await postQuery(query);
 
-      const data = await response.json();
+      const data = await readQueryRows(response);
+      logTruncation(response);
+      logQueryWarnings(response);
       
       if (data.error) {
         console.error('Query error:', data.error);
@@ -154,7 +289,7 @@ function App() {
 
     } catch (error) {
       console.error('API error:', error);
-      const errorMessage = error instanceof Error ? error.message : 'An unknown error occurred';
+      const errorMessage = getErrorMessage(error);
       setSqlCommand(prev => `${prev}\n-- Error: ${errorMessage}`);
     } finally {
       setLoading(false);
@@ -177,19 +312,11 @@ function App() {
       const currentTime = new Date().toLocaleTimeString();
       setSqlCommand(prev => `${prev}\n-- [${currentTime}] Generated Query:\n${query}`);
 
-      const response = await fetch('http://localhost:3001/api/query', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          query,
-          database: selectedDatabase,
-          rawQuery: query
-        }),
-      });
+      const response = await postQuery(query);
 
-      const data = await response.json();
+      const data = await readQueryRows(response);
+      logTruncation(response);
+      logQueryWarnings(response);
       
       if (data.error) {
         console.error('Query error:', data.error);
@@ -212,10 +339,12 @@ function App() {
       
       const tableMatch = query.match(/FROM\s+\[?(\w+)\]?/i);
       setActiveTableName(tableMatch ? tableMatch[1] : '');
+      // Let the grid look up the relations of the queried table itself
+      setRelationData(null);
 
     } catch (error) {
       console.error('API error:', error);
-      const errorMessage = error instanceof Error ? error.message : 'An unknown error occurred';
+      const errorMessage = getErrorMessage(error);
       setSqlCommand(prev => `${prev}\n-- Error: ${errorMessage}`);
     } finally {
       setLoading(false);
@@ -304,30 +433,16 @@ function App() {
         const tableName = tableMatch[1];
         setActiveTableName(tableName);
         
-        // Fetch index information before executing the query
-        const indexResponse = await fetch(`http://localhost:3001/api/indexed-columns/${tableName}`);
-        const indexData = await indexResponse.json();
-        setIndexedColumns(indexData);
-        
-        const tableIndexResponse = await fetch(`http://localhost:3001/api/table-index/${tableName}`);
-        const tableIndexData = await tableIndexResponse.json();
-        setTableData(tableIndexData);
+        // Fetch index and relation information before executing the query
+        await applyTableMetadata(tableName);
       }
 
       // Now execute the query
-      const response = await fetch('http://localhost:3001/api/query', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          query: sqlCommand,
-          database: selectedDatabase,
-          rawQuery: sqlCommand
-        }),
-      });
+      const response = await postQuery(sqlCommand);
 
-      const data = await response.json();
+      const data = await readQueryRows(response);
+      logTruncation(response);
+      logQueryWarnings(response);
       
       if (data.error) {
         console.error('Query error:', data.error);
@@ -350,7 +465,7 @@ function App() {
 
     } catch (error) {
       console.error('API error:', error);
-      const errorMessage = error instanceof Error ? error.message : 'An unknown error occurred';
+      const errorMessage = getErrorMessage(error);
       setSqlCommand(prev => `${prev}\n-- Error: ${errorMessage}`);
     } finally {
       setLoading(false);
@@ -385,6 +500,11 @@ function App() {
 
       console.log('Found relevant relations:', relevantRelations);
 
+      // Fetch the metadata of every related table in one request
+      const relatedMetadata = relevantRelations.length > 0
+        ? await fetchTableMetadata([...new Set(relevantRelations.map(relation => relation.relatedTable))])
+        : {};
+
       // Create a tab for each related table
       for (const relation of relevantRelations) {
         const matchingConstraint = relation.constraints.find(c => 
@@ -399,31 +519,17 @@ function App() {
 
         console.log(`Executing query for ${relation.relatedTable}:`, query);
 
-        const [queryResponse, indexedColumnsResponse, tableIndexResponse] = await Promise.all([
-          fetch('http://localhost:3001/api/query', {
-            method: 'POST',
-            headers: {
-              'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-              query,
-              database: selectedDatabase,
-              rawQuery: query
-            }),
-          }),
-          fetch(`http://localhost:3001/api/indexed-columns/${relation.relatedTable}`),
-          fetch(`http://localhost:3001/api/table-index/${relation.relatedTable}`)
-        ]);
+        const queryResponse = await postQuery(query);
 
         if (!queryResponse.ok) {
           throw new Error(`HTTP error! status: ${queryResponse.status}`);
         }
 
-        const [data, indexedColumnsData, tableIndexData] = await Promise.all([
-          queryResponse.json(),
-          indexedColumnsResponse.json(),
-          tableIndexResponse.json()
-        ]);
+        const data = await readQueryRows(queryResponse);
+        const metadata = relatedMetadata[relation.relatedTable];
+
+        logTruncation(queryResponse, relation.relatedTable);
+        logQueryWarnings(queryResponse, relation.relatedTable);
 
         if (data.error) {
           console.error(`Query error for ${relation.relatedTable}:`, data.error);
@@ -449,8 +555,9 @@ function App() {
           relationName: `${relation.name} (${matchingConstraint.field})`,
           results: data || [],
           columns: gridColumns,
-          indexedColumns: indexedColumnsData,
-          tableData: tableIndexData
+          indexedColumns: metadata.indexedColumns,
+          tableData: metadata.tableIndex,
+          relationData: metadata.tableRelation
         };
 
         setRelatedTabs(prev => [...prev, newTab]);
@@ -465,7 +572,7 @@ function App() {
 
     } catch (err) {
       console.error('API error:', err);
-      const errorMessage = err instanceof Error ? err.message : 'An unknown error occurred';
+      const errorMessage = getErrorMessage(err);
       setSqlCommand(prev => `${prev}\n-- Error: ${errorMessage}`);
     } finally {
       setLoading(false);
@@ -556,6 +663,21 @@ function App() {
         </Typography>
 
         <Box sx={{ display: 'flex', alignItems: 'center', ml: 'auto' }}>
+          {loading && (
+            <Button
+              size="small"
+              onClick={handleCancelQueries}
+              startIcon={<CircularProgress size={12} sx={{ color: '#64748b' }} />}
+              sx={{
+                fontSize: '11px',
+                textTransform: 'none',
+                color: '#94a3b8',
+                '&:hover': { bgcolor: '#1e293b' }
+              }}
+            >
+              Cancel query
+            </Button>
+          )}
           <FormControl 
             size="small" 
             sx={{ 
@@ -611,6 +733,7 @@ function App() {
           tables={tables}
           selectedTable={selectedTable}
           onTableChange={setSelectedTable}
+          loadTableColumns={loadTableColumns}
           onQuerySubmit={handleQuerySubmit}
           isLoading={loading}
           onTableSelect={handleTableSelect}
@@ -927,6 +1050,7 @@ function App() {
                 indexedColumns={indexedColumns}
                 tableName={activeTableName}
                 tableData={tableData}
+                relationData={relationData ?? undefined}
                 onRelatedTableClick={handleRelatedTableClick}
               />
             ) : (
@@ -937,6 +1061,7 @@ function App() {
                 indexedColumns={relatedTabs.find(tab => tab.id === activeTab)?.indexedColumns || []}
                 tableName={relatedTabs.find(tab => tab.id === activeTab)?.tableName}
                 tableData={relatedTabs.find(tab => tab.id === activeTab)?.tableData}
+                relationData={relatedTabs.find(tab => tab.id === activeTab)?.relationData}
                 onRelatedTableClick={handleRelatedTableClick}
               />
             )}
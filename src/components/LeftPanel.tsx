@@ -9,6 +9,7 @@ interface LeftPanelProps {
   tables: Table[];
   selectedTable: Table | null;
   onTableChange: (table: Table | null) => void;
+  loadTableColumns: (table: Table) => Promise<Table>;
   onQuerySubmit: (params: QueryParams) => void;
   isLoading: boolean;
   onTableSelect?: (table: Table, params: QueryParams) => void;
@@ -19,6 +20,7 @@ export default function LeftPanel({
   tables,
   selectedTable,
   onTableChange,
+  loadTableColumns,
   onQuerySubmit,
   isLoading,
   onTableSelect
@@ -37,6 +39,7 @@ export default function LeftPanel({
         tables={tables}
         selectedTable={selectedTable}
         onTableChange={onTableChange}
+        loadTableColumns={loadTableColumns}
         onQuerySubmit={onQuerySubmit}
         isLoading={isLoading}
         onTableSelect={onTableSelect}
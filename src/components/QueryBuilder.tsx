@@ -18,15 +18,35 @@ interface QueryBuilderProps {
   tables: Table[];
   selectedTable: Table | null;
   onTableChange: (table: Table | null) => void;
+  loadTableColumns: (table: Table) => Promise<Table>;
   onQuerySubmit?: (params: QueryParams) => void;
   isLoading: boolean;
   onTableSelect?: (table: Table, params: QueryParams) => void;
 }
 
+const hasRecId = (table: Table) => Boolean(table.columns?.some(col => col.name.toLowerCase() === 'recid'));
+
+// Tables with more estimated rows start with the smallest limit
+const LARGE_TABLE_ROWS = 1000000;
+
+// Short row count for the table list, e.g. 1.2M
+const formatRowCount = (rows: number) =>
+  new Intl.NumberFormat('en-US', { notation: 'compact', maximumFractionDigits: 1 }).format(rows);
+
+// Default limit of a table from its estimated rows: small tables are shown whole,
+// large ones start with a short page; without statistics the current limit is kept
+const suggestedLimit = (table: Table, current: number) => {
+  if (table.estimatedRows === undefined) return current;
+  if (table.estimatedRows <= 500) return 500;
+  if (table.estimatedRows <= LARGE_TABLE_ROWS) return 100;
+  return 50;
+};
+
 export default function QueryBuilder({
   tables,
   selectedTable,
   onTableChange,
+  loadTableColumns,
   onQuerySubmit,
   isLoading,
   onTableSelect
@@ -46,7 +66,7 @@ export default function QueryBuilder({
       setGroupByColumns([]);
       
       // Set default ordering if RECID exists
-      if (selectedTable.columns.some(col => col.name.toLowerCase() === 'recid')) {
+      if (hasRecId(selectedTable)) {
         setOrderByColumn('RECID');
         setOrderDirection('desc');
       } else {
@@ -56,7 +76,7 @@ export default function QueryBuilder({
 
       // Submit query with cleared filters
       setTimeout(() => {
-        if (selectedTable.columns.some(col => col.name.toLowerCase() === 'recid')) {
+        if (hasRecId(selectedTable)) {
           onTableSelect?.(selectedTable, {
             tableName: selectedTable.name,
             filters: [],
@@ -97,11 +117,22 @@ export default function QueryBuilder({
     setFilteredTables(filtered);
   }, [tables, tableFilterText]);
 
-  const handleAutoCompleteChange = async (event: any, newValue: Table | null) => {
+  const handleAutoCompleteChange = async (event: any, selected: Table | null) => {
+    let newValue = selected;
+    if (newValue) {
+      // Columns are needed for the default ordering and the column pickers
+      try {
+        newValue = await loadTableColumns(newValue);
+      } catch (error) {
+        console.error('Error fetching table columns:', error);
+      }
+    }
+    const tableLimit = newValue ? suggestedLimit(newValue, limit) : limit;
+    setLimit(tableLimit);
     onTableChange(newValue);
     if (newValue && onTableSelect) {
       // Set order by values first
-      if (newValue.columns.some(col => col.name.toLowerCase() === 'recid')) {
+      if (hasRecId(newValue)) {
         // Set the state and wait for it to update
         setOrderByColumn('RECID');
         setOrderDirection('desc');
@@ -112,7 +143,7 @@ export default function QueryBuilder({
             filters: filters.filter(f => f.column && f.value),
             orderByColumn: 'RECID',
             orderDirection: 'desc',
-            limit,
+            limit: tableLimit,
             groupByColumns: groupByColumns.length > 0 ? groupByColumns : undefined
           });
         }, 0);
@@ -125,7 +156,7 @@ export default function QueryBuilder({
             filters: filters.filter(f => f.column && f.value),
             orderByColumn: '',
             orderDirection: 'desc',
-            limit,
+            limit: tableLimit,
             groupByColumns: groupByColumns.length > 0 ? groupByColumns : undefined
           });
         }, 0);
@@ -247,7 +278,12 @@ export default function QueryBuilder({
                     }
                   }}
                 >
-                  {option.name}
+                  <Box component="span" sx={{ flex: 1 }}>{option.name}</Box>
+                  {option.estimatedRows !== undefined && (
+                    <Box component="span" sx={{ ml: 1, color: 'text.secondary', fontSize: '10px' }}>
+                      {formatRowCount(option.estimatedRows)} rows
+                    </Box>
+                  )}
                 </MenuItem>
               );
             }}
@@ -276,6 +312,11 @@ export default function QueryBuilder({
               }
             }}
           />
+          {selectedTable?.estimatedRows !== undefined && (
+            <Typography variant="caption" sx={{ display: 'block', mt: 0.5, fontSize: '10px', color: 'text.secondary' }}>
+              ~{selectedTable.estimatedRows.toLocaleString()} rows (collected statistics)
+            </Typography>
+          )}
         </Paper>
       </Box>
 
@@ -373,7 +414,7 @@ export default function QueryBuilder({
                 }}>
                   <Autocomplete
                     size="small"
-                    options={selectedTable?.columns.map(col => col.name) || []}
+                    options={selectedTable?.columns?.map(col => col.name) || []}
                     value={filter.column}
                     onChange={(_, newValue) => updateFilterColumn(index, newValue || '')}
                     renderInput={(params) => (
@@ -468,7 +509,7 @@ export default function QueryBuilder({
           <Box sx={{ display: 'flex', flexDirection: 'column', gap: 1 }}>
             <Autocomplete
               size="small"
-              options={selectedTable?.columns.map(col => col.name) || []}
+              options={selectedTable?.columns?.map(col => col.name) || []}
               value={orderByColumn}
               onChange={(_, newValue) => setOrderByColumn(newValue || '')}
               renderInput={(params) => (
@@ -525,7 +566,7 @@ export default function QueryBuilder({
             <Autocomplete
               multiple
               size="small"
-              options={selectedTable?.columns.map(col => col.name) || []}
+              options={selectedTable?.columns?.map(col => col.name) || []}
               value={groupByColumns}
               onChange={(_, newValue) => setGroupByColumns(newValue)}
               renderOption={(props, option) => (
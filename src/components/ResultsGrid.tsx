@@ -1,10 +1,16 @@
 import { DataGrid, GridColDef, GridColumnHeaderParams, GridRenderCellParams, useGridApiRef } from '@mui/x-data-grid';
 import { Paper, Typography, Box, Switch, FormControlLabel, Tooltip, Link, IconButton, Backdrop, CircularProgress, FormControl, Select, MenuItem, InputLabel, Menu, Button } from '@mui/material';
 import { Table as TableIcon, Copy as CopyIcon, FileDown as FileDownIcon } from 'lucide-react';
-import { useEffect, useState } from 'react';
+import { useEffect, useMemo, useState } from 'react';
 import { Relation, RelationData } from '../types/database';
 import * as XLSX from 'xlsx';
 
+// Rows are virtualized at this fixed height, also used for the column headers
+const ROW_HEIGHT = 32;
+// Column widths are estimated from the first rows only, so large results do not
+// have to be scanned cell by cell
+const WIDTH_SAMPLE_ROWS = 200;
+
 interface ResultsGridProps {
   rows: any[];
   columns: GridColDef[];
@@ -18,6 +24,7 @@ interface ResultsGridProps {
       allowDuplicates?: boolean;
     }>;
   };
+  relationData?: RelationData;
   onRelatedTableClick?: (
     tableName: string,
     columnValue: any,
@@ -34,14 +41,25 @@ export default function ResultsGrid({
   indexedColumns = [], 
   tableName, 
   tableData,
+  relationData: providedRelationData,
   onRelatedTableClick 
 }: ResultsGridProps) {
-  const safeRows = Array.isArray(rows) ? rows : [];
+  // Rows keep their own id; any without one are numbered by position, so ids stay
+  // the same between renders and the grid can reuse the mounted rows
+  const safeRows = useMemo(() => {
+    if (!Array.isArray(rows)) {
+      return [];
+    }
+    return rows.every(row => row.id !== undefined && row.id !== null)
+      ? rows
+      : rows.map((row, index) => ({ ...row, id: row.id ?? index }));
+  }, [rows]);
   const apiRef = useGridApiRef();
 
   const [highlightEnabled, setHighlightEnabled] = useState(true);
   const [hideEmptyEnabled, setHideEmptyEnabled] = useState(false);
-  const [relationData, setRelationData] = useState<RelationData | null>(null);
+  const [fetchedRelationData, setFetchedRelationData] = useState<RelationData | null>(null);
+  const relationData = providedRelationData ?? fetchedRelationData;
   const [adjustedColumns, setAdjustedColumns] = useState<GridColDef[]>([]);
   const [selectedColumn, setSelectedColumn] = useState<string>('');
   const [exportMenuAnchorEl, setExportMenuAnchorEl] = useState<null | HTMLElement>(null);
@@ -55,7 +73,7 @@ export default function ResultsGrid({
   };
 
   // Filter out empty columns if hideEmptyEnabled is true
-  const filteredColumns = hideEmptyEnabled 
+  const filteredColumns = useMemo(() => hideEmptyEnabled 
     ? columns.filter(col => {
         // Check if the column has any non-empty values
         return safeRows.some(row => {
@@ -63,7 +81,7 @@ export default function ResultsGrid({
           return value !== null && value !== undefined && value !== '';
         });
       })
-    : columns;
+    : columns, [hideEmptyEnabled, columns, safeRows]);
 
   const styles = `
     .indexed-column {
@@ -78,33 +96,34 @@ export default function ResultsGrid({
     }
   `;
 
-  // Fetch relation data when tableName changes
+  // Fetch relation data when tableName changes, unless the parent already passed it
   useEffect(() => {
     const fetchRelationData = async () => {
-      if (tableName) {
+      if (tableName && !providedRelationData) {
         try {
           const response = await fetch(`http://localhost:3001/api/table-relation/${tableName}`);
           const data = await response.json();
           
           if (data && Array.isArray(data.relations)) {
-            setRelationData(data);
+            setFetchedRelationData(data);
           } else {
             console.log('Invalid relation data structure:', data);
-            setRelationData({ tableName, relations: [] });
+            setFetchedRelationData({ tableName, relations: [] });
           }
         } catch (error) {
           console.error('Error fetching relation data:', error);
-          setRelationData({ tableName, relations: [] });
+          setFetchedRelationData({ tableName, relations: [] });
         }
       }
     };
     fetchRelationData();
-  }, [tableName]);
+  }, [tableName, providedRelationData]);
 
   useEffect(() => {
+    const sampleRows = safeRows.slice(0, WIDTH_SAMPLE_ROWS);
     const adjustedColumns: GridColDef[] = columns.map((col) => {
-      // Find the maximum length of values in this column
-      const maxValueLength = safeRows.reduce((max, row) => {
+      // Find the maximum length of the sampled values in this column
+      const maxValueLength = sampleRows.reduce((max, row) => {
         const value = row[col.field]?.toString() || '';
         return Math.max(max, value.length);
       }, 0);
@@ -698,9 +717,11 @@ export default function ResultsGrid({
           pagination
           pageSizeOptions={[25, 50, 100]}
           disableRowSelectionOnClick
-          getRowId={(row) => row.id || Math.random()}
+          getRowId={(row) => row.id}
           loading={loading}
           density="compact"
+          rowHeight={ROW_HEIGHT}
+          columnHeaderHeight={ROW_HEIGHT}
           initialState={{
             pagination: { paginationModel: { pageSize: 50 } },
           }}
@@ -734,10 +755,8 @@ export default function ResultsGrid({
           sx={{
             border: 'none',
             height: 'calc(100vh - 200px)',  
-            '& .MuiDataGrid-main': {
-              overflow: 'auto !important',
+            '& .MuiDataGrid-virtualScroller': {
               scrollbarWidth: 'thin',
-              scrollBehavior: 'smooth',
               '&::-webkit-scrollbar': {
                 width: '6px',
                 height: '6px',
@@ -776,10 +795,6 @@ export default function ResultsGrid({
               whiteSpace: 'normal',
               overflow: 'visible'
             },
-            '& .MuiDataGrid-row': {
-              maxHeight: '32px !important',
-              minHeight: '32px !important'
-            },
             '& .MuiDataGrid-overlay': {
               bgcolor: 'transparent',
               color: '#64748b',
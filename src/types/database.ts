@@ -5,7 +5,10 @@ export interface Database {
 
 export interface Table {
   name: string;
-  columns: Column[];
+  // Loaded on demand once the table is selected
+  columns?: Column[];
+  // From the collected table statistics, if any
+  estimatedRows?: number;
 }
 
 export interface Column {
@@ -43,4 +46,15 @@ export interface Relation {
 export interface RelationData {
   tableName: string;
   relations: Relation[];
-}
\ No newline at end of file
+}
+export interface TableMetadata {
+  indexedColumns: string[];
+  tableIndex: {
+    indexes: Array<{
+      indexName: string;
+      columns: string[];
+      allowDuplicates?: boolean;
+    }>;
+  };
+  tableRelation: RelationData;
+}